@@ -0,0 +1,124 @@
+# Synthetic grammars for the benchmarks
+# Grammars are returned as {nonterminal: [productions]} with tuples of symbols and () for the empty
+# production, the format of the bottom-up parser. The converters give the formats of the other modules:
+#   augment(grammar)          adds S' -> S as the first nonterminal (bottom-up parser)
+#   to_top_down(grammar)      the empty production becomes ('e',) (top-down parser)
+#   to_first_follow(grammar)  the empty production becomes "e" (First & Follow)
+# Nonterminals are uppercase (N0, N1, ...) and terminals lowercase (t0, t1, ...), as both
+# top-down modules expect.
+import random
+
+
+# Random grammar where every nonterminal is reachable and productive
+#   nonterminals   number of nonterminals
+#   productions    productions per nonterminal
+#   length         maximum length of a production
+#   terminals      number of terminals
+#   epsilon        probability that a nonterminal also has the empty production
+#   left_recursion probability that a production (other than the first) starts with its own nonterminal
+# The first production of N_i only uses terminals and N_{2i+1}, N_{2i+2}, so the grammar is productive
+# and every nonterminal is reachable from N0 at depth O(log n)
+def random_grammar(nonterminals=50, productions=3, length=4, terminals=20, epsilon=0.1,
+                   left_recursion=0.1, seed=0):
+    rng = random.Random(seed)
+    names = [f"N{i}" for i in range(nonterminals)]
+    alphabet = [f"t{i}" for i in range(terminals)]
+    grammar = {}
+
+    for i, A in enumerate(names):
+        children = [names[j] for j in (2 * i + 1, 2 * i + 2) if j < nonterminals]
+        base = children + [rng.choice(alphabet) for _ in range(rng.randint(1, max(1, length - len(children))))]
+        rng.shuffle(base)
+        rules = [tuple(base)]
+
+        for _ in range(productions - 1):
+            size = rng.randint(1, length)
+            symbols = [rng.choice(names) if rng.random() < 0.5 else rng.choice(alphabet) for _ in range(size)]
+            if rng.random() < left_recursion:
+                symbols[0] = A
+            rules.append(tuple(symbols))
+
+        if rng.random() < epsilon:
+            rules.append(())
+        grammar[A] = list(dict.fromkeys(rules))
+    return grammar
+
+
+# Expression grammar with a chain of precedence levels (one binary operator per level)
+# style='lr': E_i -> E_i op_i E_{i+1} | E_{i+1}               (left recursive, for the LR parsers)
+# style='ll': E_i -> E_{i+1} R_i,  R_i -> op_i E_{i+1} R_i | ε  (for the LL(1) parser)
+# The last level is P -> ( E0 ) | id
+def expression_grammar(levels=5, style='lr'):
+    grammar = {}
+    for i in range(levels):
+        E, operand = f"E{i}", (f"E{i + 1}" if i + 1 < levels else "P")
+        if style == 'lr':
+            grammar[E] = [(E, f"op{i}", operand), (operand,)]
+        else:
+            grammar[E] = [(operand, f"R{i}")]
+            grammar[f"R{i}"] = [(f"op{i}", operand, f"R{i}"), ()]
+    grammar["P"] = [("(", "E0", ")"), ("id",)]
+    return grammar
+
+
+# Augmented grammar: S' -> S is added as the first nonterminal
+def augment(grammar):
+    start = next(iter(grammar))
+    return {"S'": [(start,)], **grammar}
+
+
+def to_top_down(grammar):
+    return {A: [production if production else ("e",) for production in productions]
+            for A, productions in grammar.items()}
+
+
+def to_first_follow(grammar):
+    return {A: [production if production else "e" for production in productions]
+            for A, productions in grammar.items()}
+
+
+# Random sentence of the grammar with about `tokens` tokens
+# Until the sentence is long enough, half of the choices take a production with the most
+# nonterminals (so the derivation keeps growing) and the other half any production; after that,
+# every nonterminal takes a production of minimal height so the derivation finishes
+def random_sentence(grammar, tokens=100, seed=0):
+    rng = random.Random(seed)
+
+    # height(A): minimal height of a derivation tree of A (fixpoint over the productions)
+    height = {A: None for A in grammar}
+    best = {}
+    changed = True
+    while changed:
+        changed = False
+        for A, productions in grammar.items():
+            for production in productions:
+                heights = [height[X] for X in production if X in grammar]
+                if any(h is None for h in heights):
+                    continue
+                h = 1 + max(heights, default=0)
+                if height[A] is None or h < height[A]:
+                    height[A] = h
+                    best[A] = production
+                    changed = True
+
+    growing = {}
+    for A, productions in grammar.items():
+        most = max(sum(X in grammar for X in production) for production in productions)
+        growing[A] = [production for production in productions if sum(X in grammar for X in production) == most]
+
+    sentence = []
+    stack = [next(iter(grammar))]
+    while stack:
+        X = stack.pop()
+        if X not in grammar:
+            sentence.append(X)
+            continue
+        if len(sentence) + len(stack) < tokens:
+            if rng.random() < 0.5:
+                production = rng.choice(grammar[X])
+            else:
+                production = rng.choice(growing[X])
+        else:
+            production = best[X]
+        stack.extend(reversed(production))
+    return sentence
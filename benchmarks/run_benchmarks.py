@@ -0,0 +1,229 @@
+# Benchmark suite for the three modules over synthetic grammars of growing size
+#
+#   python benchmarks/run_benchmarks.py --sizes 50 100 200 --output results.json
+#   python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+#
+# For every size the suite times (best of --repeat runs):
+#   first_follow     First & Follow: First_Follow.compute_sets on a random grammar of `size` nonterminals
+#   follow           Bottom-up: compute_follow on the same grammar
+#   follow_matrix    Bottom-up: compute_follow_matrix (the opt-in NumPy engine) on the same grammar
+#   follow_chain     Bottom-up: compute_follow on an LR expression grammar with 15 * size // 2
+#                    precedence levels (a chain of about 15 * size productions)
+#   follow_matrix_chain   the same with compute_follow_matrix
+# The follow_matrix benchmarks only run when NumPy is installed.
+#   lr_collection    Bottom-up: LRcollection on the same grammar (augmented)
+#   slr_table        Bottom-up: SLRTable on the same grammar
+#   slr_edit         Bottom-up: IncrementalSLR edits on an LR expression grammar with `size` precedence
+#                    levels: E_{size/2} -> E_{size/2} xx E_{size/2+1} and P -> - P are added and
+#                    removed again (four edits)
+#   slr_rebuild      Bottom-up: SLRTable on the same grammar (what each of those edits replaces)
+#   ll1_table        Top-down: compute_first, compute_follow and compute_parsing_table on an
+#                    LL(1) expression grammar with 2 + size // 50 precedence levels (as few as when
+#                    FOLLOW was recursive and exponential in the number of levels, to compare baselines)
+#   lr_parse         Bottom-up: LRparser on a sentence of 100 * size tokens (LR expression grammar
+#                    with size // 10 precedence levels)
+#   ll1_parse        Top-down: analyze_string on a sentence of 100 * size tokens (LL expression grammar)
+#   grammar_load     grammar_loader.load_grammar on the text ("A -> x y | z") of a random grammar of
+#                    100 * size nonterminals (about 300 * size productions)
+# Results are written as JSON with the scaling exponent of every benchmark (slope of log time
+# over log size). --compare reports the benchmarks that got slower than a baseline by more than
+# --tolerance, or whose scaling exponent grew by more than --exponent-tolerance, and exits with 1.
+import argparse
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+# The repository root is put on sys.path, so the suite also runs without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cfg_parsers import bottom_up, top_down  # noqa: E402
+from cfg_parsers.first_follow import First_Follow  # noqa: E402
+from cfg_parsers.grammar_loader import load_grammar  # noqa: E402
+from grammar_generator import (augment, expression_grammar, random_grammar, random_sentence,  # noqa: E402
+                               to_first_follow, to_top_down)
+
+
+# Best wall time of `repeat` calls of function()
+def best_time(function, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build_ll1_table(grammar):
+    FF = top_down.First_Follow(grammar)
+    FF.compute_first()
+    FF.compute_follow()
+    FF.compute_parsing_table()
+    return FF
+
+
+# Text of a grammar in the format of load_grammar (one line per nonterminal, ε is an empty alternative)
+def grammar_text(grammar):
+    return "".join(f"{A} -> {' | '.join(' '.join(p) for p in productions)}\n" for A, productions in grammar.items())
+
+
+# Benchmarks of one size: list of (name, params, function, tokens parsed or None)
+def benchmarks(size, seed):
+    grammar = random_grammar(nonterminals=size, seed=seed)
+    augmented = augment(grammar)
+    levels = max(2, size // 10)
+    ll_levels = 2 + size // 50
+    chain_levels = 15 * size // 2
+    chain = augment(expression_grammar(chain_levels, 'lr'))
+    lr_grammar = augment(expression_grammar(levels, 'lr'))
+    ll_expression = expression_grammar(ll_levels, 'll')
+    ll_grammar = to_top_down(ll_expression)
+    sentence = random_sentence(lr_grammar, tokens=100 * size, seed=seed)
+    ll_sentence = random_sentence(ll_expression, tokens=100 * size, seed=seed)
+    text = " ".join(sentence)
+    ll_text = " ".join(ll_sentence)
+    ACTION, GOTO = bottom_up.SLRTable(lr_grammar)
+    FF = build_ll1_table(ll_grammar)
+    assert FF.analyze_string(ll_text)  # Creates the lexer, so its construction is not timed
+
+    grammar_params = {"nonterminals": size, "productions": sum(map(len, grammar.values()))}
+    ll_params = {"levels": ll_levels}
+    chain_params = {"levels": chain_levels, "productions": sum(map(len, chain.values()))}
+    parse_params = {"levels": levels, "tokens": len(sentence)}
+    ll_parse_params = {"levels": ll_levels, "tokens": len(ll_sentence)}
+    large = random_grammar(nonterminals=100 * size, seed=seed)
+    large_text = grammar_text(large)
+    load_params = {"nonterminals": 100 * size, "productions": sum(map(len, large.values()))}
+    edit_grammar = augment(expression_grammar(size, 'lr'))
+    incremental = bottom_up.IncrementalSLR(edit_grammar)
+    middle, next_level = f"E{size // 2}", f"E{size // 2 + 1}"
+    edits = [(middle, (middle, "xx", next_level)), ("P", ("-", "P"))]
+    edit_params = {"levels": size, "productions": sum(map(len, edit_grammar.values()))}
+
+    def edit():
+        for A, production in edits:
+            incremental.add_production(A, production)
+            incremental.remove_production(A, production)
+    suite = [
+        ("first_follow", grammar_params, lambda: First_Follow(to_first_follow(grammar)).compute_sets(), None),
+        ("follow", grammar_params, lambda: bottom_up.compute_follow(augmented), None),
+        ("follow_matrix", grammar_params, lambda: bottom_up.compute_follow_matrix(augmented), None),
+        ("follow_chain", chain_params, lambda: bottom_up.compute_follow(chain), None),
+        ("follow_matrix_chain", chain_params, lambda: bottom_up.compute_follow_matrix(chain), None),
+        ("lr_collection", grammar_params, lambda: bottom_up.LRcollection(augmented), None),
+        ("slr_table", grammar_params, lambda: bottom_up.SLRTable(augmented), None),
+        ("slr_edit", edit_params, edit, None),
+        ("slr_rebuild", edit_params, lambda: bottom_up.SLRTable(edit_grammar), None),
+        ("ll1_table", ll_params, lambda: build_ll1_table(ll_grammar), None),
+        ("lr_parse", parse_params, lambda: bottom_up.LRparser(text, ACTION, GOTO), len(sentence)),
+        ("ll1_parse", ll_parse_params, lambda: FF.analyze_string(ll_text), len(ll_sentence)),
+        ("grammar_load", load_params, lambda: load_grammar(io.StringIO(large_text)), None),
+    ]
+    if importlib.util.find_spec("numpy") is None:
+        suite = [benchmark for benchmark in suite if not benchmark[0].startswith("follow_matrix")]
+    return suite
+
+
+# Slope of log(seconds) over log(size): ~1 for linear growth, ~2 for quadratic, ...
+def scaling_exponent(points):
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def run(sizes, repeat, seed, only=None):
+    results = []
+    for size in sizes:
+        for name, params, function, tokens in benchmarks(size, seed):
+            if only and name not in only:
+                continue
+            seconds = best_time(function, repeat)
+            result = {"benchmark": name, "size": size, "params": params, "seconds": seconds}
+            if tokens is not None:
+                result["tokens_per_second"] = tokens / seconds
+            results.append(result)
+            print(f"{name:<20} size {size:>6}  {seconds:10.4f} s", file=sys.stderr)
+
+    scaling = {}
+    for name in dict.fromkeys(result["benchmark"] for result in results):
+        scaling[name] = scaling_exponent([(r["size"], r["seconds"]) for r in results if r["benchmark"] == name])
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sizes": sizes,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+        "scaling": scaling,
+    }
+
+
+# Regressions of `current` against `baseline`: list of messages
+def compare(current, baseline, tolerance, exponent_tolerance):
+    old = {(r["benchmark"], r["size"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        before = old.get((r["benchmark"], r["size"]))
+        if before and r["seconds"] > tolerance * before:
+            regressions.append(f"{r['benchmark']} size {r['size']}: {before:.4f} s -> {r['seconds']:.4f} s "
+                               f"({r['seconds'] / before:.2f}x)")
+    # Exponents are fitted again over the sizes both runs have, so different --sizes stay comparable
+    for name in current["scaling"]:
+        points = [(r["size"], r["seconds"], old[(name, r["size"])]) for r in current["results"]
+                  if r["benchmark"] == name and (name, r["size"]) in old]
+        exponent = scaling_exponent([(size, seconds) for size, seconds, _ in points])
+        before = scaling_exponent([(size, seconds) for size, _, seconds in points])
+        if exponent is not None and before is not None and exponent > before + exponent_tolerance:
+            regressions.append(f"{name}: scaling exponent {before:.2f} -> {exponent:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of the CFG parser implementations")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400],
+                        help="grammar sizes (nonterminals of the random grammar)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (the best one is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the grammar and sentence generator")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare the results with")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="slowdown factor over the baseline reported as a regression")
+    parser.add_argument("--exponent-tolerance", type=float, default=0.3,
+                        help="growth of the scaling exponent reported as a regression")
+    args = parser.parse_args()
+
+    current = run(args.sizes, args.repeat, args.seed, args.only)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.tolerance, args.exponent_tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
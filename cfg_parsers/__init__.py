@@ -0,0 +1,5 @@
+# Context-free grammar toolkit: FIRST/FOLLOW sets, LL(1) and LR parsers
+#   cfg_parsers.first_follow   FIRST and FOLLOW sets of the cases of a file (batch mode)
+#   cfg_parsers.top_down       LL(1) parser (comments in Spanish)
+#   cfg_parsers.bottom_up      LR(0)/SLR, LALR(1), LR(1) and GLR parsers
+# and the modules they share (grammar_loader, lexer, parse_tree, grammar_cache, codegen, ...)
@@ -0,0 +1,55 @@
+# Batch parsing of many inputs over a process pool (used by both parsers)
+# The parser is a picklable callable of one input, e.g. functools.partial(LRparse_result, ACTION, GOTO).
+# It is given to each worker once, through the pool initializer. With the 'fork' start method the
+# initializer arguments are inherited by the workers, with the tables the parser refers to, as
+# read-only memory: nothing is pickled. With other start methods it is pickled once per worker.
+# The parent process keeps no global state, so several batches can run at the same time.
+# Inputs are sent in chunks, and results come back in the order of the inputs.
+import multiprocessing
+import os
+from collections import deque
+from itertools import islice
+
+_parser = None  # Parser of this worker process, set by _initialize
+
+
+def _initialize(parser):
+    global _parser
+    _parser = parser
+
+
+def _parse_chunk(chunk):
+    return [_parser(item) for item in chunk]
+
+
+# Parse every input of an iterable and yield parser(input) for each one, in order
+# processes: number of workers (os.cpu_count() by default, 1 parses in this process)
+# chunksize: inputs per task; at most 4 tasks per worker are pending at any time, so the inputs
+# are consumed lazily and a generator of any length can be given
+def parse_batch(parser, inputs, processes=None, chunksize=256):
+    processes = processes or os.cpu_count() or 1
+    inputs = iter(inputs)
+    if processes == 1:
+        for item in inputs:
+            yield parser(item)
+        return
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    pool = context.Pool(processes, _initialize, (parser,))
+
+    try:
+        pending = deque()
+        while True:
+            while len(pending) < 4 * processes:
+                chunk = list(islice(inputs, chunksize))
+                if not chunk:
+                    break
+                pending.append(pool.apply_async(_parse_chunk, (chunk,)))
+            if not pending:
+                break
+            yield from pending.popleft().get()
+    finally:
+        pool.terminate()
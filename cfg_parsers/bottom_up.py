@@ -0,0 +1,1914 @@
+import time
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+
+from .batch_parser import parse_batch
+from .codegen import generate_lr, reduction_cycles, write_module
+from .grammar_cache import KIND_SLR, cache_path, grammar_hash, load_tables, save_tables
+from .grammar_loader import load_grammar
+from .incremental_parser import IncrementalParser
+from .instrumentation import STATS
+from .lexer import Lexer
+
+# Function to find the nullable nonterminals and the FIRST sets of each nonterminal
+# An empty production (A -> ) is the epsilon production
+# Worklist fixpoint: a nonterminal is visited again only when the FIRST set or the nullability of a
+# nonterminal used in its productions changed
+def compute_first(grammar):
+
+    first = {key: set() for key in grammar}  # 'first' dictionary initialized with nonterminals as keys
+    nullable = set()  # Nonterminals that derive the empty string
+    users = {key: set() for key in grammar}  # Nonterminals whose productions contain each nonterminal
+    for alpha, productions in grammar.items():
+        for A in productions:
+            for symbol in A:
+                if symbol in grammar:
+                    users[symbol].add(alpha)
+
+    worklist = deque(grammar)
+    queued = set(grammar)
+    while worklist:  # Continue until no changes are made
+        alpha = worklist.popleft()
+        queued.discard(alpha)
+        changed = False
+        for A in grammar[alpha]:
+            for symbol in A:
+                if symbol in grammar:  # Add FIRST(symbol) and stop unless it is nullable
+                    if not first[symbol] <= first[alpha]:
+                        first[alpha] |= first[symbol]
+                        changed = True
+                    if symbol not in nullable:
+                        break
+                else:  # A terminal ends the scan
+                    if symbol not in first[alpha]:
+                        first[alpha].add(symbol)
+                        changed = True
+                    break
+            else:  # Every symbol of A is nullable (or A is empty)
+                if alpha not in nullable:
+                    nullable.add(alpha)
+                    changed = True
+        if changed:
+            for user in users[alpha]:
+                if user not in queued:
+                    queued.add(user)
+                    worklist.append(user)
+    return first, nullable
+
+# Function to find the follow sets of each nonterminal
+# Worklist fixpoint: the productions of a nonterminal are walked again only when its FOLLOW set changed
+def compute_follow(grammar):
+
+    first, nullable = compute_first(grammar)
+    follow = {key: set() for key in grammar}  # 'follow' dictionary initialized with nonterminals as keys
+    start_symbol = list(grammar.keys())[0]  # Start symbol is the first nonterminal in the grammar
+    follow[start_symbol].add('$')  # The FOLLOW set of the start symbol includes the end-of-input symbol '$'
+
+    worklist = deque(grammar)
+    queued = set(grammar)
+    while worklist:  # Continue until no changes are made
+        alpha = worklist.popleft()
+        queued.discard(alpha)
+        for A in grammar[alpha]:  # Iterate through each production of the nonterminal
+            # Walk A from right to left keeping FIRST of the rest of the production
+            follow_set = follow[alpha]  # While the rest is nullable, FOLLOW of alpha is included
+            for symbol in reversed(A):
+                if symbol in grammar:  # If the symbol is a nonterminal (needs a FOLLOW set)
+                    # If the FOLLOW set of the nonterminal has changed, walk its productions again
+                    if not follow_set <= follow[symbol]:
+                        follow[symbol] |= follow_set
+                        if symbol not in queued:
+                            queued.add(symbol)
+                            worklist.append(symbol)
+                    if symbol in nullable:
+                        follow_set = follow_set | first[symbol]
+                    else:
+                        follow_set = first[symbol]
+                else:
+                    follow_set = {symbol}
+    return follow
+
+# Vectorized FOLLOW engine (opt-in, see the follow= argument of SLRTable and GLRTable). Needs NumPy
+# (pip install cfg-parsers[matrix]); the package itself does not. Symbols are interned to integer
+# ids and the relations are boolean matrices, the sets of terminals packed 8 per byte in every row:
+#   nullable     flag of every nonterminal
+#   BEGINS       A -> B: B can be the first nonterminal of a string derived from A
+#   FIRST        A x terminal: the terminal can start a string derived from A (begins-with closure)
+#   NEXT         B -> C: C can come right after B (only nullable symbols in between)
+#   ENDS         B -> A: B ends a production of A, so FOLLOW(A) propagates to FOLLOW(B)
+#   FOLLOW       B x terminal: FIRST of what comes after B, closed over ENDS
+# The two transitive closures are solved on the graph of strongly connected components: the
+# rows of a component are OR-ed together, then the components are OR-ed into the ones that reach
+# them one level of the graph at a time, with one NumPy operation per level
+def compute_follow_matrix(grammar):
+    import numpy as np  # Only this engine needs NumPy
+
+    nonterminals = list(grammar.keys())
+    N = {A: i for i, A in enumerate(nonterminals)}  # Nonterminal ids
+    terminals = ['$']
+    T = {'$': 0}  # Terminal ids, '$' is always 0
+    for productions in grammar.values():
+        for A in productions:
+            for symbol in A:
+                if symbol not in N and symbol not in T:
+                    T[symbol] = len(terminals)
+                    terminals.append(symbol)
+    n, t = len(nonterminals), len(terminals)
+    # Productions with nonterminals as ids >= 0 and terminals as -1 - id
+    encoded = [(N[alpha], [N[x] if x in N else -1 - T[x] for x in A])
+               for alpha, productions in grammar.items() for A in productions]
+
+    # Nullable: count the symbols of every production not yet known to be nullable
+    nullable = [False] * n
+    pending = [len(A) for _, A in encoded]
+    uses = [[] for _ in range(n)]  # Productions where each nonterminal appears (once per occurrence)
+    worklist = [alpha for alpha, A in encoded if not A]
+    for p, (alpha, A) in enumerate(encoded):
+        if all(x >= 0 for x in A):  # A terminal makes the production non-nullable
+            for x in A:
+                uses[x].append(p)
+    while worklist:
+        B = worklist.pop()
+        if nullable[B]:
+            continue
+        nullable[B] = True
+        for p in uses[B]:
+            pending[p] -= 1
+            if pending[p] == 0:
+                worklist.append(encoded[p][0])
+
+    # The relations, as lists of (row, column) pairs
+    begins, first, next_, ends = ([], []), ([], []), ([], []), ([], [])
+    follow = ([0], [0])  # '$' follows the start symbol
+    for alpha, A in encoded:
+        for x in A:  # Nullable prefix: everything up to the first non-nullable symbol begins A
+            pair = first if x < 0 else begins
+            pair[0].append(alpha)
+            pair[1].append(-1 - x if x < 0 else x)
+            if x < 0 or not nullable[x]:
+                break
+        for x in reversed(A):  # Nullable suffix: everything after the last non-nullable symbol ends A
+            if x < 0:
+                break
+            ends[0].append(x)
+            ends[1].append(alpha)
+            if not nullable[x]:
+                break
+        for i, x in enumerate(A):  # Symbols that can come right after each nonterminal
+            if x < 0:
+                continue
+            for y in A[i + 1:]:
+                pair = follow if y < 0 else next_
+                pair[0].append(x)
+                pair[1].append(-1 - y if y < 0 else y)
+                if y < 0 or not nullable[y]:
+                    break
+
+    def rows(pairs):
+        matrix = np.zeros((n, t), dtype=bool)
+        matrix[pairs[0], pairs[1]] = True
+        return np.packbits(matrix, axis=1)
+
+    FIRST = _closure_rows(n, begins, rows(first))
+    FOLLOW = rows(follow)
+    if next_[0]:
+        np.bitwise_or.at(FOLLOW, np.array(next_[0]), FIRST[next_[1]])
+    FOLLOW = np.unpackbits(_closure_rows(n, ends, FOLLOW), axis=1, count=t).astype(bool)
+
+    symbols = np.empty(t, dtype=object)
+    symbols[:] = terminals
+    return {A: set(symbols[row].tolist()) for A, row in zip(nonterminals, FOLLOW)}
+
+# Rows (a NumPy array, one row per node) OR-ed with the rows of every node reachable through the
+# edges (a pair of lists, sources and targets). The strongly connected components are found with
+# an iterative Tarjan, which numbers them in reverse topological order
+def _closure_rows(n, edges, rows):
+    import numpy as np
+
+    succ = [[] for _ in range(n)]
+    for x, y in zip(*edges):
+        succ[x].append(y)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    stack = []
+    counter = 0
+    components = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            v, i = work.pop()
+            if i == 0:
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = True
+            recurse = False
+            while i < len(succ[v]):
+                w = succ[v][i]
+                i += 1
+                if index[w] == -1:
+                    work.append((v, i))
+                    work.append((w, 0))
+                    recurse = True
+                    break
+                if on_stack[w]:
+                    low[v] = min(low[v], index[w])
+            if recurse:
+                continue
+            if low[v] == index[v]:  # v is the root of a component
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component[w] = components
+                    if w == v:
+                        break
+                components += 1
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+
+    component = np.array(component, dtype=np.intp)
+    merged = np.zeros((components, rows.shape[1]), dtype=rows.dtype)
+    np.bitwise_or.at(merged, component, rows)
+    sources = component[np.array(edges[0], dtype=np.intp)]
+    targets = component[np.array(edges[1], dtype=np.intp)]
+    between = sources != targets
+    sources, targets = sources[between], targets[between]
+    # Level of a component: 0 if it reaches no other one, else 1 + the highest level it reaches.
+    # Targets have smaller numbers than their sources, so increasing order is enough
+    level = [0] * components
+    order = np.argsort(sources, kind='stable')
+    for c, d in zip(sources[order].tolist(), targets[order].tolist()):
+        if level[d] + 1 > level[c]:
+            level[c] = level[d] + 1
+    level = np.array(level, dtype=np.intp)
+    edge_level = level[sources]
+    by_level = np.argsort(edge_level, kind='stable')
+    bounds = np.searchsorted(edge_level[by_level], np.arange(1, level.max(initial=0) + 2))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        chosen = by_level[start:end]
+        np.bitwise_or.at(merged, sources[chosen], merged[targets[chosen]])
+    return merged[component]
+
+#Function to Read any LR arbitrary augmented grammar from a file (input.txt by default), one rule
+# per line: "A -> x y | z". The file is streamed and its symbols interned by grammar_loader;
+# load_grammar(path).encoded() gives the same grammar with integer ids, which every table builder accepts
+def read_grammar(path="input.txt"):
+    return load_grammar(path).to_dict()
+
+#LR(0) items encoded as integers: the items of production A -> γ are consecutive numbers, one per
+# position of the dot, so item base + k is A -> γ[:k]‧γ[k:] and moving the dot is item + 1.
+# The lists indexed by item replace the (A, α, β) tuples: no tuple is sliced or hashed while the
+# automaton is built, and a state is a set of small ints
+#   after[item]       symbol right after the dot (None for a complete item A -> γ‧)
+#   lhs[item]         A
+#   production[item]  γ (the same tuple for all the items of a production)
+#   dot[item]         k
+# Item numbers only depend on the order of the grammar, so any LRItems(grammar) decodes the states
+# of an automaton of that grammar. New productions get new numbers at the end (see IncrementalSLR)
+class LRItems:
+    def __init__(self, grammar):
+        self.after = []
+        self.lhs = []
+        self.production = []
+        self.dot = []
+        self.starts = {}  # Nonterminal -> its items B -> ‧γ, in the order of the productions
+        self.numbers = {}  # (A, γ) -> item A -> ‧γ
+        for A, productions in grammar.items():
+            self.starts[A] = []
+            for production in productions:
+                self.add(A, production)
+
+    # Item A -> ‧production, numbering the items of the production if it is new
+    def add(self, A, production):
+        production = tuple(production)
+        base = self.numbers.get((A, production))
+        if base is None:
+            base = self.numbers[(A, production)] = len(self.after)
+            self.after.extend(production)
+            self.after.append(None)
+            self.lhs.extend([A] * (len(production) + 1))
+            self.production.extend([production] * (len(production) + 1))
+            self.dot.extend(range(len(production) + 1))
+        starts = self.starts.setdefault(A, [])
+        if base not in starts:
+            starts.append(base)
+        return base
+
+    # Production removed from the grammar: its items keep their numbers but are not expanded any more
+    def remove(self, A, production):
+        base = self.numbers.get((A, tuple(production)))
+        if base in self.starts.get(A, ()):
+            self.starts[A].remove(base)
+
+    # Item as the tuple (A, α, β)
+    def decode(self, item):
+        production, k = self.production[item], self.dot[item]
+        return self.lhs[item], production[:k], production[k:]
+
+    # Number of the item (A, α, β)
+    def encode(self, item):
+        A, alpha, beta = item
+        return self.numbers[(A, tuple(alpha) + tuple(beta))] + len(alpha)
+
+#Closure of every nonterminal B: all the items C → ‧γ reachable from B → ‧γ' by repeatedly
+# expanding the nonterminal at the start of γ' (the transitive "leftmost nonterminal" relation)
+# Entries are computed the first time they are needed and kept for the whole grammar
+# With an index (see IncrementalSLR), index[C] has the cached entries that expanded C, so the
+# entries an edit of the productions of C changes can be dropped without scanning the others
+class ClosureTable(dict):
+    def __init__(self, grammar, lr_items=None, index=None):
+        super().__init__()
+        self.grammar = grammar
+        self.lr_items = LRItems(grammar) if lr_items is None else lr_items
+        self.index = index
+
+    def __missing__(self, B):
+        starts, after = self.lr_items.starts, self.lr_items.after
+        items = set()
+        reached = {B}
+        stack = [B]
+        while stack:
+            for item in starts[stack.pop()]:
+                items.add(item)  # The item C -> .γ
+                # The leftmost symbol of γ is also expanded if it is a nonterminal
+                C = after[item]
+                if C in starts and C not in reached:
+                    reached.add(C)
+                    stack.append(C)
+        self[B] = frozenset(items)
+        if self.index is not None:
+            for C in reached:
+                self.index.setdefault(C, set()).add(B)
+        return self[B]
+
+    # Drop the entries that expanded C (the entry of C included), after an edit of its productions
+    def invalidate(self, C):
+        for B in self.index.pop(C, ()):
+            self.pop(B, None)
+
+# Closure Function for finding LR(0) Automaton States. Follows this two rules
+# Add every item in I to CLOSURE(I)
+# If A → α‧B β is in CLOSURE(I) and B → γ is a production, then add B → ‧γ to CLOSURE(I), if it is not already there
+#Involves the productions that have the dot right before the non-terminal symbol.
+# This step helps us identify all the possible items that can be derived from the current set.
+# With the ClosureTable of the grammar, the closure is the union of the cached item sets
+# of the nonterminals right after the dot. Items are the numbers of LRItems (closures.lr_items)
+def Closure(I, grammar, closures=None):
+    if closures is None:
+        closures = ClosureTable(grammar)
+    counting = STATS.enabled
+    after = closures.lr_items.after
+
+    closure = set(I)
+    expanded = set()
+    for item in I:
+        B = after[item]  # Symbol after the dot (None if there is none)
+        if B in grammar and B not in expanded:  # Check if B is a non-terminal with productions
+            expanded.add(B)
+            if counting:
+                STATS.count('closure.cache_hits' if B in closures else 'closure.cache_misses')
+            closure |= closures[B]
+
+    if counting:
+        STATS.count('closure.calls')
+    return closure
+
+#GOTO Function for finding the transitions of the LR(0) automaton (next state after each reduction)
+# GOTO(I,X) is the Closure of all items A → αX.β such as A → α‧Xβ is in I
+#In simple words: Determines the next set of items by shifting the dot one position to the right
+def GOTO(I, X, grammar, closures=None):
+    if STATS.enabled:
+        STATS.count('goto.calls')
+    if closures is None:
+        closures = ClosureTable(grammar)
+    after = closures.lr_items.after
+    # Moving the dot over X is the next item number
+    goto = {item + 1 for item in I if after[item] == X}
+
+    # Compute the closure of the resulting items
+    return Closure(goto, grammar, closures)
+
+#Build the LR(0) automaton: the canonical collection of sets of items and its transitions
+# Each state is keyed by its kernel (the items where the dot was just moved), so finding
+# the target of a GOTO is a single hash lookup, and every state is expanded exactly once
+# from a worklist. Returns the states C (sorted arrays of LRItems numbers, 4 bytes per item) and the
+# transitions {(state, symbol): state}
+def LRautomaton(grammar):
+    closures = ClosureTable(grammar)  # Closure of each nonterminal, shared by all the states
+    after = closures.lr_items.after
+    # Initialize C with the closure of the augmented start symbol S'
+    start_symbol = list(grammar.keys())[0]  # The augmented start symbol
+    kernel = frozenset({closures.lr_items.starts[start_symbol][0]})  # S' -> .S (its first production)
+    C = [array('i', sorted(Closure(kernel, grammar, closures)))]  # Start with the closure of {S' -> .S}
+    states = {kernel: 0}  # Kernel -> index of the state in C
+    transitions = {}
+
+    worklist = deque([0])
+    while worklist:
+        i = worklist.popleft()
+
+        # Move the dot over every symbol that follows it in a single pass over the items
+        moves = {}
+        for item in C[i]:
+            X = after[item]
+            if X is not None:
+                moves.setdefault(X, []).append(item + 1)
+
+        for X in sorted(moves):
+            kernel = frozenset(moves[X])
+            j = states.get(kernel)
+            if j is None:  # New state: close it and expand it later
+                j = len(C)
+                states[kernel] = j
+                C.append(array('i', sorted(Closure(kernel, grammar, closures))))
+                worklist.append(j)
+            transitions[(i, X)] = j
+
+    if STATS.enabled:
+        STATS.count('automaton.states', len(C))
+        STATS.count('automaton.transitions', len(transitions))
+    return C, transitions
+
+#Find the Collection of sets of LR(0) items
+def LRcollection(grammar):
+    C, _ = LRautomaton(grammar)
+    return C
+
+#Complete items A -> α‧ of every state of C, as (state, A, α)
+def complete_items(C, grammar):
+    items = LRItems(grammar)
+    after, lhs, production = items.after, items.lhs, items.production
+    return [(i, lhs[item], production[item]) for i, I in enumerate(C) for item in sorted(I) if after[item] is None]
+
+#Print the canonical Collection
+def PrintCollection(C, grammar):
+    items = LRItems(grammar)
+    for i, state in enumerate(C):
+        print(f"I{i}:")
+        for A, alpha, beta in sorted(map(items.decode, state)):
+            # if beta exists, dot is placed between alpha y beta
+            if beta:
+                alphaBeta = f"{' '.join(map(str, alpha))} . {' '.join(map(str, beta))}"
+            else:
+                # if beta is empty, dot is placed at the end of alpha
+                alphaBeta = f"{' '.join(map(str, alpha))} ."
+
+            # Prints the production with the dot
+            print(f"  {A} -> {alphaBeta}")
+
+#Fill ACTION and GOTO from the transitions of an automaton and its reductions
+# reductions is a list of (state, A, alpha, lookaheads): reduce by A -> α in that state on each lookahead.
+# The same function is used by the SLR, LALR(1) and LR(1) tables, which only differ in the lookaheads
+def LRtable(grammar, transitions, reductions):
+    ACTION = {}  # Dictionary to store ACTION table (shift, reduce, accept)
+    GOTO_Table = {}  # Dictionary to store GOTO table (next state transitions for nonterminals)
+    start_symbol = list(grammar.keys())[0]
+
+    conflicts = 0  # Entries overwritten by a different action (only counted when STATS is enabled)
+    counting = STATS.enabled
+
+    for i, A, alpha, lookaheads in reductions:
+        if A == start_symbol:  # If it's the start symbol, it's an acceptance action
+            ACTION[(i, '$')] = ('accept',)
+        else:  # Otherwise, reduce using the production corresponding to A -> α
+            for term in lookaheads:
+                # For each lookahead terminal, add a reduction action
+                if counting and (i, term) in ACTION and ACTION[(i, term)] != ('reduce', A, alpha):
+                    conflicts += 1
+                ACTION[(i, term)] = ('reduce', A, alpha)
+
+    # Every transition over a terminal is a shift, every transition over a nonterminal is a GOTO
+    # (shifts are added last, so they win shift/reduce conflicts)
+    for (i, X), j in transitions.items():
+        if X in grammar:
+            GOTO_Table[(i, X)] = j
+        else:
+            if counting and (i, X) in ACTION:
+                conflicts += 1
+            ACTION[(i, X)] = ('shift', j)
+
+    if counting:
+        STATS.count('table.action_entries', len(ACTION))
+        STATS.count('table.goto_entries', len(GOTO_Table))
+        STATS.count('table.conflicts', conflicts)
+    # Return the populated ACTION and GOTO tables
+    return ACTION, GOTO_Table
+
+#SLR TABLE for analyzing grammar syntax
+# automaton is the (C, transitions) pair returned by LRautomaton; it is built here if not given.
+# Shift and GOTO entries are read straight from the recorded transitions, so no GOTO is recomputed.
+# follow is the FOLLOW engine: compute_follow, or compute_follow_matrix
+def SLRTable(grammar, automaton=None, follow=compute_follow):
+    # Compute the FOLLOW set for all nonterminals
+    with STATS.phase('slr.follow'):
+        FollowSet = follow(grammar)
+
+    # Generate the LR(0) automaton (sets of items and the transitions between them)
+    if automaton is None:
+        with STATS.phase('slr.automaton'):
+            automaton = LRautomaton(grammar)
+    C, transitions = automaton
+
+    with STATS.phase('slr.table'):
+        # Every complete item A -> α . reduces on FOLLOW(A)
+        reductions = [(i, A, alpha, FollowSet[A]) for i, A, alpha in complete_items(C, grammar)]
+
+        return LRtable(grammar, transitions, reductions)
+
+#Digraph algorithm (DeRemer and Pennello): computes F(x) = F'(x) ∪ ⋃{F(y) | x R y}
+# for every node x, where R is given as {x: [y, ...]}. It is a depth-first traversal (iterative
+# here) where the nodes of a strongly connected component end up sharing the same set
+def digraph(nodes, R, F_initial):
+    F = {x: set(F_initial.get(x, ())) for x in nodes}
+    N = dict.fromkeys(nodes, 0)  # 0: not visited, depth in the stack while visiting, inf: done
+    stack = []
+
+    for root in nodes:
+        if N[root] != 0:
+            continue
+        stack.append(root)
+        N[root] = len(stack)
+        work = [(root, len(stack), iter(R.get(root, ())))]
+        while work:
+            x, depth, successors = work[-1]
+            for y in successors:
+                if N[y] == 0:  # Traverse y first, x continues when y is done
+                    stack.append(y)
+                    N[y] = len(stack)
+                    work.append((y, len(stack), iter(R.get(y, ()))))
+                    break
+                N[x] = min(N[x], N[y])
+                F[x] |= F[y]
+            else:
+                work.pop()
+                if N[x] == depth:  # x is the root of a component: its members get F(x)
+                    while True:
+                        top = stack.pop()
+                        N[top] = float('inf')
+                        if top == x:
+                            break
+                        F[top] = F[x]
+                if work:
+                    parent = work[-1][0]
+                    N[parent] = min(N[parent], N[x])
+                    F[parent] |= F[x]
+    return F
+
+#LALR(1) lookaheads over the LR(0) automaton, following DeRemer and Pennello:
+#   DR(p, A)      terminals shifted right after the transition (p, A)
+#   (p, A) reads (r, C)        r = GOTO(p, A) and C is a nullable nonterminal with a transition from r
+#   (p, A) includes (p', B)    B -> β A γ, γ nullable and p' reaches p reading β
+#   (q, A -> ω) lookback (p, A)  p reaches q reading ω
+# Read = digraph(reads, DR), Follow = digraph(includes, Read), LA(q, A -> ω) = ⋃ Follow(p, A) over lookback
+# Returns the reductions list used by LRtable
+def LALR_lookaheads(grammar, automaton):
+    C, transitions = automaton
+    _, nullable = compute_first(grammar)
+    start_symbol = list(grammar.keys())[0]
+    completed = complete_items(C, grammar)
+    accepting = {q for q, A, _ in completed if A == start_symbol}
+
+    # Transitions over nonterminals are the nodes of the relations
+    nodes = [(p, A) for (p, A) in transitions if A in grammar]
+    successors = {}
+    for (p, X), q in transitions.items():
+        successors.setdefault(p, []).append(X)
+
+    DR = {}
+    reads = {}
+    for p, A in nodes:
+        r = transitions[(p, A)]
+        DR[(p, A)] = {X for X in successors.get(r, ()) if X not in grammar}
+        # '$' is read after S' -> S . (the accepting state)
+        if r in accepting:
+            DR[(p, A)].add('$')
+        reads[(p, A)] = [(r, X) for X in successors.get(r, ()) if X in nullable]
+
+    includes = {}
+    lookback = {}
+    for p_start, B in nodes:
+        for production in grammar[B]:
+            # Walk the production from p_start through the automaton
+            p = p_start
+            states = []
+            for X in production:
+                states.append(p)
+                p = transitions[(p, X)]
+            lookback.setdefault((p, B, production), []).append((p_start, B))
+            for i, X in enumerate(production):
+                if X in grammar and all(Y in nullable for Y in production[i + 1:]):
+                    includes.setdefault((states[i], X), []).append((p_start, B))
+
+    Read = digraph(nodes, reads, DR)
+    Follow = digraph(nodes, includes, Read)
+
+    reductions = []
+    for q, A, alpha in completed:
+        lookaheads = set()
+        if A == start_symbol:
+            lookaheads.add('$')
+        for node in lookback.get((q, A, alpha), ()):
+            lookaheads |= Follow[node]
+        reductions.append((q, A, alpha, lookaheads))
+    return reductions
+
+#LALR(1) TABLE: same states as the SLR table (the LR(0) automaton), with exact lookaheads
+def LALRTable(grammar, automaton=None):
+    if automaton is None:
+        with STATS.phase('lalr.automaton'):
+            automaton = LRautomaton(grammar)
+    with STATS.phase('lalr.lookaheads'):
+        reductions = LALR_lookaheads(grammar, automaton)
+    with STATS.phase('lalr.table'):
+        return LRtable(grammar, automaton[1], reductions)
+
+#Closure of a set of LR(1) items given as {(A, α, β): lookaheads}
+# If [A → α‧Bβ, L] is in the closure and B → γ is a production, [B → ‧γ, FIRST(β L)] is added
+def LR1_closure(kernel, grammar, first, nullable):
+    items = {item: set(lookaheads) for item, lookaheads in kernel.items()}
+    worklist = list(items)
+    while worklist:
+        item = worklist.pop()
+        A, alpha, beta = item
+        if not beta or beta[0] not in grammar:
+            continue
+
+        # Lookaheads of the new items: FIRST of what follows B, and L if all of it is nullable
+        lookaheads = set()
+        for X in beta[1:]:
+            if X in grammar:
+                lookaheads |= first[X]
+                if X not in nullable:
+                    break
+            else:
+                lookaheads.add(X)
+                break
+        else:
+            lookaheads |= items[item]
+
+        for production in grammar[beta[0]]:
+            new_item = (beta[0], tuple(), production)
+            current = items.get(new_item)
+            if current is None:
+                items[new_item] = set(lookaheads)
+                worklist.append(new_item)
+            elif not lookaheads <= current:  # Lookaheads grew: propagate them again
+                current |= lookaheads
+                worklist.append(new_item)
+    return items
+
+#Pager's weak compatibility test for two LR(1) kernels with the same core
+# Merging them cannot create a reduce/reduce conflict that the canonical LR(1) automaton does not have
+def weakly_compatible(K1, K2):
+    items = list(K1)
+    for a in range(len(items)):
+        for b in range(a + 1, len(items)):
+            x, y = items[a], items[b]
+            if (K1[x] & K2[y]) or (K2[x] & K1[y]):
+                if not (K1[x] & K1[y]) and not (K2[x] & K2[y]):
+                    return False
+    return True
+
+#Build the LR(1) automaton. States are LR(1) kernels {item: lookaheads}; a new kernel is merged
+# into an existing state with the same core when they are weakly compatible (merge=True, Pager's
+# method), or only when they are identical (merge=False, canonical LR(1)). A state whose lookaheads
+# grow after a merge is expanded again, and states that end up unreachable are dropped.
+# Returns the kernels and the transitions {(state, symbol): state}
+def LR1automaton(grammar, merge=True):
+    first, nullable = compute_first(grammar)
+    start_symbol = list(grammar.keys())[0]
+    initial_item = (start_symbol, tuple(), grammar[start_symbol][0])  # [S' -> .S, $]
+    kernels = [{initial_item: {'$'}}]
+    by_core = {frozenset(kernels[0]): [0]}
+    transitions = {}
+
+    worklist = deque([0])
+    queued = {0}
+    while worklist:
+        i = worklist.popleft()
+        queued.discard(i)
+
+        moves = {}
+        for (A, alpha, beta), lookaheads in LR1_closure(kernels[i], grammar, first, nullable).items():
+            if beta:
+                X = beta[0]
+                moves.setdefault(X, {}).setdefault((A, alpha + (X,), beta[1:]), set()).update(lookaheads)
+
+        for X in sorted(moves):
+            kernel = moves[X]
+            candidates = by_core.setdefault(frozenset(kernel), [])
+            previous = transitions.get((i, X))
+            if previous in candidates:  # Prefer the state this transition already led to
+                candidates = [previous] + [k for k in candidates if k != previous]
+
+            j = None
+            for k in candidates:
+                if kernels[k] == kernel or (merge and weakly_compatible(kernels[k], kernel)):
+                    j = k
+                    break
+
+            if j is None:  # New state
+                j = len(kernels)
+                kernels.append(kernel)
+                by_core[frozenset(kernel)].append(j)
+                worklist.append(j)
+                queued.add(j)
+            else:  # Merge the lookaheads and expand the state again if they grew
+                grew = False
+                for item, lookaheads in kernel.items():
+                    if not lookaheads <= kernels[j][item]:
+                        kernels[j][item] |= lookaheads
+                        grew = True
+                if grew and j not in queued:
+                    worklist.append(j)
+                    queued.add(j)
+            transitions[(i, X)] = j
+
+    # Keep the states reachable from the initial state, numbered in breadth-first order
+    edges = {}
+    for (i, X), j in transitions.items():
+        edges.setdefault(i, []).append((X, j))
+    number = {0: 0}
+    order = deque([0])
+    while order:
+        i = order.popleft()
+        for X, j in edges.get(i, ()):
+            if j not in number:
+                number[j] = len(number)
+                order.append(j)
+
+    states = [None] * len(number)
+    for old, new in number.items():
+        states[new] = kernels[old]
+    reachable_transitions = {(number[i], X): number[j] for (i, X), j in transitions.items() if i in number}
+    return states, reachable_transitions
+
+#LR(1) TABLE. With merge=True (default) the states are merged with Pager's weak compatibility,
+# which keeps the LR(1) power with a number of states close to the LR(0) automaton;
+# merge=False builds the canonical LR(1) automaton
+def LR1Table(grammar, merge=True):
+    first, nullable = compute_first(grammar)
+    with STATS.phase('lr1.automaton'):
+        states, transitions = LR1automaton(grammar, merge)
+    STATS.count('lr1.states', len(states))
+
+    with STATS.phase('lr1.table'):
+        reductions = []
+        for i, kernel in enumerate(states):
+            for (A, alpha, beta), lookaheads in LR1_closure(kernel, grammar, first, nullable).items():
+                if not beta:
+                    reductions.append((i, A, alpha, lookaheads))
+        return LRtable(grammar, transitions, reductions)
+
+#Incremental SLR tables: productions can be added or removed and only what they affect is updated
+#   - FIRST/nullable are recomputed for the nonterminals that use the changed one (transitively),
+#     and FOLLOW for the nonterminals those changes can reach
+#   - the cached closures that expanded the changed nonterminal are dropped (closures.index)
+#   - the LR(0) states whose closure expanded the changed nonterminal gain or lose the items of
+#     the production, and the targets of their transitions on the symbols after those items are
+#     looked up by their new kernel; new kernels become new states (states are keyed by kernel,
+#     as in LRautomaton), which are closed and filled in full
+#   - only the ACTION/GOTO cells of those transitions and reductions, and of the terminals a
+#     FOLLOW set gained or lost in the states that reduce it, are written again
+# State numbers never change, so ACTION and GOTO stay valid for LRparser between edits. States that
+# an edit makes unreachable are kept (their rows are never used)
+class IncrementalSLR:
+    def __init__(self, grammar):
+        self.grammar = {A: list(productions) for A, productions in grammar.items()}
+        self.start_symbol = list(self.grammar.keys())[0]
+        self.uses = {}  # uses[Y][X]: occurrences of the nonterminal Y in the productions of X
+        for A, productions in self.grammar.items():
+            for production in productions:
+                self._count_uses(A, production, 1)
+
+        self.first, self.nullable = compute_first(self.grammar)
+        self.follow = compute_follow(self.grammar)
+
+        self.closures = ClosureTable(self.grammar, index={})
+        self.lr_items = self.closures.lr_items  # Numbers of the items (the new productions get new ones)
+        self.kernels = []  # Kernel of every state
+        self.C = []  # Closure of every state
+        self.states = {}  # Kernel -> state
+        self.edges = []  # Transitions of every state {symbol: state}
+        self.expanded = []  # Nonterminals right after a dot in every state
+        self.expanders = {}  # Nonterminal -> states that expand it (cached closures: closures.index)
+        self.reducers = {}  # Nonterminal -> states with a complete item of it
+        self.rows = []  # ACTION/GOTO keys written for every state (a set each)
+        self.ACTION = {}
+        self.GOTO_Table = {}
+
+        self._new_state(frozenset({self.lr_items.starts[self.start_symbol][0]}))  # S' -> .S
+        self._update_automaton([0])
+        for i in range(len(self.C)):
+            self._fill_row(i)
+
+    # ACTION and GOTO tables (the same dicts are patched by every edit)
+    def tables(self):
+        return self.ACTION, self.GOTO_Table
+
+    # Transitions {(state, symbol): state}, as returned by LRautomaton
+    @property
+    def transitions(self):
+        return {(i, X): j for i, edges in enumerate(self.edges) for X, j in edges.items()}
+
+    # Add the production A -> production (A may be a new nonterminal); returns the patched states
+    def add_production(self, A, production):
+        production = tuple(production)
+        if A not in self.grammar:
+            if any(A in p for productions in self.grammar.values() for p in productions):
+                raise ValueError(f"{A!r} is already used as a terminal")
+            self.grammar[A] = []
+            self.first[A] = set()
+            self.follow[A] = set()
+        if production in self.grammar[A]:
+            return set()
+        self.grammar[A].append(production)
+        self.lr_items.add(A, production)
+        self._count_uses(A, production, 1)
+        return self._update(A, production, False)
+
+    # Remove the production A -> production; returns the patched states
+    def remove_production(self, A, production):
+        production = tuple(production)
+        self.grammar[A].remove(production)  # ValueError if A has no such production
+        self.lr_items.remove(A, production)
+        self._count_uses(A, production, -1)
+        return self._update(A, production, True)
+
+    def _count_uses(self, A, production, n):
+        for X in production:
+            if X in self.grammar:
+                uses = self.uses.setdefault(X, {})
+                uses[A] = uses.get(A, 0) + n
+                if not uses[A]:
+                    del uses[A]
+
+    def _update(self, A, production, removed):
+        changed_first = self._update_first(A, removed)
+        changed_follow = self._update_follow(changed_first, A, production, removed)
+
+        # A FOLLOW set that changed only changes the reductions on the terminals it gained or lost
+        # (taken before the states are patched, so a state that stops reducing B is included)
+        cells = {}
+        for B, previous in changed_follow.items():
+            delta = previous ^ self.follow[B]
+            for i in self.reducers.get(B, ()):
+                cells.setdefault(i, set()).update(delta)
+
+        self.closures.invalidate(A)
+        base = self.lr_items.numbers[(A, production)]
+        created = []
+        for i in sorted(self.expanders.get(A, ())):
+            if removed:
+                items = self._removed_items(i, A, base)
+            else:
+                items = {base}
+                if production and production[0] in self.grammar and production[0] not in self.expanded[i]:
+                    items |= self.closures[production[0]]
+                items -= self.C[i]
+            cells.setdefault(i, set()).update(self._patch_state(i, items, removed, A, created))
+
+        filled = self._update_automaton(created)
+        for i in filled:
+            self._fill_row(i)
+        for i, terminals in cells.items():
+            self._fill_cells(i, terminals)
+        return set(filled) | set(cells)
+
+    # Nonterminals that reach one of `seeds` through relation (seeds included)
+    @staticmethod
+    def _reach(seeds, relation):
+        reached = set(seeds)
+        stack = list(seeds)
+        while stack:
+            for Y in relation(stack.pop()):
+                if Y not in reached:
+                    reached.add(Y)
+                    stack.append(Y)
+        return reached
+
+    # Nonterminals with a production where X comes after nonterminals only (their FIRST can
+    # include FIRST(X), whatever is nullable)
+    def _left_users(self, X):
+        for Y in self.uses.get(X, ()):
+            if any(X in production[:self._leading(production)] for production in self.grammar[Y]):
+                yield Y
+
+    # Length of the prefix of a production before its first terminal
+    def _leading(self, production):
+        for k, symbol in enumerate(production):
+            if symbol not in self.grammar:
+                return k
+        return len(production)
+
+    # Nonterminals at the end of a production of Y, after which there are only nonterminals
+    # (FOLLOW(Y) can flow into theirs, whatever is nullable)
+    def _right_symbols(self, Y):
+        for production in self.grammar[Y]:
+            for symbol in reversed(production):
+                if symbol not in self.grammar:
+                    break
+                yield symbol
+
+    # FIRST and nullable after an edit of the productions of A, with the worklist of compute_first:
+    # a nonterminal is evaluated again only when the FIRST or the nullability of one it uses
+    # changed. An addition only makes the sets grow, so the worklist starts from A alone; after a
+    # removal, the nonterminals that can begin with A (the only ones that can lose something) are
+    # reset and evaluated again. Returns the nonterminals whose FIRST or nullable changed
+    def _update_first(self, A, removed):
+        old = {}  # Nonterminal -> (FIRST, nullable) before the edit, once it changed
+        if removed:
+            affected = self._reach([A], self._left_users)
+            for X in affected:
+                old[X] = (self.first[X], X in self.nullable)
+                self.first[X] = set()
+                self.nullable.discard(X)
+        else:
+            affected = {A}
+        worklist = deque(affected)
+        queued = set(affected)
+        while worklist:
+            alpha = worklist.popleft()
+            queued.discard(alpha)
+            first_set = set()
+            nullable = False
+            for production in self.grammar[alpha]:
+                for symbol in production:
+                    if symbol in self.grammar:
+                        first_set |= self.first[symbol]
+                        if symbol not in self.nullable:
+                            break
+                    else:
+                        first_set.add(symbol)
+                        break
+                else:
+                    nullable = True
+            if first_set == self.first[alpha] and nullable == (alpha in self.nullable):
+                continue
+            old.setdefault(alpha, (self.first[alpha], alpha in self.nullable))
+            self.first[alpha] = first_set
+            if nullable:
+                self.nullable.add(alpha)
+            else:
+                self.nullable.discard(alpha)
+            for user in self.uses.get(alpha, ()):
+                if user not in queued and (not removed or user in affected):
+                    queued.add(user)
+                    worklist.append(user)
+        return {X for X, (first, nullable) in old.items() if (first, nullable) != (self.first[X], X in self.nullable)}
+
+    # FOLLOW after an edit of A -> production, with the worklist of compute_follow: the walk starts
+    # from the productions of A and of the nonterminals that use one whose FIRST changed, and goes
+    # on to a nonterminal only when its FOLLOW grew. After a removal, the nonterminals that can
+    # lose something (those of the production, those before a nonterminal whose FIRST changed with
+    # only nullable ones in between, and everything their FOLLOW flows into) are reset first, and
+    # the productions where they appear are walked too. Returns {nonterminal: FOLLOW before the
+    # edit} of the ones that changed
+    def _update_follow(self, changed_first, A, production, removed):
+        old = {}
+        walk = {A} | {X for Z in changed_first for X in self.uses.get(Z, ())}
+        if removed:
+            lost = {X for X in production if X in self.grammar}
+            for Z in changed_first:
+                for X in self.uses.get(Z, ()):
+                    for p in self.grammar[X]:
+                        for k, symbol in enumerate(p):
+                            if symbol == Z:
+                                for Y in reversed(p[:k]):
+                                    if Y not in self.grammar:
+                                        break
+                                    lost.add(Y)
+                                    if Y not in self.nullable:
+                                        break
+            for Y in self._reach(lost, self._right_symbols):
+                old[Y] = self.follow[Y]
+                self.follow[Y] = {'$'} if Y == self.start_symbol else set()
+                walk.update(self.uses.get(Y, ()))
+
+        worklist = deque(X for X in self.grammar if X in walk)  # In the order of compute_follow
+        queued = set(walk)
+        while worklist:
+            alpha = worklist.popleft()
+            queued.discard(alpha)
+            for production in self.grammar[alpha]:
+                follow_set = self.follow[alpha]  # While the rest is nullable, FOLLOW of alpha is included
+                for symbol in reversed(production):
+                    if symbol in self.grammar:
+                        if not follow_set <= self.follow[symbol]:
+                            if symbol not in old:  # Copied, so the set before the edit is kept
+                                old[symbol] = self.follow[symbol]
+                                self.follow[symbol] = set(old[symbol])
+                            self.follow[symbol] |= follow_set
+                            if symbol not in queued:
+                                queued.add(symbol)
+                                worklist.append(symbol)
+                        if symbol in self.nullable:
+                            follow_set = follow_set | self.first[symbol]
+                        else:
+                            follow_set = self.first[symbol]
+                    else:
+                        follow_set = {symbol}
+        return {Y: previous for Y, previous in old.items() if previous != self.follow[Y]}
+
+    def _new_state(self, kernel):
+        i = len(self.C)
+        self.kernels.append(kernel)
+        self.states[kernel] = i
+        self.C.append(set())
+        self.edges.append({})
+        self.expanded.append(set())
+        self.rows.append(set())
+        return i
+
+    # Items of state i that the removal of the production `base` of A takes away: only the item
+    # A -> ‧γ, unless γ starts with another nonterminal (then the kernel is closed again)
+    def _removed_items(self, i, A, base):
+        production = self.lr_items.production[base]
+        if not production or production[0] not in self.grammar or production[0] == A:
+            return {base}
+        return self.C[i] - Closure(self.kernels[i], self.grammar, self.closures)
+
+    # Add (or remove) items to (from) the closure of state i, which expands A: the transitions
+    # on the symbols after those items go to the state of the kernel with (without) their moved
+    # items, made a new state (appended to `created`) if there is none. GOTO cells are written
+    # here; returns the terminals whose ACTION cells must be written again
+    def _patch_state(self, i, items, removed, A, created):
+        after, lhs = self.lr_items.after, self.lr_items.lhs
+        closure, edges = self.C[i], self.edges[i]
+        moves = {}
+        terminals = set()
+        complete = set()
+        for item in items:
+            X = after[item]
+            if X is None:
+                complete.add(lhs[item])
+                terminals |= self.follow[lhs[item]]
+            else:
+                moves.setdefault(X, set()).add(item + 1)
+        if removed:
+            closure -= items
+            # A stays expanded: the items that expanded it do not come from its productions
+            lost = {X for X in moves if X in self.grammar and X != A}
+            if lost:
+                lost -= {after[item] for item in closure}
+            if complete:
+                complete -= {lhs[item] for item in closure if after[item] is None}
+            self.expanded[i] -= lost
+            for X in lost:
+                self.expanders[X].discard(i)
+            for B in complete:
+                self.reducers[B].discard(i)
+        else:
+            closure |= items
+            for X in moves:
+                if X in self.grammar and X not in self.expanded[i]:
+                    self.expanded[i].add(X)
+                    self.expanders.setdefault(X, set()).add(i)
+            for B in complete:
+                self.reducers.setdefault(B, set()).add(i)
+
+        for X, moved in moves.items():
+            kernel = self.kernels[edges[X]] if X in edges else frozenset()
+            kernel = kernel - moved if removed else kernel | moved
+            if kernel:
+                j = self.states.get(kernel)
+                if j is None:
+                    j = self._new_state(kernel)
+                    created.append(j)
+                edges[X] = j
+            else:
+                del edges[X]
+            if X not in self.grammar:
+                terminals.add(X)
+            elif X in edges:
+                self.GOTO_Table[(i, X)] = edges[X]
+                self.rows[i].add((i, X))
+            else:
+                self.GOTO_Table.pop((i, X), None)
+                self.rows[i].discard((i, X))
+        return terminals
+
+    # Close the given states again and (re)compute their transitions, creating the new states
+    # they lead to (which are expanded too). Returns every state that was closed
+    def _update_automaton(self, states):
+        after, lhs = self.lr_items.after, self.lr_items.lhs
+        worklist = deque(states)
+        done = []
+        while worklist:
+            i = worklist.popleft()
+            closure = Closure(self.kernels[i], self.grammar, self.closures)
+            done.append(i)
+
+            # Index the nonterminals expanded and reduced by the state
+            for B in self.expanded[i]:
+                self.expanders[B].discard(i)
+            for item in self.C[i]:
+                if after[item] is None:
+                    self.reducers[lhs[item]].discard(i)
+            self.C[i] = closure
+            self.expanded[i] = {after[item] for item in closure if after[item] in self.grammar}
+            for B in self.expanded[i]:
+                self.expanders.setdefault(B, set()).add(i)
+            for item in closure:
+                if after[item] is None:
+                    self.reducers.setdefault(lhs[item], set()).add(i)
+
+            moves = {}
+            for item in closure:
+                X = after[item]
+                if X is not None:
+                    moves.setdefault(X, []).append(item + 1)
+            edges = {}
+            for X in sorted(moves):
+                kernel = frozenset(moves[X])
+                j = self.states.get(kernel)
+                if j is None:  # New state: close it and expand it later
+                    j = self._new_state(kernel)
+                    worklist.append(j)
+                edges[X] = j
+            self.edges[i] = edges
+        return done
+
+    # Write the ACTION/GOTO row of state i (as LRtable does: reductions on FOLLOW, then shifts and GOTOs)
+    def _fill_row(self, i):
+        for key in self.rows[i]:
+            self.ACTION.pop(key, None)
+            self.GOTO_Table.pop(key, None)
+        row = []
+        after, lhs, production = self.lr_items.after, self.lr_items.lhs, self.lr_items.production
+        for item in sorted(self.C[i]):
+            if after[item] is not None:
+                continue
+            A, alpha = lhs[item], production[item]
+            if A == self.start_symbol:
+                self.ACTION[(i, '$')] = ('accept',)
+                row.append((i, '$'))
+            else:
+                for term in self.follow[A]:
+                    self.ACTION[(i, term)] = ('reduce', A, alpha)
+                    row.append((i, term))
+        for X, j in self.edges[i].items():
+            if X in self.grammar:
+                self.GOTO_Table[(i, X)] = j
+            else:
+                self.ACTION[(i, X)] = ('shift', j)
+            row.append((i, X))
+        self.rows[i] = set(row)
+
+    # Write the ACTION entries of state i for some terminals only, as _fill_row would write them
+    # (the last complete item in order whose FOLLOW has the terminal, unless the terminal is shifted)
+    def _fill_cells(self, i, terminals):
+        after, lhs, production = self.lr_items.after, self.lr_items.lhs, self.lr_items.production
+        complete = sorted(item for item in self.C[i] if after[item] is None)
+        edges, row = self.edges[i], self.rows[i]
+        for term in terminals:
+            action = None
+            if term in edges:
+                action = ('shift', edges[term])
+            else:
+                for item in complete:
+                    A = lhs[item]
+                    if A == self.start_symbol:
+                        if term == '$':
+                            action = ('accept',)
+                    elif term in self.follow[A]:
+                        action = ('reduce', A, production[item])
+            if action is None:
+                self.ACTION.pop((i, term), None)
+                row.discard((i, term))
+            else:
+                self.ACTION[(i, term)] = action
+                row.add((i, term))
+
+
+#GLR TABLE: the SLR table over the LR(0) automaton, but every cell keeps all its actions
+# (ACTION[(state, terminal)] is a tuple of actions) instead of the last one written.
+# Cells with more than one action are the conflicts that SLRTable overwrites
+def GLRTable(grammar, automaton=None, follow=compute_follow):
+    FollowSet = follow(grammar)
+    if automaton is None:
+        automaton = LRautomaton(grammar)
+    C, transitions = automaton
+    start_symbol = list(grammar.keys())[0]
+
+    ACTION = {}
+    GOTO_Table = {}
+    for i, A, alpha in complete_items(C, grammar):
+        if A == start_symbol:
+            ACTION.setdefault((i, '$'), []).append(('accept',))
+        else:
+            for term in FollowSet[A]:
+                ACTION.setdefault((i, term), []).append(('reduce', A, alpha))
+    for (i, X), j in transitions.items():
+        if X in grammar:
+            GOTO_Table[(i, X)] = j
+        else:
+            ACTION.setdefault((i, X), []).append(('shift', j))
+    return {key: tuple(actions) for key, actions in ACTION.items()}, GOTO_Table
+
+#Node of the graph-structured stack: a state and the nodes below it (one per stack sharing it)
+class GSSNode:
+    __slots__ = ('state', 'below', 'linear')
+
+    def __init__(self, state, below, linear=False):
+        self.state = state
+        self.below = below  # Set of nodes
+        self.linear = linear  # True if there is a single stack under the node
+
+#GLR parser (Tomita) for tables with conflicts, from GLRTable. Returns (True, None) if the tokens
+# (any iterable, without the final '$') are a sentence of the grammar, else (False, position).
+# While every cell has a single action, it runs as the deterministic LR parser on a list of states.
+# At a conflict the stack becomes a graph-structured stack where the stacks of all the possible
+# parses share their common parts; when they die out down to one again, it goes back to the list.
+# A chain of reductions that goes on too long without a shift is also left to the GLR part, since
+# with a cyclic grammar (A =>+ A) it may never end.
+# Every reduction of a level is done again until no node or edge is added (an edge added to a node
+# opens new paths for the reductions already done), so empty and ambiguous productions are
+# handled. The time is polynomial in the input length (the degree grows with the longest production)
+def GLRparser(tokens, ACTION, GOTO):
+    tokens = iter(tokens)
+    stack = [0]
+    position = 0
+    a = next(tokens, '$')
+    reductions = 0  # Reductions since the last shift
+    limit = 64
+    while True:
+        actions = ACTION.get((stack[-1], a))
+        if actions is None:
+            return False, position
+        if len(actions) > 1 or reductions > limit:  # Go on with all the actions over a graph-structured stack
+            below = None
+            for state in stack:
+                below = GSSNode(state, {below} if below is not None else set(), True)
+            result = _GLR_conflict(below, a, position, tokens, ACTION, GOTO)
+            if len(result) == 2:
+                return result
+            stack, position, a = result
+            reductions = 0
+            limit = 2 * len(stack) + 64
+            continue
+
+        action = actions[0]
+        if action[0] == 'shift':
+            stack.append(action[1])
+            position += 1
+            a = next(tokens, '$')
+            reductions = 0
+            limit = 2 * len(stack) + 64
+        elif action[0] == 'reduce':
+            if action[2]:
+                del stack[-len(action[2]):]
+            state = GOTO.get((stack[-1], action[1]))
+            if state is None:
+                return False, position
+            stack.append(state)
+            reductions += 1
+        else:
+            return True, None
+
+#GLR part of GLRparser, from a conflict at token a. Returns (accepted, position) when the input
+# ends, or (stack, position, token) to go back to the deterministic parser
+def _GLR_conflict(top, a, position, tokens, ACTION, GOTO):
+    level = {top.state: top}  # Nodes of the current position, by state
+    while True:
+        # Reductions. A new node does all its reductions; new edges under an existing node are
+        # collected and add only the paths that start with them. If a node of this level is above
+        # that node (after an empty reduction), its paths may go through the new edges too, and
+        # then every node of the level does its reductions again
+        new = {node: None for node in level.values()}  # Node -> its edges still to follow (None: all)
+        queue = deque(level.values())
+        while queue:
+            node = queue.popleft()
+            first = new.pop(node)
+            for action in ACTION.get((node.state, a), ()):
+                if action[0] == 'accept':
+                    return True, None
+                if action[0] != 'reduce' or (first is not None and not action[2]):
+                    continue
+                ends = {node} if first is None else first
+                for _ in range(len(action[2]) - (first is not None)):  # Ends of the paths of len(β) edges
+                    ends = {below for end in ends for below in end.below}
+                for end in ends:
+                    state = GOTO.get((end.state, action[1]))
+                    if state is None:
+                        continue
+                    target = level.get(state)
+                    if target is None:
+                        target = level[state] = GSSNode(state, {end})
+                        new[target] = None
+                        queue.append(target)
+                    elif end not in target.below:
+                        target.below.add(end)
+                        if any(target in other.below for other in level.values()):
+                            for other in level.values():
+                                if other not in new:
+                                    queue.append(other)
+                                new[other] = None
+                        elif target not in new:
+                            new[target] = {end}
+                            queue.append(target)
+                        elif new[target] is not None:
+                            new[target].add(end)
+
+        # The nodes of this position are final: mark the ones with a single stack under them
+        # (the first node may have got more edges since it was marked)
+        for node in level.values():
+            node.linear = False
+        pending = True
+        while pending:
+            pending = False
+            for node in level.values():
+                if not node.linear and len(node.below) == 1 and next(iter(node.below)).linear:
+                    node.linear = pending = True
+
+        # Shifts
+        shifted = {}
+        for node in level.values():
+            for action in ACTION.get((node.state, a), ()):
+                if action[0] == 'shift':
+                    target = shifted.get(action[1])
+                    if target is None:
+                        shifted[action[1]] = GSSNode(action[1], {node})
+                    else:
+                        target.below.add(node)
+        if not shifted:
+            return False, position
+        level = shifted
+        position += 1
+        a = next(tokens, '$')
+
+        # A single stack left: back to the deterministic parser
+        if len(level) == 1:
+            node = next(iter(level.values()))
+            if len(node.below) == 1 and next(iter(node.below)).linear:
+                stack = []
+                while node is not None:
+                    stack.append(node.state)
+                    node = next(iter(node.below)) if node.below else None
+                stack.reverse()
+                return stack, position, a
+
+#Kinds of entries stored in a compiled SLR table file, one record (state, symbol, kind, value) each
+SHIFT, REDUCE, ACCEPT, GOTO_ENTRY = 0, 1, 2, 3
+
+#SLR table backed by the on-disk cache of grammar_cache: if this grammar (same content hash)
+# was compiled before, ACTION and GOTO are read from the cache file and nothing is generated
+def cached_SLRTable(grammar, cache_dir=None):
+    digest = grammar_hash(grammar, KIND_SLR)
+    path = cache_path(digest, cache_dir)
+    productions = [(A, production) for A, rules in grammar.items() for production in rules]
+
+    def decode(symbols, records):
+        ACTION, GOTO_Table = {}, {}
+        for state, symbol, kind, value in records:
+            if kind == SHIFT:
+                ACTION[(state, symbols[symbol])] = ('shift', value)
+            elif kind == REDUCE:
+                A, alpha = productions[value]
+                ACTION[(state, symbols[symbol])] = ('reduce', A, alpha)
+            elif kind == ACCEPT:
+                ACTION[(state, symbols[symbol])] = ('accept',)
+            else:
+                GOTO_Table[(state, symbols[symbol])] = value
+        return ACTION, GOTO_Table
+
+    # A missing, stale or corrupt file is rebuilt and overwritten
+    loaded = load_tables(path, KIND_SLR, digest, decode)
+    if loaded is not None:
+        return loaded
+
+    ACTION, GOTO_Table = SLRTable(grammar)
+
+    # Intern the symbols and the productions to store the tables as integers
+    symbols = list(dict.fromkeys([*grammar, *(X for _, production in productions for X in production), '$']))
+    symbol_id = {X: i for i, X in enumerate(symbols)}
+    production_id = {production: i for i, production in enumerate(productions)}
+    records = []
+    for (state, symbol), action in ACTION.items():
+        if action[0] == 'shift':
+            records += (state, symbol_id[symbol], SHIFT, action[1])
+        elif action[0] == 'reduce':
+            records += (state, symbol_id[symbol], REDUCE, production_id[(action[1], action[2])])
+        else:
+            records += (state, symbol_id[symbol], ACCEPT, 0)
+    for (state, symbol), next_state in GOTO_Table.items():
+        records += (state, symbol_id[symbol], GOTO_ENTRY, next_state)
+
+    try:
+        save_tables(path, KIND_SLR, digest, symbols, records, 4)
+    except OSError as error:  # The cache is an optimization, a read-only disk is not an error
+        print(f"Warning: could not save the compiled tables: {error}")
+    return ACTION, GOTO_Table
+
+# Sort key of a table entry ((state, symbol), value): the symbols of an encoded grammar are ids,
+# but '$' stays a string, so ids go first and strings after them
+def _entry_order(entry):
+    state, symbol = entry[0]
+    return state, isinstance(symbol, str), symbol
+
+#Print ACTION and GOTO table in desired format
+def print_SLR_table(ACTION, GOTO):
+    print("ACTION Table:")
+    print("{:<10} {:<10} {:<15}".format("State", "Symbol", "Action"))
+    for (state, symbol), action in sorted(ACTION.items(), key=_entry_order):
+        action_type = action[0]
+        if action_type == 'shift':
+            print("{:<10} {:<10} {:<15}".format(state, symbol, f"shift {action[1]}"))
+        elif action_type == 'reduce':
+            print("{:<10} {:<10} {:<15}".format(state, symbol, f"reduce {action[1]} -> {action[2]}"))
+        elif action_type == 'accept':
+            print("{:<10} {:<10} {:<15}".format(state, symbol, "accept"))
+
+    print("\nGOTO Table:")
+    print("{:<10}{:<10}  {:<15}".format("State", "Non-Terminal", "Goto State"))
+    for (state, non_terminal), next_state in sorted(GOTO.items(), key=_entry_order):
+        print("{:<10} {:<10}  {:<15}".format(state, non_terminal, next_state))
+
+#Tokens of an input string for the tables ACTION, as the top-down analyze_string splits them:
+# the words between spaces when every word is a terminal, otherwise the tokens of a lexer of the
+# terminals of ACTION (longest terminal first, so "id+id" is id + id). A character where no
+# terminal starts gives the token None, which is rejected. lexer is the LRlexer of ACTION, built
+# once by the callers that tokenize many strings with the same tables
+def LRtokens(w, ACTION, lexer=None):
+    if lexer is None:
+        lexer = LRlexer(ACTION)
+    tokens = w.split()
+    terminals = set(lexer.terminals)
+    if all(token in terminals for token in tokens):
+        return tokens
+    return list(lexer.tokens(w))
+
+#Lexer of the terminals of the tables ACTION (every terminal has an ACTION column, '$' is skipped)
+def LRlexer(ACTION):
+    return Lexer(dict.fromkeys(a for _, a in ACTION))
+
+#LR Parser for accepting or rejecting a w string in a grammar
+#Analyzes input text from left to right to produce a rightmost derivation in reverse
+# Nothing is printed: trace is an optional callback that receives one event tuple per step
+# (see print_trace for the events), e.g. trace=print_trace or trace=events.append
+# tree is an optional ParseTree that receives the parse tree (tree.root once accepted)
+# lexer is an optional LRlexer(ACTION), to tokenize many strings without building it every time
+def LRparser(w, ACTION, GOTO, trace=None, tree=None, lexer=None):
+    stack = [0]  # The stack starts with state 0 (initial state)
+    nodes = []  # Tree nodes of the symbols in the stack (only if a tree is built)
+    w = LRtokens(w, ACTION, lexer) + ["$"]  # Split the input string into tokens and add the end-of-input symbol '$'
+    idx = 0  # Index to iterate over the input tokens
+    a = w[idx]  # The first token in the input string
+
+    counting = STATS.enabled  # Shifts, reductions and time are recorded in STATS when enabled
+    if counting:
+        start, reductions = time.perf_counter(), 0
+
+    while True:
+        s = stack[-1]  # The current state is the last element in the stack
+
+        # Check which action to take based on the current state and input symbol
+        action = ACTION.get((s, a))
+
+        if action is None:
+            # If no action is found, it means there's an error in the parsing process
+            if trace is not None:
+                trace(('error', idx, tuple(stack), a))
+            if counting:
+                record_parse(start, idx, reductions)
+            return False
+
+        if action[0] == "shift":
+            # If the action is "shift", push the current token and the new state onto the stack
+            if trace is not None:
+                trace(('shift', idx, tuple(stack), a, action[1]))
+            stack.append(a)  # Push the token onto the stack
+            stack.append(action[1])  # Push the new state onto the stack
+            if tree is not None:
+                nodes.append(tree.add(a, idx, idx + 1))
+            idx += 1  # Move to the next token in the input
+            a = w[idx] if idx < len(w) else "$"  # If no more input, set the symbol to the end-of-input '$'
+
+        elif action[0] == "reduce":
+            # If the action is "reduce", apply the corresponding production rule
+            A, beta = action[1], action[2]
+            if counting:
+                reductions += 1
+            before = tuple(stack) if trace is not None else None
+
+            # Pop 2 * len(beta) elements from the stack (removing the symbols and states)
+            if beta:
+                del stack[-2 * len(beta):]
+
+            # Get the state after the reduction
+            state = stack[-1]
+            new_state = GOTO.get((state, A))  # Look up the next state in the GOTO table
+
+            if new_state is None:
+                # If no valid GOTO state is found, there's an error
+                if trace is not None:
+                    trace(('error', idx, tuple(stack), A))
+                if counting:
+                    record_parse(start, idx, reductions)
+                return False
+
+            if trace is not None:
+                trace(('reduce', idx, before, A, beta, new_state))
+            # Push the nonterminal A and the new state onto the stack
+            stack.append(A)
+            stack.append(new_state)  # Add the new state for the nonterminal A
+            if tree is not None:
+                children = nodes[len(nodes) - len(beta):]
+                del nodes[len(nodes) - len(beta):]
+                nodes.append(tree.reduce(A, children, idx))
+
+        elif action[0] == "accept":
+            # If the action is "accept", the input is successfully parsed
+            if trace is not None:
+                trace(('accept', idx, tuple(stack)))
+            if tree is not None:
+                tree.root_id = nodes[-1]
+            if counting:
+                record_parse(start, idx, reductions)
+            return True
+
+#Add the time, shifts and reductions of an LRparser run to STATS
+def record_parse(start, shifts, reductions):
+    STATS.add_time('lr_parse', time.perf_counter() - start)
+    STATS.count('lr_parse.shifts', shifts)
+    STATS.count('lr_parse.reductions', reductions)
+
+#Trace callback that prints the steps of a parse. The events are tuples:
+#   ('shift', position, stack, token, state)      token shifted, going to state
+#   ('reduce', position, stack, A, beta, state)   reduction by A -> beta, then GOTO state
+#   ('accept', position, stack)
+#   ('error', position, stack, symbol)             no ACTION for the token (or no GOTO for A)
+# position is the index of the current token and stack is a snapshot taken before the step
+def print_trace(event):
+    kind, position, stack = event[:3]
+    if kind == 'shift':
+        print(f"\nStack: {list(stack)}, Position: {position}, Current symbol: {event[3]}")
+        print(f"Shift: '{event[3]}' -> State {event[4]}")
+    elif kind == 'reduce':
+        print(f"\nStack: {list(stack)}, Position: {position}")
+        print(f"Reduce using {event[3]} -> {' '.join(event[4])}")
+        print(f"GOTO: Move to state {event[5]} after reduction")
+    elif kind == 'accept':
+        print(f"String accepted. Final stack: {list(stack)}")
+    else:
+        print(f"\nStack: {list(stack)}, Position: {position}, Current symbol: {event[3]}")
+        print("Error: No action found. The string is not accepted.")
+
+#Push-mode LR parser: tokens are given with feed() as they arrive, and finish() ends the input with '$'
+# Only the stack of states is kept (the symbols are implied by them), so the memory used
+# depends on the depth of the stack and not on the length of the input
+class LRPushParser:
+    def __init__(self, ACTION, GOTO, trace=None, tree=None):
+        self.ACTION = ACTION
+        self.GOTO = GOTO
+        self.trace = trace  # Optional callback for the events of print_trace (the stack holds states only)
+        self.tree = tree  # Optional ParseTree that receives the parse tree (tree.root once accepted)
+        self.nodes = []  # Tree nodes of the states in the stack (except state 0)
+        self.reductions = 0  # Number of reductions done so far
+        self.stack = [0]  # The stack starts with state 0 (initial state)
+        self.position = 0  # Number of tokens shifted so far (position of the error if rejected)
+        self.accepted = None  # None while the input is not finished, then True or False
+
+    # Process the tokens of any iterable; returns False as soon as the input is rejected
+    def feed(self, tokens):
+        if STATS.enabled:
+            with self.recorded():
+                for a in tokens:
+                    if self.accepted is not None:
+                        break
+                    self.push(a)
+        else:
+            for a in tokens:
+                if self.accepted is not None:
+                    break
+                self.push(a)
+        return self.accepted is not False
+
+    # Context manager that adds the time, shifts and reductions of a block to STATS
+    @contextmanager
+    def recorded(self):
+        position, reductions = self.position, self.reductions
+        with STATS.phase('lr_parse'):
+            yield
+        STATS.count('lr_parse.shifts', self.position - position)
+        STATS.count('lr_parse.reductions', self.reductions - reductions)
+
+    # Reduce until the token a is shifted (or the input is accepted or rejected)
+    def push(self, a):
+        ACTION, GOTO, stack, trace, tree = self.ACTION, self.GOTO, self.stack, self.trace, self.tree
+        while True:
+            action = ACTION.get((stack[-1], a))
+            if action is None:
+                if trace is not None:
+                    trace(('error', self.position, tuple(stack), a))
+                self.accepted = False
+                return
+            if action[0] == "shift":
+                if trace is not None:
+                    trace(('shift', self.position, tuple(stack), a, action[1]))
+                stack.append(action[1])
+                if tree is not None:
+                    self.nodes.append(tree.add(a, self.position, self.position + 1))
+                self.position += 1
+                return
+            if action[0] == "reduce":
+                before = tuple(stack) if trace is not None else None
+                if action[2]:
+                    del stack[-len(action[2]):]
+                new_state = GOTO.get((stack[-1], action[1]))
+                if new_state is None:
+                    if trace is not None:
+                        trace(('error', self.position, tuple(stack), action[1]))
+                    self.accepted = False
+                    return
+                if trace is not None:
+                    trace(('reduce', self.position, before, action[1], action[2], new_state))
+                stack.append(new_state)
+                self.reductions += 1
+                if tree is not None:
+                    nodes = self.nodes
+                    children = nodes[len(nodes) - len(action[2]):]
+                    del nodes[len(nodes) - len(action[2]):]
+                    nodes.append(tree.reduce(action[1], children, self.position))
+            else:  # accept
+                if trace is not None:
+                    trace(('accept', self.position, tuple(stack)))
+                if tree is not None:
+                    tree.root_id = self.nodes[-1]
+                self.accepted = True
+                return
+
+    # End of the input: returns True if the tokens fed so far are a sentence of the grammar
+    def finish(self):
+        if self.accepted is None:
+            if STATS.enabled:
+                with self.recorded():
+                    self.push("$")
+            else:
+                self.push("$")
+            if self.accepted is None:  # '$' was shifted, which only an invalid table allows
+                self.accepted = False
+        return self.accepted
+
+#LR parser over a stream of tokens (any iterable or generator, without the final '$')
+# Nothing is printed (unless a trace callback is given) and the input is never materialized;
+# returns True if accepted. With a ParseTree as tree, the parse tree is built in it
+def LRparser_stream(tokens, ACTION, GOTO, trace=None, tree=None):
+    parser = LRPushParser(ACTION, GOTO, trace, tree)
+    parser.feed(tokens)
+    return parser.finish()
+
+#Result of parsing one input (a string, split by LRtokens, or a sequence of tokens):
+# (True, None) if accepted, (False, position) with the index of the offending token otherwise
+def LRparse_result(ACTION, GOTO, w, lexer=None):
+    parser = LRPushParser(ACTION, GOTO)
+    parser.feed(LRtokens(w, ACTION, lexer) if isinstance(w, str) else w)
+    if parser.finish():
+        return True, None
+    return False, parser.position
+
+#Parse many inputs over a pool of processes (see batch_parser.parse_batch)
+# The workers inherit ACTION and GOTO when processes are forked, so the tables are not sent per input.
+# String inputs are split by LRtokens, with one lexer for the whole batch.
+# Yields an LRparse_result for every input, in order
+def LRparse_batch(inputs, ACTION, GOTO, processes=None, chunksize=256):
+    return parse_batch(partial(LRparse_result, ACTION, GOTO, lexer=LRlexer(ACTION)), inputs, processes, chunksize)
+
+#Incremental LR parser for an input that is edited and parsed again (see incremental_parser):
+# parser.edit(start, end, tokens) replaces tokens[start:end] and resumes from the last stack
+# checkpoint before the edit, stopping as soon as the parse reconverges with the previous one
+def LRparser_incremental(tokens, ACTION, GOTO, interval=256):
+    return IncrementalParser(partial(LRPushParser, ACTION, GOTO), tokens, interval)
+
+#Source of a standalone Python module that parses with these tables (see codegen.generate_lr),
+# written to path if one is given. The module needs no table construction when it is imported:
+# generated.parse(tokens) returns True or False like LRparser
+def generate_LRparser(ACTION, GOTO, path=None):
+    source = generate_lr(ACTION, GOTO)
+    if path is not None:
+        write_module(source, path)
+    return source
+
+#Whitespace-separated tokens of a text file, read in chunks of chunk_size characters
+# so that large files are never loaded in memory at once
+def read_tokens(file, chunk_size=1 << 16):
+    rest = ""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        tokens = (rest + chunk).split()
+        # The last token may continue in the next chunk
+        if tokens and not chunk[-1].isspace():
+            rest = tokens.pop()
+        else:
+            rest = ""
+        yield from tokens
+    if rest:
+        yield rest
+
+
+#Pack rows of {column: value} entries into a single comb vector (row displacement)
+# Every distinct row gets a base such that its entries land in free slots of value/check:
+# entry (row, column) is at base[row] + column, and check[base[row] + column] == row.
+# Identical rows share the same row id. Returns (row_of, base, check, value) as arrays
+def pack_rows(rows):
+    row_ids = {}
+    row_of = array('i')
+    distinct = []
+    for entries in rows:
+        key = tuple(sorted(entries.items()))
+        if key not in row_ids:
+            row_ids[key] = len(distinct)
+            distinct.append(key)
+        row_of.append(row_ids[key])
+
+    base = array('i', [0] * len(distinct))
+    check = array('i')
+    value = array('i')
+    first_free = 0
+    # Dense rows are placed first, the sparse ones fill the holes they leave
+    for r in sorted(range(len(distinct)), key=lambda r: -len(distinct[r])):
+        entries = distinct[r]
+        if not entries:
+            continue
+        columns = [column for column, _ in entries]
+        b = max(first_free - columns[0], 0)
+        while any(b + column < len(check) and check[b + column] != -1 for column in columns):
+            b += 1
+        needed = b + columns[-1] + 1
+        if needed > len(check):
+            check.extend([-1] * (needed - len(check)))
+            value.extend([0] * (needed - len(value)))
+        for column, v in entries:
+            check[b + column] = r
+            value[b + column] = v
+        base[r] = b
+        while first_free < len(check) and check[first_free] != -1:
+            first_free += 1
+    return row_of, base, check, value
+
+#Integer encoding of the ACTION/GOTO tables with row-displacement compression
+# Terminals and nonterminals are interned to small ids ('$' is terminal 0). An action is an int:
+#   0 error, v > 0 shift to state v - 1, v < 0 reduce by production -v - 1 (production 0 is S' -> S: accept)
+# The most common reduction of every state is its default reduction and is left out of the comb
+# vector; GOTO is packed by nonterminal with the most common target as the default
+class PackedTables:
+    def __init__(self, grammar, ACTION, GOTO_Table):
+        self.nonterminals = list(grammar.keys())
+        self.nonterminal_id = {A: i for i, A in enumerate(self.nonterminals)}
+        self.terminals = list(dict.fromkeys(['$'] + [X for rules in grammar.values() for rule in rules
+                                                      for X in rule if X not in grammar]))
+        self.terminal_id = {a: i for i, a in enumerate(self.terminals)}
+
+        # Productions: left side id and length of the right side, indexed by production id
+        productions = [(A, production) for A, rules in grammar.items() for production in rules]
+        production_id = {}
+        for p, key in enumerate(productions):
+            production_id.setdefault(key, p)
+        self.productions = productions
+        self.lhs = array('i', [self.nonterminal_id[A] for A, _ in productions])
+        self.rhs_length = array('i', [len(production) for _, production in productions])
+
+        n_states = 1 + max([state for state, _ in ACTION] + [state for state, _ in GOTO_Table] +
+                           [action[1] for action in ACTION.values() if action[0] == 'shift'] +
+                           list(GOTO_Table.values()), default=0)
+        self.n_states = n_states
+
+        rows = [{} for _ in range(n_states)]
+        for (state, symbol), action in ACTION.items():
+            if action[0] == 'shift':
+                code = action[1] + 1
+            elif action[0] == 'reduce':
+                code = -production_id[(action[1], action[2])] - 1
+            else:
+                code = -1
+            rows[state][self.terminal_id[symbol]] = code
+
+        # Default reductions: the most frequent reduce code of each row. Empty productions and the
+        # states that can come back to themselves by reductions alone (codegen.reduction_cycles)
+        # never get one, so an erroneous token cannot trigger endless reductions
+        self.default_action = array('i', [0] * n_states)
+        cycles = reduction_cycles(ACTION, GOTO_Table)
+        for state, row in enumerate(rows):
+            if state in cycles:
+                continue
+            reductions = [code for code in row.values() if code < -1 and self.rhs_length[-code - 1]]
+            if reductions:
+                default = max(set(reductions), key=reductions.count)
+                self.default_action[state] = default
+                rows[state] = {a: code for a, code in row.items() if code != default}
+        self.action_row, self.action_base, self.action_check, self.action_value = pack_rows(rows)
+
+        # GOTO is packed by column (nonterminal), indexed by state
+        columns = [{} for _ in self.nonterminals]
+        for (state, A), next_state in GOTO_Table.items():
+            columns[self.nonterminal_id[A]][state] = next_state
+        self.default_goto = array('i', [-1] * len(columns))
+        for A, column in enumerate(columns):
+            if column:
+                targets = list(column.values())
+                default = max(set(targets), key=targets.count)
+                self.default_goto[A] = default
+                columns[A] = {state: target for state, target in column.items() if target != default}
+        self.goto_row, self.goto_base, self.goto_check, self.goto_value = pack_rows(columns)
+
+    # Action code for a state and a terminal id
+    def action(self, state, a):
+        r = self.action_row[state]
+        i = self.action_base[r] + a
+        if i < len(self.action_check) and self.action_check[i] == r:
+            return self.action_value[i]
+        return self.default_action[state]
+
+    # Next state after reducing to the nonterminal id A in a state
+    def goto(self, state, A):
+        r = self.goto_row[A]
+        i = self.goto_base[r] + state
+        if i < len(self.goto_check) and self.goto_check[i] == r:
+            return self.goto_value[i]
+        return self.default_goto[A]
+
+    # Terminal ids of a token sequence (-1 for symbols that are not terminals of the grammar)
+    def encode(self, tokens):
+        return [self.terminal_id.get(a, -1) for a in tokens]
+
+    # Lexer whose token ids are the terminal ids of these tables (lexer.scan feeds LRparser_packed)
+    def lexer(self):
+        return Lexer(self.terminals)
+
+    # Memory used by the packed arrays, in bytes
+    def nbytes(self):
+        arrays = (self.lhs, self.rhs_length, self.default_action, self.action_row, self.action_base,
+                  self.action_check, self.action_value, self.default_goto, self.goto_row,
+                  self.goto_base, self.goto_check, self.goto_value)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+#LR parser over PackedTables. tokens is a sequence of terminal ids (see PackedTables.encode),
+# without the final '$'. Each step is a few array index operations; returns True if accepted
+def LRparser_packed(tokens, tables):
+    action_row, action_base = tables.action_row, tables.action_base
+    action_check, action_value = tables.action_check, tables.action_value
+    default_action = tables.default_action
+    goto_row, goto_base = tables.goto_row, tables.goto_base
+    goto_check, goto_value, default_goto = tables.goto_check, tables.goto_value, tables.default_goto
+    lhs, rhs_length = tables.lhs, tables.rhs_length
+    n_action, n_goto = len(action_check), len(goto_check)
+
+    stack = [0]  # Only states are kept: the symbols are implied by them
+    tokens = iter(tokens)
+    a = next(tokens, 0)  # 0 is '$'
+    while True:
+        s = stack[-1]
+        if a < 0:
+            return False
+        r = action_row[s]
+        i = action_base[r] + a
+        code = action_value[i] if i < n_action and action_check[i] == r else default_action[s]
+
+        if code > 0:  # Shift
+            stack.append(code - 1)
+            a = next(tokens, 0)
+        elif code < -1:  # Reduce
+            p = -code - 1
+            if rhs_length[p]:
+                del stack[-rhs_length[p]:]
+            A = lhs[p]
+            r = goto_row[A]
+            i = goto_base[r] + stack[-1]
+            stack.append(goto_value[i] if i < n_goto and goto_check[i] == r else default_goto[A])
+        elif code == -1:  # Accept
+            return True
+        else:  # Error
+            return False
+
+def main():
+    # Read the grammar rules from a file or input
+    grammar_rules = read_grammar()
+    print("Loaded grammar:", grammar_rules)
+
+    # Generate the LR(0) automaton (item collection and transitions) for the grammar
+    automaton = LRautomaton(grammar_rules)
+    print("LR(0) Canonical Collection")
+    PrintCollection(automaton[0], grammar_rules)
+
+    # Generate the ACTION and GOTO tables based on the grammar
+    ACTION, GOTO = SLRTable(grammar_rules, automaton)
+    print("SLR TABLE")
+    print_SLR_table(ACTION, GOTO)
+
+    # Ask the user to input a string for parsing
+    w = input("\nEnter the string to analyze: ")
+    print("Step-by-step analysis:")
+    LRparser(w, ACTION, GOTO, trace=print_trace)
+
+
+if __name__ == "__main__":
+    main()
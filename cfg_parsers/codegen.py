@@ -0,0 +1,281 @@
+# Generation of standalone parser modules from the parsing tables (used by both parsers)
+# The generated module has no dependencies and builds nothing at import time: the tables are
+# compiled into Python code that dispatches on integer token ids.
+#   generate_ll1   one predictive loop over an explicit stack of symbol ids: the nonterminal on
+#                  top is found with a binary tree of ifs, and each one is an if/elif over the
+#                  token ids of its productions, which are pushed as constant tuples
+#   generate_lr    one loop over the states: the state is found with a binary tree of ifs, and
+#                  each state is an if/elif over the token ids with the shifts, reductions and
+#                  states inlined as constants (GOTO is a tuple per nonterminal)
+# Every generated module has TERMINALS (the token of each id), TOKEN_ID, and:
+#   parse(tokens)          True if the tokens (without the final '$') are accepted
+#   parse_result(tokens)   (True, None) or (False, position of the rejected token)
+#   parse_ids(ids)         -1 if the token ids (ending with the id of '$') are accepted, else the position
+#
+#   source = generate_lr(ACTION, GOTO)
+#   write_module(source, "expr_parser.py")   # then: import expr_parser; expr_parser.parse(tokens)
+
+HEADER = '''# Generated by codegen.py ({kind}); do not edit
+{imports}TERMINALS = {terminals!r}
+TOKEN_ID = {{token: i for i, token in enumerate(TERMINALS)}}
+END = {end}  # Id of '$'
+'''
+
+DRIVER = '''
+
+def parse_result(tokens):
+    ids = [TOKEN_ID.get(token, -1) for token in tokens]
+    ids.append(END)
+    position = parse_ids(ids)
+    return (True, None) if position < 0 else (False, position)
+
+
+def parse(tokens):
+    return parse_result(tokens)[0]
+'''
+
+
+# Terminal list with '$' last, and the id of each terminal
+def _terminal_ids(terminals):
+    terminals = [t for t in dict.fromkeys(terminals) if t != '$'] + ['$']
+    return terminals, {t: i for i, t in enumerate(terminals)}
+
+
+# Test of the token id t against a set of ids
+def _test(ids):
+    ids = sorted(ids)
+    if len(ids) == 1:
+        return f"t == {ids[0]}"
+    if len(ids) <= 3:
+        return " or ".join(f"t == {i}" for i in ids)
+    return f"t in {{{', '.join(map(str, ids))}}}"
+
+
+# LL(1) parser from parsingTable {nonterminal: {terminal: production}} (top-down module format:
+# productions are tuples of symbols and ("e",) is the empty one)
+def generate_ll1(parsingTable, start_symbol, nonterminals):
+    nonterminals = list(dict.fromkeys([start_symbol, *nonterminals]))
+    terminals = [t for A in nonterminals for t in parsingTable.get(A, {})]
+    terminals += [X for A in nonterminals for production in parsingTable.get(A, {}).values()
+                  for X in production if X not in nonterminals and X != "e"]
+    terminals, T = _terminal_ids(terminals)
+    # Symbol ids on the stack: the terminal ids, then one id per nonterminal after them
+    N = {A: len(terminals) + k for k, A in enumerate(nonterminals)}
+
+    lines = [HEADER.format(kind="LL(1) predictive", imports="", terminals=tuple(terminals), end=T['$'])]
+
+    # Code of a nonterminal on top of the stack: an if/elif over the token ids of its productions.
+    # The first symbol of a production chosen on a terminal is that terminal, so it is matched
+    # right away; the rest of the production is pushed in reverse
+    def expand(A, indent):
+        productions = {}  # production -> token ids that choose it, in table order
+        for terminal, production in parsingTable.get(A, {}).items():
+            productions.setdefault(tuple(production), []).append(T[terminal])
+        out = [f"{indent}# {A}"]
+        keyword = "if"
+        for production, ids in productions.items():
+            out.append(f"{indent}{keyword} {_test(ids)}:  # {A} -> {' '.join(production)}")
+            keyword = "elif"
+            body = [] if production == ("e",) else list(production)
+            if body and body[0] not in N:
+                body.pop(0)
+                out.append(f"{indent}    i += 1")
+                out.append(f"{indent}    t = ids[i]")
+            rest = [N[X] if X in N else T[X] for X in reversed(body)]
+            if len(rest) == 1:
+                out.append(f"{indent}    stack.append({rest[0]})")
+            elif rest:
+                out.append(f"{indent}    stack += ({', '.join(map(str, rest))})")
+            out.append(f"{indent}    continue")
+        out.append(f"{indent}return i")
+        return out
+
+    # Binary tree of ifs over the nonterminal ids lo..hi-1
+    def dispatch(lo, hi, indent):
+        if hi - lo == 1:
+            return expand(nonterminals[lo], indent)
+        mid = (lo + hi) // 2
+        return ([f"{indent}if X < {len(terminals) + mid}:"] + dispatch(lo, mid, indent + "    ")
+                + [f"{indent}else:"] + dispatch(mid, hi, indent + "    "))
+
+    lines.append(f'''
+
+def parse_ids(ids):
+    # The stack holds the symbols still to be matched, so deep nesting needs no Python recursion
+    stack = [END, {N[start_symbol]}]
+    i = 0
+    t = ids[0]
+    while True:
+        X = stack.pop()
+        if X < {len(terminals)}:  # Terminal
+            if X != t:
+                return i
+            if t == END:
+                return -1
+            i += 1
+            t = ids[i]
+            continue''')
+    lines += dispatch(0, len(nonterminals), "        ")
+    lines.append(DRIVER)
+    return "\n".join(lines)
+
+
+# States where a run of reductions, without any shift, can come back to the same state (used by
+# generate_lr and bottom_up.PackedTables). A reduction A -> beta in state s pops len(beta) states
+# and goes to GOTO(p, A) for some p with a path of len(beta) symbols to s; every such p is taken,
+# so the result is a superset. A default reduction in one of these states could loop forever on a
+# token that the table rejects (e.g. an empty reduction into a state whose default reduction
+# returns to the first one), so they only reduce on the tokens of their row
+def reduction_cycles(ACTION, GOTO):
+    back = {}  # State -> states with a transition to it
+    for (i, _), action in ACTION.items():
+        if action[0] == "shift":
+            back.setdefault(action[1], set()).add(i)
+    for (i, _), j in GOTO.items():
+        back.setdefault(j, set()).add(i)
+
+    edges = {}  # State -> states reached by one of its reductions
+    for (s, A, n) in {(s, action[1], len(action[2])) for (s, _), action in ACTION.items() if action[0] == "reduce"}:
+        preds = {s}
+        for _ in range(n):
+            preds = {p for q in preds for p in back.get(q, ())}
+        edges.setdefault(s, set()).update(GOTO[(p, A)] for p in preds if (p, A) in GOTO)
+
+    # Peel off the states with no reductions out of them (or none into them) until only the
+    # states on a cycle, and those between two cycles, are left
+    into = {}
+    for s, targets in edges.items():
+        for t in targets:
+            into.setdefault(t, set()).add(s)
+    left = set(edges) & set(into)
+    changed = True
+    while changed:
+        changed = False
+        for s in list(left):
+            if not (edges[s] & left and into[s] & left):
+                left.discard(s)
+                changed = True
+    return left
+
+
+# LR parser from the ACTION/GOTO tables of the bottom-up module (SLR, LALR or LR(1))
+def generate_lr(ACTION, GOTO):
+    terminals, T = _terminal_ids(sorted({a for _, a in ACTION} - {'$'}))  # '$' is a string with int symbols
+    nonterminals = sorted({A for _, A in GOTO} | {action[1] for action in ACTION.values() if action[0] == "reduce"})
+    N = {A: i for i, A in enumerate(nonterminals)}
+    states = 1 + max([i for i, _ in ACTION] + [i for i, _ in GOTO] + [j for j in GOTO.values()], default=0)
+
+    rows = [{} for _ in range(states)]
+    for (i, a), action in ACTION.items():
+        rows[i][a] = action
+
+    # Default reduction of every state: its only action, done without looking at the token
+    # (an error is still found before the next shift, at the same token). Empty productions and
+    # the states of reduction_cycles are left out, so a chain of default reductions always ends
+    # in a state that checks the token (otherwise a rejected token could make a table whose
+    # conflicts were resolved reduce forever)
+    cycles = reduction_cycles(ACTION, GOTO)
+    default = {}
+    for i, row in enumerate(rows):
+        actions = set(row.values())
+        if len(actions) == 1 and i not in cycles:
+            action = next(iter(actions))
+            if action[0] == "reduce" and action[2]:
+                default[i] = action
+
+    # State reached by pushing j over pred: states whose default reduction has one symbol are
+    # skipped, since that reduction pops j and goes to GOTO(pred, A), a constant when pred is known
+    def settle(pred, j):
+        seen = set()
+        while j not in seen and j in default and len(default[j][2]) == 1:
+            seen.add(j)
+            target = GOTO.get((pred, default[j][1]))
+            if target is None:
+                break
+            j = target
+        return j
+
+    lines = [HEADER.format(kind="LR state dispatch", imports="", terminals=tuple(terminals), end=T['$'])]
+    # GOTO of every nonterminal by state (-1 where there is none), with settle applied
+    for A in nonterminals:
+        targets = [-1] * states
+        for (i, B), j in GOTO.items():
+            if B == A:
+                targets[i] = settle(i, j)
+        lines.append(f"_G{N[A]} = {tuple(targets)!r}  # GOTO(state, {A})")
+
+    def state_body(i, indent):
+        if i in default:
+            return reduce_code(i, default[i], indent)
+        actions = {}  # action -> token ids, in table order
+        for a, action in rows[i].items():
+            actions.setdefault(action, []).append(T[a])
+        out = []
+        keyword = "if"
+        for action, ids in actions.items():
+            out.append(f"{indent}{keyword} {_test(ids)}:")
+            keyword = "elif"
+            if action[0] == "shift":
+                j = settle(i, action[1])
+                out.append(f"{indent}    state = {j}")
+                out.append(f"{indent}    stack.append({j})")
+                out.append(f"{indent}    i += 1")
+                out.append(f"{indent}    t = ids[i]")
+                out.append(f"{indent}    continue")
+            elif action[0] == "reduce":
+                out += reduce_code(i, action, indent + "    ")
+            else:
+                out.append(f"{indent}    return -1")
+        out.append(f"{indent}return i")
+        return out
+
+    # Reduction in state i: the top len(beta) states are replaced by the GOTO state
+    def reduce_code(i, action, indent):
+        _, A, beta = action
+        out = [f"{indent}# {A} -> {' '.join(map(str, beta))}"]
+        if not beta:  # Nothing is popped, so the GOTO is from this state
+            j = settle(i, GOTO[(i, A)]) if (i, A) in GOTO else -1
+            if j < 0:
+                return out + [f"{indent}return i"]
+            return out + [f"{indent}state = {j}", f"{indent}stack.append({j})", f"{indent}continue"]
+        if len(beta) > 1:
+            out.append(f"{indent}del stack[-{len(beta) - 1}:]")
+        out.append(f"{indent}state = _G{N[A]}[stack[-2]]")
+        out.append(f"{indent}if state < 0:")
+        out.append(f"{indent}    return i")
+        out.append(f"{indent}stack[-1] = state")
+        out.append(f"{indent}continue")
+        return out
+
+    # Binary tree of ifs over the states lo..hi-1
+    def dispatch(lo, hi, indent):
+        if hi - lo == 1:
+            return state_body(lo, indent)
+        mid = (lo + hi) // 2
+        return ([f"{indent}if state < {mid}:"] + dispatch(lo, mid, indent + "    ")
+                + [f"{indent}else:"] + dispatch(mid, hi, indent + "    "))
+
+    lines.append('''
+
+def parse_ids(ids):
+    stack = [0]
+    state = 0
+    i = 0
+    t = ids[0]
+    while True:''')
+    lines += dispatch(0, states, "        ")
+    lines.append(DRIVER)
+    return "\n".join(lines)
+
+
+def write_module(source, path):
+    with open(path, "w") as file:
+        file.write(source)
+
+
+# Module object from generated source, without writing it to a file
+def load_module(source, name="generated_parser"):
+    import types
+    module = types.ModuleType(name)
+    exec(compile(source, f"<{name}>", "exec"), module.__dict__)
+    return module
@@ -0,0 +1,213 @@
+import argparse
+import dbm
+import sys
+from collections import deque
+
+from .batch_parser import parse_batch
+from .grammar_cache import KIND_FIRST_FOLLOW, grammar_hash
+from .grammar_loader import read_cases as read_grammars
+
+class First_Follow:
+    def __init__(self, productions):
+        self.productions = productions
+        # 'S' is the initial symbol, or the first non-terminal if there is no 'S'
+        self.start = "S" if "S" in productions else next(iter(productions), None)
+        self.firstSet = {}
+        self.followSet = {}
+
+    # Build the "recipe" of every first and follow set: an ordered list of
+    # contributions, where a contribution is either a terminal or a reference
+    # to the first/follow set of another non-terminal.
+    # It also returns, for every non-terminal, the non-terminals whose sets
+    # reference it (the edges of the dependency graph)
+    def build_dependencies(self):
+        firstRecipe = {nonT: [] for nonT in self.productions}
+        followRecipe = {nonT: [] for nonT in self.productions}
+
+        # Add $ to the initial non-terminal
+        if self.start is not None:
+            followRecipe[self.start].append(("t", "$"))
+
+        for nonTerm, derivations in self.productions.items():
+            for derivation in derivations:
+
+                # An epsilon derivation only adds epsilon to the first set
+                if derivation == "e":
+                    firstRecipe[nonTerm].append(("t", "e"))
+                    continue
+
+                # First(nonTerm) gets First(derivation), which starts with
+                # the first symbol and goes on while the symbols are nullable
+                firstRecipe[nonTerm].append(("seq", derivation, None))
+
+                # Follow(X) gets First of what comes after X, and Follow(nonTerm)
+                # if everything after X is nullable
+                for i, symbol in enumerate(derivation):
+                    if symbol in followRecipe:
+                        followRecipe[symbol].append(("seq", derivation[i + 1:], nonTerm))
+
+        # Dependents are kept in dicts (ordered sets) so the sets come out in the same order on every run
+        firstDeps = {nonT: {} for nonT in self.productions}
+        followDeps = {nonT: {} for nonT in self.productions}
+        for nonT, recipe in firstRecipe.items():
+            for entry in recipe:
+                if entry[0] == "seq":
+                    for symbol in entry[1]:
+                        if symbol in firstDeps:
+                            firstDeps[symbol][nonT] = None
+
+        # First sets are final before the follow sets are computed, so
+        # follow sets only depend on the follow set of a left side
+        for nonT, recipe in followRecipe.items():
+            for entry in recipe:
+                if entry[0] == "seq" and entry[2] is not None:
+                    followDeps[entry[2]][nonT] = None
+
+        return firstRecipe, followRecipe, firstDeps, followDeps
+
+    # Evaluate a recipe with the current sets. Terminals keep the order in
+    # which they are found
+    def evaluate_recipe(self, recipe, follow):
+        result = {}
+        for entry in recipe:
+            if entry[0] == "t":
+                result[entry[1]] = None
+                continue
+
+            sequence, nonTerm = entry[1], entry[2]
+            nullable = True
+            for symbol in sequence:
+                if symbol in self.productions:
+                    symbolFirst = self.firstSet.get(symbol, ())
+                    for terminal in symbolFirst:
+                        if terminal != "e":
+                            result[terminal] = None
+                    if "e" not in symbolFirst:
+                        nullable = False
+                        break
+                else:
+                    result[symbol] = None
+                    nullable = False
+                    break
+
+            # The whole sequence can disappear: add epsilon to a first set
+            # or the follow set of the left side to a follow set
+            if nullable:
+                if not follow:
+                    result["e"] = None
+                elif nonTerm is not None:
+                    for terminal in self.followSet.get(nonTerm, ()):
+                        result[terminal] = None
+
+        return [*result]
+
+    # Worklist fixpoint that computes every first and follow set in one pass.
+    # A non-terminal is only visited again when a set it depends on changed
+    def compute_sets(self):
+        firstRecipe, followRecipe, firstDeps, followDeps = self.build_dependencies()
+        self.firstSet = {nonT: [] for nonT in self.productions}
+        self.followSet = {nonT: [] for nonT in self.productions}
+
+        # First sets
+        worklist = deque(self.productions)
+        queued = set(worklist)
+        while worklist:
+            nonT = worklist.popleft()
+            queued.discard(nonT)
+            first = self.evaluate_recipe(firstRecipe[nonT], False)
+            if len(first) == len(self.firstSet[nonT]):
+                continue
+            self.firstSet[nonT] = first
+            for dependent in firstDeps[nonT]:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    worklist.append(dependent)
+
+        # Follow sets (first sets are final at this point)
+        worklist = deque(self.productions)
+        queued = set(worklist)
+        while worklist:
+            nonT = worklist.popleft()
+            queued.discard(nonT)
+            follow = self.evaluate_recipe(followRecipe[nonT], True)
+            if len(follow) == len(self.followSet[nonT]):
+                continue
+            self.followSet[nonT] = follow
+            for dependent in followDeps[nonT]:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    worklist.append(dependent)
+
+        return self.firstSet, self.followSet
+
+# Read the cases of an input file one at a time: yields the productions of every CFG
+# (a dictionary nonterminal -> list of derivations), so the file is never loaded whole.
+# Derivations are tuples of symbols ("e" for epsilon), see grammar_loader.read_cases
+def read_cases(input):
+    for grammar in read_grammars(input):
+        yield grammar.to_dict("e")
+
+# Output of one CFG: its first and follow sets followed by a blank line
+def format_sets(FF):
+    lines = [f"First({nonT}) = {{{', '.join(set)}}}" for nonT, set in FF.firstSet.items()]
+    lines += [f"Follow({nonT}) = {{{', '.join(set)}}}" for nonT, set in FF.followSet.items()]
+    lines.append("\n")
+    return "\n".join(lines)
+
+# Find the first and follow sets of a CFG and return its output
+def solve_case(productions):
+    FF = First_Follow(productions)
+    FF.compute_sets()
+    return format_sets(FF)
+
+# Worker of solve_cases: None stands for a case found in the cache, which is not solved again
+def solve_uncached(productions):
+    return None if productions is None else solve_case(productions)
+
+# Output of every case, in the order of the cases
+# The cases are solved in a process pool (see batch_parser.parse_batch; processes=1 solves them
+# in this process). cache is a dbm mapping (grammar hash -> output): the cases found there are
+# not solved again, and the new results are stored in it
+def solve_cases(cases, processes=None, chunksize=64, cache=None):
+    read = deque()  # (digest, cached output or None) of the cases read so far, in order
+
+    # Cached cases go to the pool as None, so they count in its read-ahead: at most
+    # 4 * processes * chunksize cases (and their cached outputs) are held at any time
+    def uncached():
+        for productions in cases:
+            digest = grammar_hash(productions, KIND_FIRST_FOLLOW)
+            output = cache.get(digest) if cache is not None else None
+            read.append((digest, output))
+            yield productions if output is None else None
+
+    for output in parse_batch(solve_uncached, uncached(), processes, chunksize):
+        digest, cached = read.popleft()
+        if cached is not None:
+            yield cached.decode("utf-8")
+            continue
+        if cache is not None:
+            cache[digest] = output.encode("utf-8")
+        yield output
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="First and Follow sets of every CFG of a file")
+    parser.add_argument("input", nargs="?", default="input.txt", help="file with the cases (input.txt)")
+    parser.add_argument("-o", "--output", help="write the results to this file instead of the standard output")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (all the cores by default)")
+    parser.add_argument("--cache", help="result cache (a dbm file) of the grammars already solved")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w", buffering=1 << 20) if args.output else sys.stdout
+    cache = dbm.open(args.cache, "c") if args.cache else None
+    try:
+        with open(args.input) as input:
+            for text in solve_cases(read_cases(input), args.jobs, cache=cache):
+                output.write(text)
+    finally:
+        if cache is not None:
+            cache.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+   main()
\ No newline at end of file
@@ -0,0 +1,124 @@
+# On-disk cache of compiled parsing tables (SLR ACTION/GOTO, LL(1) parsingTable)
+# Tables are stored in a compact binary file named after a content hash of the grammar,
+# so a process that loads an unchanged grammar can skip table generation entirely.
+#
+# File layout (little endian):
+#   magic 'CFGT' | version u16 | kind u16 | sha256 digest (32 bytes)
+#   symbol count u32 | record count u32 | record width u32
+#   symbol table: for each symbol, type u8 (0 string, 1 int id of an encoded grammar),
+#                 length u16 + utf-8 bytes (the decimal digits of an int)
+#   records: record count * record width int32 values
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'CFGT'
+VERSION = 2
+KIND_SLR = 1  # ACTION/GOTO tables of the bottom-up parser
+KIND_LL1 = 2  # parsingTable of the top-down parser
+KIND_FIRST_FOLLOW = 3  # First and Follow sets of First & Follow (result cache of its batch mode)
+
+HEADER = struct.Struct('<4sHH32sIII')
+SYMBOL = struct.Struct('<BH')  # Type and length of a symbol
+STRING, INTEGER = 0, 1
+
+# Directory used when no cache_dir is given: the per-user cache directory
+# ($XDG_CACHE_HOME/cfg_parsers, or ~/.cache/cfg_parsers), unless PARSER_CACHE_DIR is set
+def default_cache_dir():
+    if os.environ.get('PARSER_CACHE_DIR'):
+        return os.environ['PARSER_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'cfg_parsers')
+
+DEFAULT_CACHE_DIR = default_cache_dir()
+
+# Content hash of a grammar {nonterminal: [productions]} for the given table kind
+# The order of the nonterminals matters (the first one is the start symbol)
+def grammar_hash(grammar, kind):
+    canonical = json.dumps([kind, VERSION, [[A, [list(p) for p in productions]]
+                                            for A, productions in grammar.items()]],
+                           ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).digest()
+
+# Path of the cache file for a grammar digest
+def cache_path(digest, cache_dir=None):
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, digest.hex() + '.tbl')
+
+# Write the symbol table and the int32 records (a flat list, width values per record)
+# The file is written under a temporary name and renamed, so readers never see half a file
+def save_tables(path, kind, digest, symbols, records, width):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    body = bytearray()
+    for symbol in symbols:
+        if isinstance(symbol, int):
+            encoded = str(symbol).encode('ascii')
+            body += SYMBOL.pack(INTEGER, len(encoded))
+        else:
+            encoded = symbol.encode('utf-8')
+            body += SYMBOL.pack(STRING, len(encoded))
+        body += encoded
+
+    values = memoryview(bytes(struct.pack(f'<{len(records)}i', *records)))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, kind, digest, len(symbols), len(records) // width, width))
+        file.write(body)
+        file.write(values)
+    os.replace(tmp_path, path)
+
+# Read a cache file and return (symbols, records) where records is a list of tuples of ints
+# The file is read in one call: the tables are rebuilt as dicts anyway, so mapping it would save nothing
+# With decode, return decode(symbols, records) instead (the tables built from the records).
+# Returns None if the file is missing, does not belong to this kind and digest, or is truncated or
+# corrupt (also when decode fails on it, e.g. a symbol index out of range): the caller then
+# rebuilds the tables and overwrites the file
+def load_tables(path, kind, digest, decode=None):
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+
+    with file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        return None
+    try:
+        symbols, records = _read_tables(data, kind, digest)
+        if decode is not None and symbols is not None:
+            return decode(symbols, records)
+    except (struct.error, UnicodeDecodeError, ValueError, IndexError, KeyError):
+        return None
+
+    if symbols is None:
+        return None
+    return symbols, records
+
+# Symbols and records of the bytes of a cache file, or (None, None) if it is not this kind and digest
+# or its records do not fit in the file
+def _read_tables(data, kind, digest):
+    size = len(data)
+    magic, version, file_kind, file_digest, n_symbols, n_records, width = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or file_kind != kind or file_digest != digest:
+        return None, None
+
+    offset = HEADER.size
+    symbols = []
+    for _ in range(n_symbols):
+        symbol_type, length = SYMBOL.unpack_from(data, offset)
+        offset += SYMBOL.size
+        if offset + length > size:
+            return None, None
+        symbol = data[offset:offset + length].decode('utf-8')
+        symbols.append(int(symbol) if symbol_type == INTEGER else symbol)
+        offset += length
+    if width == 0 or offset + 4 * n_records * width != size:
+        return None, None
+
+    values = array('i')
+    values.frombytes(data[offset:])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return symbols, list(zip(*[iter(values)] * width))
@@ -0,0 +1,174 @@
+# Grammar loader shared by the three modules (First & Follow, top-down and bottom-up)
+# Grammar files are read line by line from any path or open file, so large grammars are never
+# held as text. Every symbol is interned to a small integer id (the order of first appearance),
+# and the productions are stored as integer arrays:
+#   symbols[i]                        the symbol with id i, ids[symbol] its id
+#   lhs[p]                            id of the nonterminal of production p
+#   rhs[offsets[p]:offsets[p + 1]]    ids of the symbols of production p (empty for ε)
+#   by_lhs                            nonterminal id -> its production numbers, start symbol first
+# The nonterminals are the symbols with productions (in any case, with any number of characters),
+# every other symbol is a terminal.
+#
+# Two file formats:
+#   load_grammar(path)   one rule per line, "A -> x y | z" (symbols separated by spaces, an empty
+#                        alternative is ε; with epsilon="e", the symbol e is ε too). A nonterminal
+#                        can have several lines
+#   read_cases(file)     the cases of First & Follow: "A xB e" (one derivation per word, e is ε).
+#                        Words are split into the longest nonterminal names (E', A1, ...) and
+#                        single-character terminals
+#
+#   grammar = load_grammar("input.txt")
+#   grammar.to_dict()         # {"S'": [("S",)], ...} (bottom-up format, ε is ())
+#   grammar.to_dict(("e",))   # top-down format;  to_dict("e") is the First & Follow one
+#   grammar.encoded()         # {0: [(1,)], ...}, the same with ids (for the bottom-up tables,
+#                             # whose end marker is still '$'; augment() adds S' -> S if needed)
+import re
+import sys
+from array import array
+
+
+class Grammar:
+    def __init__(self):
+        self.symbols = []  # Id -> symbol
+        self.ids = {}  # Symbol -> id
+        self.lhs = array('i')  # Production -> id of its nonterminal
+        self.rhs = array('i')  # Ids of the symbols of every production, one after the other
+        self.offsets = array('i', [0])  # Production p is rhs[offsets[p]:offsets[p + 1]]
+        self.by_lhs = {}  # Nonterminal id -> production numbers, in order (the start symbol first)
+
+    def __len__(self):
+        return len(self.lhs)
+
+    # Id of a symbol, given a new one if it was not seen before
+    def intern(self, symbol):
+        i = self.ids.get(symbol)
+        if i is None:
+            symbol = sys.intern(symbol)
+            i = self.ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return i
+
+    # Add the production A -> symbols (no symbols for ε); returns its number
+    def add(self, A, symbols):
+        return self.add_ids(self.intern(A), [self.intern(X) for X in symbols])
+
+    def add_ids(self, A, ids):
+        p = len(self.lhs)
+        self.lhs.append(A)
+        self.rhs.extend(ids)
+        self.offsets.append(len(self.rhs))
+        productions = self.by_lhs.get(A)
+        if productions is None:
+            self.by_lhs[A] = [p]
+        else:
+            productions.append(p)
+        return p
+
+    # Augment the grammar with S' -> S, S' being the new start symbol (the first nonterminal);
+    # returns its id. The bottom-up tables need it, and their end marker stays the string '$'
+    def augment(self, name="S'"):
+        if name in self.ids:
+            raise ValueError(f"{name!r} is already a symbol of the grammar")
+        start = self.start
+        A = self.intern(name)
+        self.add_ids(A, [start])
+        self.by_lhs = {A: self.by_lhs.pop(A), **self.by_lhs}
+        return A
+
+    @property
+    def start(self):
+        return next(iter(self.by_lhs), -1)
+
+    # Ids of the nonterminals (the start symbol first) and of the terminals (in id order)
+    @property
+    def nonterminals(self):
+        return list(self.by_lhs)
+
+    @property
+    def terminals(self):
+        return [i for i in range(len(self.symbols)) if i not in self.by_lhs]
+
+    def is_nonterminal(self, i):
+        return i in self.by_lhs
+
+    # Ids of the symbols of production p
+    def production(self, p):
+        return tuple(self.rhs[self.offsets[p]:self.offsets[p + 1]])
+
+    # {nonterminal id: [tuples of ids]}; empty is how ε is written
+    def encoded(self, empty=()):
+        rhs, offsets = self.rhs, self.offsets
+        return {A: [tuple(rhs[offsets[p]:offsets[p + 1]]) or empty for p in productions]
+                for A, productions in self.by_lhs.items()}
+
+    # {nonterminal: [tuples of symbols]}: empty=() for the bottom-up module, ("e",) for the
+    # top-down one and "e" for First & Follow
+    def to_dict(self, empty=()):
+        symbols, rhs, offsets = self.symbols, self.rhs, self.offsets
+        return {symbols[A]: [tuple([symbols[i] for i in rhs[offsets[p]:offsets[p + 1]]]) or empty
+                             for p in productions]
+                for A, productions in self.by_lhs.items()}
+
+    # Ids of some tokens (-1 for a symbol that is not in the grammar), and back
+    def encode(self, tokens):
+        ids = self.ids
+        return [ids.get(token, -1) for token in tokens]
+
+    def decode(self, ids):
+        symbols = self.symbols
+        return [symbols[i] for i in ids]
+
+
+# Grammar of the lines "A -> x y | z" of an iterable of strings (an open file is read line by line).
+# Lines without "->" are skipped with a warning
+def read_grammar_lines(lines, epsilon=None):
+    grammar = Grammar()
+    ids, intern, add_ids = grammar.ids, grammar.intern, grammar.add_ids
+    for number, line in enumerate(lines, 1):
+        left, arrow, right = line.partition("->")
+        if not arrow:
+            if line.strip():
+                print(f"Warning: line {number} does not match pretended format: {line.strip()}")
+            continue
+        A = intern(left.strip())
+        for alternative in right.split("|"):
+            symbols = alternative.split()
+            if epsilon is not None and symbols == [epsilon]:
+                symbols = ()
+            add_ids(A, [ids[X] if X in ids else intern(X) for X in symbols])
+    return grammar
+
+
+# Grammar of a file, given its path or an open file
+def load_grammar(file, epsilon=None):
+    if hasattr(file, "read"):
+        return read_grammar_lines(file, epsilon)
+    with open(file, encoding="utf-8") as lines:
+        return read_grammar_lines(lines, epsilon)
+
+
+# Read the cases of a First & Follow input one at a time (the file is never loaded whole):
+# the number of cases, then for every case its number of nonterminals k and k lines
+# "A derivation derivation ...". Yields a Grammar for every case
+def read_cases(file):
+    cases = int(file.readline())
+    for _ in range(cases):
+        lines = [file.readline().split() for _ in range(int(file.readline()))]
+        grammar = Grammar()
+        for words in lines:  # Nonterminals first, so they get the ids 0..k-1
+            grammar.intern(words[0])
+        split = _word_splitter(grammar.symbols)
+        for A, *derivations in lines:
+            A = grammar.ids[A]
+            for word in derivations:
+                grammar.add_ids(A, [] if word == "e" else [grammar.intern(X) for X in split(word)])
+        yield grammar
+
+
+# Function that splits a word into symbols: the longest nonterminal name at every position,
+# or else one character
+def _word_splitter(nonterminals):
+    if all(len(A) == 1 for A in nonterminals):
+        return list
+    names = sorted(nonterminals, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, names)) + "|.", re.S).findall
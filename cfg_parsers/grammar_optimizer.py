@@ -0,0 +1,304 @@
+# Grammar optimizer: a preprocessing stage between loading a grammar and building its tables
+# (used by both parsers). OptimizedGrammar(grammar) describes the same language, with:
+#   - useless symbols removed: nonterminals that derive no string of terminals, and the symbols
+#     that cannot be reached from the start symbol (they only add LR states and table rows)
+#   - unit productions (A -> B) eliminated: A gets the productions of every B it reaches through
+#     unit productions, so the parsers skip the chains of unit reductions or expansions
+#   - optionally, for the LL(1) parser:
+#       left recursion removed: A -> A α | β becomes A -> β A', A' -> α A' | ε, after replacing
+#       A -> B γ by the productions of B when B is an earlier nonterminal that can start with A
+#       (left recursion hidden behind a nullable symbol, A -> B A with B =>* ε, is not removed)
+#       left factoring: A -> α β1 | α β2 becomes A -> α A', A' -> β1 | β2
+# New nonterminals are named after the one they come from (E', E'', ...).
+# Every production of the new grammar keeps a template that tells how its node is written in the
+# original grammar, so a parse tree of the new grammar is translated back with restore_tree.
+#
+#   optimized = OptimizedGrammar(grammar, augmented=True)   # bottom-up format, S' -> S is kept
+#   ACTION, GOTO = SLRTable(optimized.grammar)
+#   tree = ParseTree()
+#   LRparser(w, ACTION, GOTO, tree=tree)
+#   optimized.restore_tree(tree).root.to_tuple()             # parse tree in the original grammar
+#
+# A template is a tuple of items that give the nodes of the original tree, in order:
+#   k                   the nodes of child k of the production
+#   ('node', B, items)  a node B whose children are the nodes of items
+#   ('pass', k, items)  the nodes of child k (a new nonterminal), which receives the nodes of items:
+#                       the original node that a new nonterminal completes starts before it
+#   ('left',)           all the nodes received from the parent, ('left', i) the i-th of them
+from .parse_tree import ParseTree
+
+
+class OptimizedGrammar:
+    # grammar is {nonterminal: [productions]} with the start symbol first; empty is how the empty
+    # production is written: () in the bottom-up format, ("e",) in the top-down one.
+    # With augmented=True the productions of the start symbol (S' -> S) are kept as they are
+    def __init__(self, grammar, empty=(), augmented=False, units=True, left_recursion=False, left_factor=False):
+        self.original = grammar
+        self.empty = tuple(empty)
+        self.start = next(iter(grammar))
+        self.symbols = {X for A, productions in grammar.items() for p in productions for X in (A, *p)}
+        self.helpers = {}  # New nonterminal -> number of nodes it receives from its parent
+
+        # Productions are kept as {A: {production: template}}, with () as the empty production
+        rules = {}
+        for A, productions in grammar.items():
+            rules[A] = {}
+            for p in productions:
+                p = () if tuple(p) == self.empty else tuple(p)
+                rules[A].setdefault(p, (('node', A, tuple(range(len(p)))),))
+
+        # Units go last: done before left recursion removal, they would turn E -> T into E -> ( E ) next
+        # to E -> T * F, a common start that left factoring does not see
+        rules = self._remove_useless(rules)
+        if left_recursion:
+            self._remove_left_recursion(rules)
+        if left_factor:
+            self._left_factor(rules)
+        if units:
+            rules = self._remove_units(rules, augmented)
+        rules = self._reachable(rules)
+
+        # Template of every production of the new grammar, keyed by (A, production) with () as empty
+        self.origin = {(A, p): template for A, productions in rules.items() for p, template in productions.items()}
+        self.grammar = {A: [p if p else self.empty for p in productions] for A, productions in rules.items()}
+
+    # Only the productive nonterminals (those that derive some string of terminals) and the
+    # productions made of them are kept; a production becomes productive when the count of its
+    # nonterminals not known to be productive reaches 0
+    def _remove_useless(self, rules):
+        pending = {}  # (A, production) -> occurrences of nonterminals not known to be productive yet
+        users = {A: [] for A in rules}
+        queue = []
+        for A, productions in rules.items():
+            for p in productions:
+                count = 0
+                for X in p:
+                    if X in rules:
+                        users[X].append((A, p))
+                        count += 1
+                pending[(A, p)] = count
+                if count == 0:
+                    queue.append(A)
+
+        productive = set()
+        while queue:
+            A = queue.pop()
+            if A in productive:
+                continue
+            productive.add(A)
+            for key in users[A]:
+                pending[key] -= 1
+                if pending[key] == 0:
+                    queue.append(key[0])
+
+        rules = {A: {p: template for p, template in productions.items() if pending[(A, p)] == 0}
+                 for A, productions in rules.items() if A in productive or A == self.start}
+        return self._reachable(rules)
+
+    # Only the nonterminals reachable from the start symbol
+    def _reachable(self, rules):
+        reached = {self.start}
+        stack = [self.start]
+        while stack:
+            for p in rules[stack.pop()]:
+                for X in p:
+                    if X in rules and X not in reached:
+                        reached.add(X)
+                        stack.append(X)
+        return {A: productions for A, productions in rules.items() if A in reached}
+
+    # A gets the non-unit productions of every B with A =>* B through unit productions; their
+    # templates nest the nodes of the unit productions that were skipped. A new nonterminal is not
+    # replaced (A -> A' with A' from left recursion), since it needs the nodes passed to it
+    def _remove_units(self, rules, augmented):
+        result = {}
+        for A in rules:
+            if augmented and A == self.start:
+                result[A] = dict(rules[A])
+                continue
+            productions = {}
+            paths = {A: (0,)}  # B -> template of A =>* B (child 0 is the node of B)
+            queue = [A]
+            for B in queue:
+                for p, template in rules[B].items():
+                    if len(p) == 1 and p[0] in rules and p[0] not in self.helpers:
+                        if p[0] not in paths:
+                            paths[p[0]] = _substitute(paths[B], 0, template, 1)
+                            queue.append(p[0])
+                    else:
+                        productions.setdefault(p, _substitute(paths[B], 0, template, len(p)))
+            result[A] = productions
+        return result
+
+    # Left recursion removal (Aho et al., Algorithm 4.19) in the order of the nonterminals
+    def _remove_left_recursion(self, rules):
+        order = {A: i for i, A in enumerate(rules)}
+        for i, A in enumerate(list(rules)):
+            # A -> B γ, with B an earlier nonterminal that can start with A, gets the productions of B.
+            # A production never gets the same B twice: that only happens through empty productions
+            # (hidden left recursion), and would go on forever
+            leads = self._leading_to(rules, A)
+            replaced = {p: () for p in rules[A]}  # Production -> nonterminals replaced at its start
+            substituted = True
+            while substituted:
+                substituted = False
+                productions = {}
+                for p, template in rules[A].items():
+                    B = p[0] if p else None
+                    if order.get(B, i) < i and B in leads and B not in replaced[p]:
+                        substituted = True
+                        for q, t in rules[B].items():
+                            if q + p[1:] not in productions:
+                                productions[q + p[1:]] = _substitute(template, 0, t, len(q))
+                                replaced[q + p[1:]] = (*replaced[p], B)
+                    else:
+                        productions.setdefault(p, template)
+                rules[A] = productions
+
+            # A -> A α | β becomes A -> β A', A' -> α A' | ε. A' receives the node of A built so far
+            # (first from β, then one more level for every α) and returns the complete one
+            recursive = {p[1:]: template for p, template in rules[A].items() if p and p[0] == A}
+            if not recursive:
+                continue
+            H = self._new_symbol(A, 1)
+            rules[A] = {p + (H,): (('pass', len(p), template),)
+                        for p, template in rules[A].items() if not (p and p[0] == A)}
+            rules[H] = {}
+            for alpha, template in recursive.items():
+                if alpha:  # A -> A derives nothing new
+                    rules[H][alpha + (H,)] = (('pass', len(alpha), _substitute(template, 0, (('left', 0),), 0)),)
+            rules[H][()] = (('left', 0),)
+
+    # Nonterminals B with B =>+ A γ, following the first symbol of the productions
+    @staticmethod
+    def _leading_to(rules, A):
+        starts = {}  # X -> nonterminals with a production that starts with X
+        for B, productions in rules.items():
+            for p in productions:
+                if p and p[0] in rules:
+                    starts.setdefault(p[0], set()).add(B)
+        leads = set()
+        stack = [A]
+        while stack:
+            for B in starts.get(stack.pop(), ()):
+                if B not in leads:
+                    leads.add(B)
+                    stack.append(B)
+        return leads
+
+    # Left factoring: the productions of A with the same first symbol become A -> α A', where α is
+    # their longest common prefix, and A' -> β for each of them; A' is factored again in turn.
+    # A' receives the nodes of α (after the ones A received, if A is a new nonterminal too)
+    def _left_factor(self, rules):
+        queue = list(rules)
+        for A in queue:
+            groups = {}
+            for p in rules[A]:
+                groups.setdefault(p[:1], []).append(p)
+            if all(len(group) == 1 for group in groups.values()):
+                continue
+            k = self.helpers.get(A, 0)
+            productions = {}
+            for group in groups.values():
+                g = 0  # The prefix stops before a new nonterminal (the nodes it is passed stay with it)
+                while all(len(p) > g and p[g] == group[0][g] for p in group) and group[0][g] not in self.helpers:
+                    g += 1
+                if len(group) == 1 or g == 0:
+                    productions.update((p, rules[A][p]) for p in group)
+                    continue
+                H = self._new_symbol(A, k + g)
+                productions[group[0][:g] + (H,)] = (('pass', g, (('left',),) * (k > 0) + tuple(range(g))),)
+                rules[H] = {p[g:]: _rewrite(rules[A][p], lambda j: (('left', k + j),) if j < g else (j - g,))
+                            for p in group}
+                queue.append(H)
+            rules[A] = productions
+
+    # Unused name for a new nonterminal that comes from A
+    def _new_symbol(self, A, left):
+        H = A + "'"
+        while H in self.symbols:
+            H += "'"
+        self.symbols.add(H)
+        self.helpers[H] = left
+        return H
+
+    def restore_tree(self, tree):
+        """ParseTree in the original grammar of a ParseTree built with the optimized grammar."""
+        restored = ParseTree()
+        if tree.root_id < 0:
+            return restored
+        # Every node is a generator (see _restore); the stack replaces the recursion, so deep trees
+        # do not reach the recursion limit
+        stack = [self._restore(tree, restored, tree.root_id, ())]
+        result = None
+        while stack:
+            try:
+                request = stack[-1].send(result)
+            except StopIteration as stop:
+                stack.pop()
+                result = stop.value
+            else:
+                stack.append(self._restore(tree, restored, *request))
+                result = None
+        restored.root_id = result[0]
+        return restored
+
+    # Generator that writes the original nodes of a node of tree, given the nodes it receives from
+    # its parent, and returns their ids. It yields (child, nodes) to get the nodes of a child first
+    def _restore(self, tree, restored, node, left):
+        symbol = tree.symbols[tree.symbol[node]]
+        if symbol not in self.grammar:  # Terminal
+            return [restored.add(symbol, tree.start[node], tree.end[node])]
+        children = []
+        child = tree.first_child[node]
+        while child >= 0:
+            children.append(child)
+            child = tree.next_sibling[child]
+        template = self.origin[(symbol, tuple(tree.symbols[tree.symbol[c]] for c in children))]
+        nodes, _ = yield from self._evaluate(template, children, left, restored, tree.start[node])
+        return nodes
+
+    # Nodes of the items of a template; position is where an empty node would be (the end of the
+    # last node written). Returns the node ids and the new position
+    def _evaluate(self, template, children, left, restored, position):
+        nodes = []
+        for item in template:
+            if type(item) is int:
+                new = yield children[item], ()
+            elif item[0] == 'node':
+                inner, position = yield from self._evaluate(item[2], children, left, restored, position)
+                new = [restored.reduce(item[1], inner, position)]
+            elif item[0] == 'pass':
+                passed, position = yield from self._evaluate(item[2], children, left, restored, position)
+                new = yield children[item[1]], tuple(passed)
+            elif len(item) == 1:
+                new = left
+            else:
+                new = [left[item[1]]]
+            nodes += new
+            if new:
+                position = restored.end[new[-1]]
+        return nodes, position
+
+
+# Template with child k replaced by the result of child(k), a tuple of items
+def _rewrite(template, child):
+    result = []
+    for item in template:
+        if type(item) is int:
+            result += child(item)
+        elif item[0] == 'node':
+            result.append(('node', item[1], _rewrite(item[2], child)))
+        elif item[0] == 'pass':
+            (k,) = child(item[1])
+            result.append(('pass', k, _rewrite(item[2], child)))
+        else:
+            result.append(item)
+    return tuple(result)
+
+
+# Template of a production whose child at position was replaced by the `length` symbols of a
+# production with template items
+def _substitute(template, position, items, length):
+    items = _rewrite(items, lambda j: (position + j,))
+    return _rewrite(template, lambda k: (k,) if k < position else items if k == position else (k + length - 1,))
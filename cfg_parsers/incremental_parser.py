@@ -0,0 +1,88 @@
+# Incremental reparsing of an edited token sequence (used by both parsers)
+# The tokens are parsed with a push parser (LRPushParser or LL1PushParser), and every `interval`
+# tokens a checkpoint is recorded: the token index and a copy of the parser stack before that token.
+# After an edit, parsing resumes from the last checkpoint before the edit. Both parsers are
+# deterministic, so once the new parse reaches an old checkpoint after the edit with the same stack,
+# the rest of the parse would repeat the previous run: its checkpoints and its result are reused
+# (shifted by the change in length) and parsing stops there.
+#
+#   parser = IncrementalParser(partial(LRPushParser, ACTION, GOTO), tokens)
+#   parser.edit(10, 12, ["id", "+", "id"])   # tokens[10:12] = ["id", "+", "id"]; returns True/False
+from bisect import bisect_left, bisect_right
+
+
+class IncrementalParser:
+    # new_parser: callable that returns a new push parser (with stack, position, accepted, push, finish)
+    def __init__(self, new_parser, tokens=(), interval=256):
+        self.new_parser = new_parser
+        self.interval = interval
+        self.tokens = []
+        self.positions = []  # Token index of every checkpoint, increasing (0 is always the first)
+        self.stacks = []  # Stack (a tuple) of every checkpoint
+        self.accepted = None
+        self.error = None  # Index of the token that was rejected, or None
+        self.parsed = 0  # Tokens parsed by the last call (set_tokens or edit)
+        self.set_tokens(tokens)
+
+    # Parse a new token sequence from the start
+    def set_tokens(self, tokens):
+        self.tokens = list(tokens)
+        parser = self.new_parser()
+        self.positions = [0]
+        self.stacks = [tuple(parser.stack)]
+        return self._run(parser, [], [], 0, None)
+
+    # Replace tokens[start:end] by new tokens and parse again; returns True if the result is accepted
+    def edit(self, start, end, tokens):
+        tokens = list(tokens)
+        delta = len(tokens) - (end - start)
+        self.tokens[start:end] = tokens
+
+        # The checkpoints up to start are still valid (the tokens before them did not change);
+        # the old ones after the edited tokens are the places where the parse can reconverge
+        keep = bisect_right(self.positions, start)
+        old_positions, old_stacks = self.positions[keep:], self.stacks[keep:]
+        first = bisect_left(old_positions, end)
+        del self.positions[keep:], self.stacks[keep:]
+
+        parser = self.new_parser()
+        parser.stack[:] = self.stacks[-1]
+        parser.position = self.positions[-1]
+        return self._run(parser, old_positions[first:], old_stacks[first:], delta, (self.accepted, self.error))
+
+    def _run(self, parser, old_positions, old_stacks, delta, previous):
+        tokens, positions, stacks = self.tokens, self.positions, self.stacks
+        start = i = parser.position
+        next_checkpoint = i + self.interval
+        k = 0
+        n = len(tokens)
+        while parser.accepted is None and i < n:
+            if k < len(old_positions) and i == old_positions[k] + delta:
+                stack = tuple(parser.stack)
+                if stack == old_stacks[k]:  # Reconverged with the previous run
+                    if positions[-1] == i:
+                        del positions[-1], stacks[-1]
+                    positions.extend(p + delta for p in old_positions[k:])
+                    stacks.extend(old_stacks[k:])
+                    self.accepted, error = previous
+                    self.error = error + delta if error is not None else None
+                    self.parsed = i - start
+                    return self.accepted
+                if positions[-1] != i:
+                    positions.append(i)
+                    stacks.append(stack)
+                next_checkpoint = i + self.interval
+                k += 1
+            elif i == next_checkpoint:
+                positions.append(i)
+                stacks.append(tuple(parser.stack))
+                next_checkpoint = i + self.interval
+            parser.push(tokens[i])
+            i += 1
+
+        if parser.accepted is None:
+            parser.finish()
+        self.accepted = parser.accepted
+        self.error = None if self.accepted else parser.position
+        self.parsed = i - start
+        return self.accepted
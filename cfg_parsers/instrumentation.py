@@ -0,0 +1,86 @@
+# Counters and phase timers for the table builders and the parsers (used by both parsers)
+# Everything goes to the STATS object, which is disabled by default. The hot loops only read
+# STATS.enabled before counting, so instrumentation costs one attribute check when it is off.
+#
+#   STATS.enable()
+#   ACTION, GOTO = SLRTable(grammar)
+#   print(STATS.to_json())
+#
+# Counters are named "<phase>.<what>" (e.g. "lr_parse.shifts"); when a phase of that name was timed,
+# as_dict also reports "<phase>.<what>_per_second"
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+_NO_PHASE = nullcontext()
+
+
+class Stats:
+    def __init__(self):
+        self.enabled = False
+        self.counters = Counter()
+        self.seconds = defaultdict(float)  # Wall time of every phase
+        self.calls = Counter()  # Number of times every phase was timed
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.counters.clear()
+        self.seconds.clear()
+        self.calls.clear()
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    # Context manager that adds its wall time to a phase (does nothing when disabled)
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def add_time(self, name, seconds):
+        self.seconds[name] += seconds
+        self.calls[name] += 1
+
+    def as_dict(self):
+        rates = {}
+        for name, value in self.counters.items():
+            phase = name.rpartition(".")[0]
+            if self.seconds.get(phase):
+                rates[f"{name}_per_second"] = value / self.seconds[phase]
+        return {
+            "counters": dict(self.counters),
+            "phases": {name: {"seconds": seconds, "calls": self.calls[name]} for name, seconds in self.seconds.items()},
+            "rates": rates,
+        }
+
+    # JSON export; also written to path if one is given
+    def to_json(self, path=None):
+        text = json.dumps(self.as_dict(), indent=2, sort_keys=True)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+
+class _Phase:
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+STATS = Stats()
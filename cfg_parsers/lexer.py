@@ -0,0 +1,76 @@
+# Lexer generated from the terminals of a grammar (used by both parsers)
+# Every terminal is a literal string; the lexer is the DFA (a trie) that recognizes all of them,
+# and it scans with maximal munch: the longest terminal that matches at each position wins.
+# Whitespace between tokens is skipped. The DFA works on bytes (terminals are encoded as UTF-8),
+# so bytes, bytearray, memoryview and mmap buffers are scanned without allocating per character.
+from array import array
+
+WHITESPACE = b' \t\r\n\f\v'
+
+
+class Lexer:
+    # terminals: list of terminal strings; the id of a terminal is its index in the list
+    # '$' (end of input) is never scanned, so the terminal list of PackedTables can be given as is.
+    # Terminals that are not strings (the int ids of grammar_loader's encoded grammars) keep their
+    # id but are never scanned either: their tables take token ids, not text
+    def __init__(self, terminals, ignore=('$',)):
+        self.terminals = list(terminals)
+        # next[state + byte] is the offset (state number * 256) of the next state, or -1
+        self.next = array('i', [-1] * 256)
+        self.accept = array('i', [-1])  # Terminal id recognized by each state (by state number), or -1
+        for token_id, terminal in enumerate(self.terminals):
+            if not isinstance(terminal, str) or terminal in ignore or not terminal:
+                continue
+            state = 0
+            for byte in terminal.encode('utf-8'):
+                if self.next[state + byte] < 0:
+                    self.next[state + byte] = len(self.next)
+                    self.next.extend([-1] * 256)
+                    self.accept.append(-1)
+                state = self.next[state + byte]
+            if self.accept[state >> 8] < 0:  # The first of two equal terminals keeps the id
+                self.accept[state >> 8] = token_id
+        self.space = array('b', [byte in WHITESPACE for byte in range(256)])
+
+    # Lexer for the terminals of a grammar {nonterminal: [productions]} (symbols that are not nonterminals)
+    @classmethod
+    def from_grammar(cls, grammar, ignore=('$',)):
+        terminals = dict.fromkeys(X for productions in grammar.values() for production in productions
+                                  for X in production if X not in grammar and X not in ignore)
+        return cls(terminals, ignore)
+
+    # Terminal ids of the tokens in data (str or any bytes-like buffer)
+    # A byte where no terminal starts yields -1 and scanning goes on with the next byte
+    def scan(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        data = memoryview(data).cast('B')
+        next_state, accept, space = self.next, self.accept, self.space
+        n = len(data)
+        i = 0
+        while i < n:
+            if space[data[i]]:
+                i += 1
+                continue
+            # Longest match: run the DFA and remember the last accepting position
+            state = 0
+            token_id = -1
+            end = i + 1
+            j = i
+            while j < n:
+                state = next_state[state + data[j]]
+                if state < 0:
+                    break
+                j += 1
+                if accept[state >> 8] >= 0:
+                    token_id = accept[state >> 8]
+                    end = j
+            yield token_id
+            i = end
+
+    # Terminal strings of the tokens in data (None where no terminal matches), for the
+    # parsers whose tables are keyed by symbol; the strings are the ones of the terminal list
+    def tokens(self, data):
+        terminals = self.terminals
+        for token_id in self.scan(data):
+            yield terminals[token_id] if token_id >= 0 else None
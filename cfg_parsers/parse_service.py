@@ -0,0 +1,361 @@
+# Long-running parse service over a Unix socket or a localhost TCP port (used by both parsers)
+# Clients send a grammar and the inputs to parse, and get the result of every input, without
+# starting a process or building the tables for each request:
+#   - compiled tables are kept in an LRU cache keyed by the content hash of the grammar
+#     (grammar_cache.grammar_hash); the least recently used ones are evicted when the total
+#     number of table entries goes over max_entries
+#   - tables are built in a process pool, so a slow build never stalls the event loop, and
+#     concurrent requests for a grammar that is being built wait for the same build
+#   - parse requests for the same tables that arrive within batch_delay seconds of each other are
+#     parsed together in one batch (up to max_batch inputs), in a thread of its own, so the event
+#     loop keeps reading and answering requests while a batch is parsed
+#
+#   python -m cfg_parsers.parse_service --socket /tmp/parser.sock      (or --host 127.0.0.1 --port 8765)
+#
+# The protocol is one JSON object per line, in both directions. A request:
+#   {"id": 1, "table": "slr", "grammar": {"S'": [["S"]], "S": [["(", "S", ")"], ["x"]]},
+#    "inputs": ["( x )", ["(", "x"]]}
+#   table: "slr" (default), "lalr" or "lr1" for the bottom-up format (empty production []),
+#   "ll1" for the top-down format (empty production ["e"]). Inputs are strings, split into tokens
+#   like the parsers split them ("id+id" is id + id), or lists of tokens. Instead of the grammar, "digest" can be the one of a previous response.
+# The response to it: {"id": 1, "digest": "...", "results": [[true, null], [false, 2]]}, where
+# every result is (accepted, position of the rejected token), or {"id": 1, "error": "..."}.
+# Requests on one connection are served concurrently, so responses can come in any order.
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import bottom_up, top_down
+from .grammar_cache import KIND_LL1, KIND_SLR, grammar_hash
+from .instrumentation import STATS
+from .lexer import Lexer
+
+# Table builders of the bottom-up module by table name
+LR_TABLES = {"slr": bottom_up.SLRTable, "lalr": bottom_up.LALRTable, "lr1": bottom_up.LR1Table}
+LIMIT = 1 << 26  # Longest request line, in bytes
+BACKLOG = 1024  # Connections waiting to be accepted
+
+
+# Tables of a grammar (run in the worker processes): (ACTION, GOTO, lexer) for the bottom-up
+# tables, (parsingTable, start symbol, lexer) for "ll1". The lexer splits the string inputs
+def build_tables(table, grammar):
+    if table == "ll1":
+        FF = top_down.First_Follow(grammar)
+        FF.compute_first()
+        FF.compute_follow()
+        FF.compute_parsing_table()
+        lexer = Lexer.from_grammar(grammar, ignore=("e", "$"))
+        return {A: dict(row) for A, row in FF.parsingTable.items()}, next(iter(grammar)), lexer
+    ACTION, GOTO = LR_TABLES[table](grammar)
+    return ACTION, GOTO, bottom_up.LRlexer(ACTION)
+
+
+# Number of entries of some tables (the size used by the cache)
+def table_size(table, tables):
+    if table == "ll1":
+        return sum(len(row) for row in tables[0].values())
+    return len(tables[0]) + len(tables[1])
+
+
+# Result of one input with some tables
+def parse_input(table, tables, tokens):
+    if table == "ll1":
+        return top_down.LL1_result(tables[0], tables[1], tokens, tables[2])
+    return bottom_up.LRparse_result(tables[0], tables[1], tokens, tables[2])
+
+
+# Results of the inputs of every request of a batch (run in the parsing thread): (True, results)
+# or (False, error) for each request, so a malformed input fails its own request only
+def parse_requests(table, tables, requests):
+    outcomes = []
+    for inputs in requests:
+        try:
+            outcomes.append((True, [parse_input(table, tables, tokens) for tokens in inputs]))
+        except Exception as error:
+            outcomes.append((False, error))
+    return outcomes
+
+
+# The inputs of a request: a list of strings or lists of tokens
+def check_inputs(inputs):
+    if not isinstance(inputs, list):
+        raise ValueError("inputs must be a list of strings or of lists of tokens")
+    for tokens in inputs:
+        if not (isinstance(tokens, str) or
+                isinstance(tokens, list) and all(isinstance(token, str) for token in tokens)):
+            raise ValueError(f"input {tokens!r} is not a string or a list of tokens")
+    return inputs
+
+
+# Least recently used cache of tables, {key: (tables, size)}, with a limit on the total size
+class TableCache(OrderedDict):
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+        self.size = 0
+
+    def lookup(self, key):
+        value = self.get(key)
+        if value is None:
+            return None
+        self.move_to_end(key)
+        return value[0]
+
+    # Tables larger than max_entries by themselves are evicted right away (the requests that
+    # waited for them still use them)
+    def store(self, key, tables, size):
+        if key in self:
+            self.size -= self.pop(key)[1]
+        self[key] = (tables, size)
+        self.size += size
+        while self.size > self.max_entries and self:
+            _, (_, evicted) = self.popitem(last=False)
+            self.size -= evicted
+            STATS.count("service.evictions")
+
+
+# Parse requests for the same tables that are parsed together
+class Batch:
+    __slots__ = ("tables", "requests", "inputs")
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.requests = []  # (inputs, future of their results)
+        self.inputs = 0  # Number of inputs of all the requests
+
+
+class ParseService:
+    def __init__(self, max_entries=2_000_000, processes=None, batch_delay=0.002, max_batch=1024):
+        self.cache = TableCache(max_entries)
+        self.processes = processes
+        self.pool = ProcessPoolExecutor(processes)
+        self.parser = ThreadPoolExecutor(1, thread_name_prefix="parse")  # Batches are parsed one at a time
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.building = {}  # Key -> future of the tables being built
+        self.batches = {}  # Key -> Batch being collected for those tables
+        self.pending = set()  # Builds and batches submitted to the executors and not done yet
+
+    # Run fn(*args) in an executor; returns an asyncio future of its result
+    def _submit(self, executor, fn, *args):
+        future = executor.submit(fn, *args)
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        return asyncio.wrap_future(future)
+
+    # A worker process that dies breaks its pool for good, so the pool is replaced by a new one
+    # (the builds that were running in it fail, the later ones run in the new pool)
+    def _restart_pool(self, pool):
+        if pool is self.pool:
+            STATS.count("service.pool_restarts")
+            pool.shutdown(wait=False)
+            self.pool = ProcessPoolExecutor(self.processes)
+
+    # Tables of a grammar: from the cache, or built in the pool. key is (table, digest)
+    async def tables(self, key, grammar):
+        tables = self.cache.lookup(key)
+        if tables is not None:
+            STATS.count("service.cache_hits")
+            return tables
+        future = self.building.get(key)
+        if future is None:
+            if grammar is None:
+                raise KeyError("unknown digest, send the grammar")
+            STATS.count("service.builds")
+            pool = self.pool
+            try:
+                future = self._submit(pool, build_tables, key[0], grammar)
+            except BrokenProcessPool:
+                self._restart_pool(pool)
+                pool = self.pool
+                future = self._submit(pool, build_tables, key[0], grammar)
+            self.building[key] = future
+            future.add_done_callback(lambda done: self._built(key, pool, done))
+        # The build is shared: a request that is cancelled must not cancel it for the others
+        return await asyncio.shield(future)
+
+    def _built(self, key, pool, future):
+        del self.building[key]
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            tables = future.result()
+            self.cache.store(key, tables, table_size(key[0], tables))
+        elif isinstance(future.exception(), BrokenProcessPool):
+            self._restart_pool(pool)
+
+    # Results of some inputs. The inputs join the batch of their tables, which is parsed
+    # batch_delay seconds after its first request arrived (or as soon as it is full)
+    async def parse(self, key, grammar, inputs):
+        tables = await self.tables(key, grammar)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.batches.get(key)
+        if batch is None:
+            batch = self.batches[key] = Batch(tables)
+            loop.call_later(self.batch_delay, self._run_batch, key, batch)
+        batch.requests.append((inputs, future))
+        batch.inputs += len(inputs)
+        if batch.inputs >= self.max_batch:
+            self._run_batch(key, batch)
+        return await future
+
+    def _run_batch(self, key, batch):
+        if self.batches.get(key) is not batch:  # Already run because it was full
+            return
+        del self.batches[key]
+        STATS.count("service.batches")
+        STATS.count("service.batched_requests", len(batch.requests))
+        requests = [(inputs, future) for inputs, future in batch.requests if not future.cancelled()]
+        if not requests:
+            return
+        parsing = self._submit(self.parser, parse_requests, key[0], batch.tables, [inputs for inputs, _ in requests])
+        parsing.add_done_callback(lambda done: self._parsed(requests, done))
+
+    @staticmethod
+    def _parsed(requests, parsing):
+        for k, (_, future) in enumerate(requests):
+            if future.done():  # Cancelled while it was parsed
+                continue
+            if parsing.cancelled():
+                future.cancel()
+            elif parsing.exception() is not None:
+                future.set_exception(parsing.exception())
+            else:
+                parsed, value = parsing.result()[k]
+                if parsed:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    # Response (a dict) to one request
+    async def handle_request(self, request):
+        table = request.get("table", "slr")
+        if table != "ll1" and table not in LR_TABLES:
+            raise ValueError(f"unknown table {table!r}")
+        grammar = request.get("grammar")
+        if grammar is not None:
+            grammar = {A: [tuple(p) for p in productions] for A, productions in grammar.items()}
+            digest = grammar_hash(grammar, KIND_LL1 if table == "ll1" else KIND_SLR).hex()
+        else:
+            digest = request["digest"]
+        inputs = check_inputs(request.get("inputs", []))
+        results = await self.parse((table, digest), grammar, inputs)
+        return {"id": request.get("id"), "digest": digest, "results": results}
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:  # End of the stream
+                    line = error.partial
+                    if not line:
+                        break
+                except asyncio.LimitOverrunError as error:
+                    # A line longer than LIMIT gets an error response, and the rest of it is skipped
+                    if not await self._skip_line(reader, error.consumed):
+                        break
+                    await self._send(writer, {"id": None, "error": f"ValueError: request longer than {LIMIT} bytes"})
+                    continue
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except ConnectionError:  # The client went away; its pending requests are dropped
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, line, writer):
+        request = {}
+        try:
+            request = json.loads(line)
+            response = await self.handle_request(request)
+        except Exception as error:  # Bad requests get an error response, the connection stays open
+            response = {"id": request.get("id") if isinstance(request, dict) else None,
+                        "error": f"{type(error).__name__}: {error}"}
+        await self._send(writer, response)
+
+    @staticmethod
+    async def _send(writer, response):
+        writer.write(json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    # Drop the rest of a line that is over the limit, consumed bytes at a time (the bytes that
+    # readuntil has already looked at). False if the stream ends first
+    @staticmethod
+    async def _skip_line(reader, consumed):
+        while True:
+            try:
+                await reader.readexactly(consumed)
+                await reader.readuntil(b"\n")
+                return True
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+            except asyncio.IncompleteReadError:
+                return False
+
+    # Serve on the Unix socket path, or on host:port if no path is given
+    async def serve(self, path=None, host="127.0.0.1", port=8765):
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=LIMIT, backlog=BACKLOG)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=LIMIT, backlog=BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+    # Builds and batches that have not started are cancelled (shutdown(cancel_futures=True) does
+    # the same from Python 3.9 on)
+    def close(self):
+        for future in list(self.pending):
+            future.cancel()
+        self.pool.shutdown()
+        self.parser.shutdown()
+
+
+# Client: send one request to a running service and return its response
+async def request(message, path=None, host="127.0.0.1", port=8765):
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path, limit=LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=LIMIT)
+    try:
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse service with a cache of compiled tables")
+    parser.add_argument("--socket", help="Unix socket path (TCP on --host/--port if not given)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-entries", type=int, default=2_000_000,
+                        help="table entries kept in the cache before the least recently used tables are evicted")
+    parser.add_argument("-j", "--jobs", type=int, help="processes that build tables (CPU count by default)")
+    parser.add_argument("--batch-delay", type=float, default=2.0,
+                        help="milliseconds a batch of parse requests waits for more requests")
+    parser.add_argument("--max-batch", type=int, default=1024, help="inputs that make a batch run right away")
+    args = parser.parse_args(argv)
+
+    service = ParseService(args.max_entries, args.jobs, args.batch_delay / 1000, args.max_batch)
+    try:
+        asyncio.run(service.serve(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
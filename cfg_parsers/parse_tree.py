@@ -0,0 +1,123 @@
+# Parse trees stored in an arena of parallel integer arrays (used by both parsers)
+# Node i has symbol[i] (an interned symbol id), first_child[i] and next_sibling[i] (node ids, -1 if
+# none) and the token span [start[i], end[i]). There is no Python object per node: TreeNode views
+# are created only when a node is accessed.
+from array import array
+
+
+class ParseTree:
+    def __init__(self):
+        self.symbols = []  # Symbol of each symbol id
+        self.symbol_id = {}
+        self.symbol = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.start = array('i')
+        self.end = array('i')
+        self.root_id = -1  # Set by the parser when the input is accepted
+
+    def __len__(self):
+        return len(self.symbol)
+
+    # New node without children; returns its id
+    def add(self, symbol, start, end):
+        symbol_id = self.symbol_id.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.symbol_id[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        self.symbol.append(symbol_id)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self.start.append(start)
+        self.end.append(end)
+        return len(self.symbol) - 1
+
+    # Bottom-up construction: node for a reduction to A whose children (already built) are the given
+    # node ids, in order. An empty production spans no tokens at the current position
+    def reduce(self, A, children, position):
+        if not children:
+            return self.add(A, position, position)
+        node = self.add(A, self.start[children[0]], self.end[children[-1]])
+        self.first_child[node] = children[0]
+        for left, right in zip(children, children[1:]):
+            self.next_sibling[left] = right
+        return node
+
+    # Top-down construction: creates the children of node for a production, starting at position.
+    # Spans of nonterminals are completed by close_spans once the parse is over
+    def expand(self, node, production, position):
+        self.start[node] = position
+        children = [self.add(X, position, -1) for X in production]
+        if children:
+            self.first_child[node] = children[0]
+            for left, right in zip(children, children[1:]):
+                self.next_sibling[left] = right
+        return children
+
+    # Top-down construction: a terminal node matched the token at position
+    def match(self, node, position):
+        self.start[node] = position
+        self.end[node] = position + 1
+
+    # Top-down construction: a node ends where its last child ends (or where it starts if it has none).
+    # Children are always created after their parent, so one pass over the ids in reverse is enough
+    def close_spans(self):
+        first_child, next_sibling, start, end = self.first_child, self.next_sibling, self.start, self.end
+        for node in range(len(self.symbol) - 1, -1, -1):
+            child = first_child[node]
+            if child < 0:
+                if end[node] < 0:
+                    end[node] = start[node]
+                continue
+            while next_sibling[child] >= 0:
+                child = next_sibling[child]
+            end[node] = end[child]
+
+    # View of a node (or of the root); nothing is materialized until it is accessed
+    def node(self, i):
+        return TreeNode(self, i)
+
+    @property
+    def root(self):
+        return TreeNode(self, self.root_id) if self.root_id >= 0 else None
+
+    # Memory used by the arrays, in bytes
+    def nbytes(self):
+        arrays = (self.symbol, self.first_child, self.next_sibling, self.start, self.end)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+class TreeNode:
+    __slots__ = ('tree', 'id')
+
+    def __init__(self, tree, i):
+        self.tree = tree
+        self.id = i
+
+    @property
+    def symbol(self):
+        return self.tree.symbols[self.tree.symbol[self.id]]
+
+    # Token span [start, end) covered by the node
+    @property
+    def span(self):
+        return self.tree.start[self.id], self.tree.end[self.id]
+
+    @property
+    def children(self):
+        child = self.tree.first_child[self.id]
+        while child >= 0:
+            yield TreeNode(self.tree, child)
+            child = self.tree.next_sibling[child]
+
+    def is_leaf(self):
+        return self.tree.first_child[self.id] < 0
+
+    # Nested tuples (symbol, child, child, ...), leaves are plain symbols
+    def to_tuple(self):
+        if self.is_leaf():
+            return self.symbol
+        return (self.symbol, *(child.to_tuple() for child in self.children))
+
+    def __repr__(self):
+        return f"TreeNode({self.symbol!r}, span={self.span})"
@@ -0,0 +1,588 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import partial
+
+from .batch_parser import parse_batch
+from .codegen import generate_ll1, write_module
+from .grammar_cache import KIND_LL1, cache_path, grammar_hash, load_tables, save_tables
+from .grammar_loader import load_grammar
+from .incremental_parser import IncrementalParser
+from .instrumentation import STATS
+from .lexer import Lexer
+
+# Clase para calcular conjuntos First, Follow y la tabla de análisis
+class First_Follow:
+    def __init__(self, productions):
+        self.productions = productions
+        self.firstSet = defaultdict(set)
+        self.followSet = defaultdict(set)
+        self.parsingTable = defaultdict(dict)
+        self.conflicts = None  # Celdas de la tabla con más de una derivación (ver compute_parsing_table)
+        self.lexer = None  # Lexer de los terminales de la gramática, se crea al analizar la primera cadena
+        self.uses = None  # uses[Y][A]: apariciones de Y en las derivaciones de A (ver users)
+
+    def users(self):
+        """
+        users[Y]: no terminales con Y en alguna derivación ({A: apariciones}). Se calcula una vez
+        y lo mantienen add_production y remove_production, así una actualización no recorre toda
+        la gramática; compute_first sin nonTerminals lo calcula de nuevo.
+        """
+        if self.uses is None:
+            self.uses = defaultdict(dict)
+            for A, derivations in self.productions.items():
+                for d in derivations:
+                    self.count_uses(A, d, 1)
+        return self.uses
+
+    def count_uses(self, A, derivation, n):
+        """Suma n a las apariciones de cada símbolo de derivation en las derivaciones de A."""
+        for X in derivation:
+            uses = self.uses[X]
+            uses[A] = uses.get(A, 0) + n
+            if not uses[A]:
+                del uses[A]
+
+    def compute_first(self, nonTerminals=None, users=None):
+        """
+        Calcula First de cada no terminal con una lista de trabajo: un no terminal se vuelve a
+        calcular solo cuando cambió el First de un no terminal de sus derivaciones.
+        Con nonTerminals solo se recalculan esos, desde cero (deben incluir a todos los que los
+        usan, ver update_production). Devuelve los no terminales cuyo First cambió.
+        """
+        with STATS.phase('ll1.first'):
+            if nonTerminals is None:
+                nonTerminals = self.productions.keys()
+                self.uses = None  # Las derivaciones pueden haber cambiado desde el último cálculo
+            if users is None:
+                users = self.users()
+            affected = list(dict.fromkeys(nonTerminals))  # En orden, así los conjuntos quedan en ese orden
+            previous = {A: self.firstSet.get(A, set()) for A in affected}
+            for A in affected:
+                self.firstSet[A] = set()
+            worklist = deque(affected)
+            queued = set(affected)
+            while worklist:
+                A = worklist.popleft()
+                queued.discard(A)
+                if STATS.enabled:
+                    STATS.count('ll1.first_explorations')
+                first_set = set()
+                for d in self.productions.get(A, []):
+                    first_set |= self.first_of(d, {})
+                if first_set != self.firstSet[A]:  # Solo crece: los First de los que usa solo crecen
+                    self.firstSet[A] = first_set
+                    for B in users[A]:
+                        if B in previous and B not in queued:
+                            queued.add(B)
+                            worklist.append(B)
+            return {A for A in affected if self.firstSet[A] != previous[A]}
+
+    def compute_follow(self, nonTerminals=None, users=None):
+        """
+        Calcula Follow de cada no terminal con una lista de trabajo: las derivaciones de un no
+        terminal se recorren otra vez solo cuando cambió su Follow. Requiere First.
+        Con nonTerminals solo se recalculan esos, desde cero (deben incluir a todos los no
+        terminales a los que se propaga su Follow); con users (ver users) las derivaciones donde
+        aparecen se buscan ahí. Devuelve los no terminales cuyo Follow cambió.
+        """
+        with STATS.phase('ll1.follow'):
+            if nonTerminals is None:
+                nonTerminals = self.productions.keys()
+            affected = list(dict.fromkeys(nonTerminals))
+            previous = {A: self.followSet.get(A, set()) for A in affected}
+            for A in affected:
+                self.followSet[A] = set()
+            start = next(iter(self.productions), None)
+            if start in previous:
+                self.followSet[start].add("$")
+            # Al principio se recorren las derivaciones donde aparece algún no terminal a recalcular
+            if users is None:
+                worklist = deque(A for A, derivations in self.productions.items()
+                                 if any(X in previous for d in derivations for X in d))
+            else:
+                worklist = deque(dict.fromkeys(A for X in affected for A in users[X] if A in self.productions))
+            queued = set(worklist)
+            while worklist:
+                A = worklist.popleft()
+                queued.discard(A)
+                for d in self.productions[A]:
+                    if d == ("e",):
+                        continue
+                    # Se recorre d de derecha a izquierda con el First del resto de la derivación
+                    follow_set = self.followSet[A]  # Mientras el resto sea anulable, incluye Follow(A)
+                    for X in reversed(d):
+                        if X in self.productions:
+                            if X in previous and not follow_set <= self.followSet[X]:
+                                self.followSet[X] |= follow_set
+                                if X not in queued:
+                                    queued.add(X)
+                                    worklist.append(X)
+                            first_X = self.firstSet[X]
+                            if "e" in first_X:
+                                follow_set = follow_set | (first_X - {"e"})
+                            else:
+                                follow_set = first_X
+                        else:
+                            follow_set = {X}
+            return {A for A in affected if self.followSet[A] != previous[A]}
+
+    def is_LL1(self):
+        """
+        Verifica si la gramática es LL(1) o no.
+        Devuelve True si la gramática es LL(1), False en caso contrario (e imprime todos los conflictos).
+        Usa los conflictos de la tabla de análisis si ya se calculó; si no, calcula lo que falte.
+        """
+        if self.conflicts is None:
+            if not self.firstSet:
+                self.compute_first()
+            if not self.followSet:
+                self.compute_follow()
+            self.compute_parsing_table()
+        for (nonTerminal, terminal), derivations in self.conflicts.items():
+            print(f"Conflicto encontrado en {nonTerminal}, {terminal}: "
+                  f"{' y '.join(map(str, derivations))}")
+        if self.conflicts:
+            return False
+        print("La gramática es LL(1)")
+        return True
+
+    def compute_parsing_table(self):
+        """
+        Llena la tabla de análisis calculando el conjunto de predicción de cada producción una sola
+        vez (el First de cada sufijo de derivación se calcula una vez y se comparte, ver first_of).
+        Devuelve los conflictos, {(no terminal, terminal): [derivaciones]} de todas las celdas con más
+        de una derivación (en la tabla queda la última); también quedan en self.conflicts.
+        Requiere First y Follow.
+        """
+        self.conflicts = {}
+        memo = {}
+        with STATS.phase('ll1.table'):
+            for nonTerminal in self.productions.keys():
+                self.compute_parsing_row(nonTerminal, memo)
+
+        if STATS.enabled:
+            STATS.count('ll1.table_entries', sum(len(row) for row in self.parsingTable.values()))
+            STATS.count('ll1.conflicts', sum(len(ds) - 1 for ds in self.conflicts.values()))
+        return self.conflicts
+
+    def compute_parsing_row(self, nonTerminal, memo=None):
+        """
+        Llena la fila de nonTerminal en la tabla de análisis (la fila anterior y sus conflictos se
+        descartan). memo es la caché de First por sufijo de first_of, válida mientras First no cambie.
+        """
+        if memo is None:
+            memo = {}
+        if self.conflicts is None:
+            self.conflicts = {}
+        row = self.parsingTable[nonTerminal]
+        for terminal in row:
+            self.conflicts.pop((nonTerminal, terminal), None)
+        row.clear()
+        for derivation in self.productions[nonTerminal]:
+            for terminal in self.predict(nonTerminal, derivation, memo):
+                previous = row.get(terminal)
+                if previous is not None and previous != derivation:
+                    cell = self.conflicts.setdefault((nonTerminal, terminal), [previous])
+                    if derivation not in cell:
+                        cell.append(derivation)
+                row[terminal] = derivation
+
+    def predict(self, nonTerminal, derivation, memo=None):
+        """Terminales con los que se elige la derivación: First(derivación), más Follow si es anulable."""
+        first_of_derivation = self.first_of(derivation, {} if memo is None else memo)
+        if "e" in first_of_derivation:
+            return (first_of_derivation - {"e"}) | self.followSet[nonTerminal]
+        return first_of_derivation
+
+    def first_of(self, derivation, memo):
+        """
+        First de una derivación (con "e" si es anulable) a partir de firstSet. El resultado de cada
+        sufijo se guarda en memo (sufijo -> frozenset): se busca el sufijo más largo ya calculado y
+        se agregan los símbolos anteriores de derecha a izquierda, así que las derivaciones que
+        terminan igual comparten el trabajo.
+        """
+        if derivation == ("e",):
+            return frozenset({"e"})
+        first_set = memo.get(derivation)
+        if first_set is not None:
+            return first_set
+        if STATS.enabled:
+            STATS.count('ll1.first_sequences')
+        k = 1
+        while k < len(derivation) and derivation[k:] not in memo:
+            k += 1
+        first_set = memo.get(derivation[k:], frozenset({"e"}))
+        for k in range(k - 1, -1, -1):
+            X = derivation[k]
+            first_X = self.firstSet.get(X, frozenset()) if X in self.productions else {X}
+            if "e" in first_X:
+                first_set = frozenset(first_X - {"e"}) | first_set
+            else:
+                first_set = frozenset(first_X)
+            memo[derivation[k:]] = first_set
+        return first_set
+
+    def add_production(self, nonT, derivation):
+        """
+        Agrega la producción nonT -> derivation (nonT puede ser nuevo) y actualiza First, Follow
+        y la tabla de análisis sin recalcularlos por completo (ver update_production).
+        Devuelve los no terminales cuya fila de la tabla se rehízo.
+        """
+        derivation = tuple(derivation)
+        derivations = self.productions.setdefault(nonT, [])
+        if derivation in derivations:
+            return set()
+        derivations.append(derivation)
+        if self.uses is not None:
+            self.count_uses(nonT, derivation, 1)
+        return self.update_production(nonT, derivation)
+
+    def remove_production(self, nonT, derivation):
+        """Quita la producción nonT -> derivation (ValueError si no existe); igual que add_production."""
+        derivation = tuple(derivation)
+        self.productions[nonT].remove(derivation)
+        if self.uses is not None:
+            self.count_uses(nonT, derivation, -1)
+        return self.update_production(nonT, derivation)
+
+    def update_production(self, nonT, derivation):
+        """
+        Actualiza los conjuntos y la tabla después de agregar o quitar nonT -> derivation:
+          - First se recalcula para nonT y los no terminales que lo usan (directa o indirectamente)
+          - Follow para los no terminales de la derivación, los que aparecen junto a un no terminal
+            cuyo First cambió, y todos aquellos a los que su Follow se propaga
+          - se rehacen las filas de nonT, de los no terminales cuyo Follow cambió y de los que
+            tienen una derivación con un no terminal cuyo First cambió
+        Requiere que First y Follow ya se hayan calculado. Los no terminales que usan a otro salen
+        del índice de users, que las ediciones mantienen, sin recorrer la gramática.
+        """
+        self.lexer = None  # Los terminales pueden haber cambiado
+        users = self.users()
+        changed_first = self.compute_first(self.reach([nonT], lambda Y: users[Y]), users)
+
+        seeds = {X for X in derivation if X in self.productions}
+        for Z in changed_first:
+            for A in users[Z]:
+                seeds.update(X for d in self.productions[A] if Z in d for X in d if X in self.productions)
+        changed_follow = self.compute_follow(
+            self.reach(seeds, lambda Y: {X for d in self.productions.get(Y, []) for X in d if X in self.productions}),
+            users)
+
+        rows = {nonT} | changed_follow | {A for Z in changed_first for A in users[Z]}
+        memo = {}
+        for A in rows:
+            if A in self.productions:
+                self.compute_parsing_row(A, memo)
+        return rows
+
+    @staticmethod
+    def reach(seeds, neighbours):
+        """Los símbolos alcanzables desde seeds con la relación neighbours (incluye seeds)."""
+        reached = set(seeds)
+        stack = list(seeds)
+        while stack:
+            for Y in neighbours(stack.pop()):
+                if Y not in reached:
+                    reached.add(Y)
+                    stack.append(Y)
+        return reached
+
+    def cached_parsing_table(self, cache_dir=None):
+        """
+        Carga la tabla de análisis desde la caché en disco (grammar_cache) si esta
+        gramática ya fue compilada; si no, calcula First, Follow y la tabla y la guarda.
+        Devuelve True si la tabla se cargó de la caché.
+        """
+        digest = grammar_hash(self.productions, KIND_LL1)
+        path = cache_path(digest, cache_dir)
+        derivations = [(nonT, d) for nonT, ds in self.productions.items() for d in ds]
+
+        def decode(symbols, records):
+            table = defaultdict(dict)
+            for nonT, terminal, production in records:
+                table[symbols[nonT]][symbols[terminal]] = derivations[production][1]
+            return table
+
+        # Un archivo que falta, de otra versión o corrupto se genera de nuevo y se sobrescribe
+        loaded = load_tables(path, KIND_LL1, digest, decode)
+        if loaded is not None:
+            self.parsingTable.clear()
+            self.parsingTable.update(loaded)
+            self.conflicts = None  # La caché solo guarda la tabla
+            return True
+
+        self.compute_first()
+        self.compute_follow()
+        self.compute_parsing_table()
+
+        # Los símbolos y las producciones se guardan como enteros
+        symbols = list(dict.fromkeys([*self.productions, *(x for _, d in derivations for x in d), '$']))
+        symbol_id = {x: i for i, x in enumerate(symbols)}
+        derivation_id = {}
+        for i, (nonT, d) in enumerate(derivations):
+            derivation_id.setdefault((nonT, d), i)
+        records = []
+        for nonT, row in self.parsingTable.items():
+            for terminal, production in row.items():
+                records += (symbol_id[nonT], symbol_id[terminal], derivation_id[(nonT, production)])
+
+        try:
+            save_tables(path, KIND_LL1, digest, symbols, records, 3)
+        except OSError as error:  # La caché es opcional, un disco de solo lectura no es un error
+            print(f"Advertencia: no se pudo guardar la tabla compilada: {error}")
+        return False
+
+    def print_parsing_table(self):
+        print("Tabla de análisis (Parsing Table):")
+        for nonTerminal, row in self.parsingTable.items():
+            for terminal, production in row.items():
+                print(f"{nonTerminal}, {terminal} -> {production}")
+
+    def analyze_string(self, input_string, trace=None, tree=None):
+        """
+        Analiza la cadena de entrada sin imprimir nada y devuelve True si es aceptada.
+        trace es un callback opcional que recibe un evento por paso (ver print_trace),
+        por ejemplo trace=print_trace o trace=eventos.append.
+        tree es un ParseTree opcional donde se construye el árbol de análisis (tree.root al aceptar).
+        """
+        # Convertir la cadena en tokens con el lexer generado a partir de los terminales
+        # (un carácter que no inicia ningún terminal da el token None, que se rechaza)
+        if self.lexer is None:
+            self.lexer = Lexer.from_grammar(self.productions, ignore=("e", "$"))
+        return self.analyze_tokens(self.lexer.tokens(input_string), trace, tree)
+
+    def analyze_tokens(self, tokens, trace=None, tree=None):
+        """
+        Analiza un flujo de tokens (cualquier iterable o generador, sin el '$' final)
+        sin imprimir nada (salvo con un callback trace) y sin guardar la entrada en memoria.
+        Con un ParseTree en tree se construye el árbol de análisis.
+        Devuelve True si la cadena es aceptada.
+        """
+        parser = LL1PushParser(self.parsingTable, list(self.productions.keys())[0], trace, tree)
+        parser.feed(tokens)
+        return parser.finish()
+
+    def incremental_parser(self, tokens, interval=256):
+        """
+        Analizador incremental de una secuencia de tokens que se edita (ver incremental_parser):
+        parser.edit(inicio, fin, tokens) reemplaza tokens[inicio:fin] y retoma el análisis desde
+        el último punto de control de la pila antes de la edición; se detiene en cuanto la pila
+        vuelve a coincidir con la del análisis anterior. parser.accepted es el resultado.
+        """
+        return IncrementalParser(partial(LL1PushParser, self.parsingTable, list(self.productions.keys())[0]),
+                                 tokens, interval)
+
+    def generate_parser(self, path=None):
+        """
+        Genera el código de un módulo de Python independiente con un analizador predictivo
+        con pila explícita para la tabla de análisis (ver codegen.generate_ll1) y lo escribe en path
+        si se indica. Al importarlo no se construye ninguna tabla: modulo.parse(tokens)
+        devuelve True o False como analyze_tokens.
+        """
+        source = generate_ll1(self.parsingTable, list(self.productions.keys())[0], self.productions.keys())
+        if path is not None:
+            write_module(source, path)
+        return source
+
+    def analyze_batch(self, inputs, processes=None, chunksize=256):
+        """
+        Analiza muchas entradas (cadenas, que se dividen en tokens como en analyze_string,
+        o secuencias de tokens) en un conjunto de procesos (ver batch_parser.parse_batch).
+        Con fork, los procesos heredan la tabla de análisis y no se envía con cada entrada.
+        Devuelve, en orden, (True, None) por cada entrada aceptada o (False, posición del error).
+        """
+        if self.lexer is None:
+            self.lexer = Lexer.from_grammar(self.productions, ignore=("e", "$"))
+        parser = partial(LL1_result, dict(self.parsingTable), list(self.productions.keys())[0], lexer=self.lexer)
+        return parse_batch(parser, inputs, processes, chunksize)
+
+
+# Lexer de los terminales de una tabla de análisis: las columnas y los terminales de sus producciones
+def LL1_lexer(parsingTable):
+    terminals = dict.fromkeys(x for row in parsingTable.values() for terminal, production in row.items()
+                              for x in (terminal, *production) if x not in parsingTable)
+    return Lexer(terminals, ignore=("e", "$"))
+
+
+# Resultado del análisis de una entrada: (True, None) si es aceptada,
+# (False, posición) con el índice del token que produjo el error si no.
+# Una cadena se divide en tokens con lexer (por defecto, el LL1_lexer de la tabla)
+def LL1_result(parsingTable, start_symbol, tokens, lexer=None):
+    parser = LL1PushParser(parsingTable, start_symbol)
+    if isinstance(tokens, str):
+        tokens = (lexer or LL1_lexer(parsingTable)).tokens(tokens)
+    parser.feed(tokens)
+    if parser.finish():
+        return True, None
+    return False, parser.position
+
+
+# Analizador LL(1) en modo "push": los tokens se entregan con feed() a medida que llegan
+# y finish() termina la entrada con '$'. Solo se guarda la pila de análisis en memoria
+class LL1PushParser:
+    def __init__(self, parsingTable, start_symbol, trace=None, tree=None):
+        self.parsingTable = parsingTable
+        self.trace = trace  # Callback opcional para los eventos de print_trace
+        self.tree = tree  # ParseTree opcional donde se construye el árbol de análisis
+        self.stack = ["$", start_symbol]
+        self.expansions = 0  # Producciones aplicadas hasta ahora
+        if tree is not None:
+            self.root = tree.add(start_symbol, 0, -1)
+            self.nodes = [-1, self.root]  # Nodo del árbol de cada símbolo de la pila ('$' no tiene)
+        self.position = 0  # Tokens consumidos hasta ahora (posición del error si se rechaza)
+        self.accepted = None  # None mientras la entrada no termina, luego True o False
+
+    def feed(self, tokens):
+        """Procesa los tokens de un iterable; devuelve False en cuanto la entrada se rechaza."""
+        if STATS.enabled:
+            with self.recorded():
+                for token in tokens:
+                    if self.accepted is not None:
+                        break
+                    self.push(token)
+        else:
+            for token in tokens:
+                if self.accepted is not None:
+                    break
+                self.push(token)
+        return self.accepted is not False
+
+    @contextmanager
+    def recorded(self):
+        """Suma a STATS el tiempo, las coincidencias y las producciones aplicadas en un bloque."""
+        position, expansions = self.position, self.expansions
+        with STATS.phase('ll1_parse'):
+            yield
+        STATS.count('ll1_parse.matches', self.position - position)
+        STATS.count('ll1_parse.expansions', self.expansions - expansions)
+
+    def push(self, token):
+        """Expande no terminales hasta que el token coincide con el tope de la pila."""
+        stack, table, trace, tree = self.stack, self.parsingTable, self.trace, self.tree
+        while stack:
+            top = stack[-1]
+            if top == token:
+                if trace is not None:
+                    if token == "$":
+                        trace(('accept', self.position, tuple(stack)))
+                    else:
+                        trace(('match', self.position, tuple(stack), token))
+                stack.pop()
+                if tree is not None:
+                    node = self.nodes.pop()
+                    if token == "$":
+                        tree.close_spans()
+                        tree.root_id = self.root
+                    else:
+                        tree.match(node, self.position)
+                self.position += 1
+                if token == "$":
+                    self.accepted = True
+                return
+            production = table[top].get(token) if top in table else None
+            if production is None:
+                if trace is not None:
+                    trace(('error', self.position, tuple(stack), token))
+                self.accepted = False
+                return
+            if trace is not None:
+                trace(('apply', self.position, tuple(stack), top, production))
+            stack.pop()
+            if production != ("e",):  # Si no es una producción épsilon
+                stack.extend(reversed(production))
+            self.expansions += 1
+            if tree is not None:
+                children = tree.expand(self.nodes.pop(), production if production != ("e",) else (), self.position)
+                self.nodes.extend(reversed(children))
+        self.accepted = False
+
+    def finish(self):
+        """Fin de la entrada: devuelve True si los tokens recibidos forman una cadena de la gramática."""
+        if self.accepted is None:
+            if STATS.enabled:
+                with self.recorded():
+                    self.push("$")
+            else:
+                self.push("$")
+            if self.accepted is None:
+                self.accepted = False
+        return self.accepted
+
+
+# Callback de traza que imprime los pasos del análisis. Los eventos son tuplas:
+#   ('match', posición, pila, token)             el tope de la pila coincide con el token
+#   ('apply', posición, pila, A, producción)     se expande A con la producción
+#   ('accept', posición, pila)
+#   ('error', posición, pila, token)             no hay producción para el tope con el token
+# posición es el índice del token actual y pila es una copia tomada antes del paso
+def print_trace(event):
+    kind, position, stack = event[:3]
+    if kind == 'match':
+        print(f"Pila: {list(stack)}, Posición: {position}")
+        print(f"Coinciden '{event[3]}', avanzando en la entrada.")
+    elif kind == 'apply':
+        print(f"Pila: {list(stack)}, Posición: {position}")
+        print(f"Aplicando producción: {event[3]} -> {' '.join(event[4])}")
+    elif kind == 'accept':
+        print("La cadena de entrada fue aceptada.")
+    else:
+        print(f"Pila: {list(stack)}, Posición: {position}")
+        print(f"Error: no hay producción para {stack[-1]} con '{event[3]}'")
+
+
+# Lee una gramática de un archivo (o archivo abierto) con una regla por línea: "E' -> + T E' | e".
+# Los símbolos van separados por espacios y pueden tener varios caracteres; "e" es épsilon
+def read_grammar(path="input.txt"):
+    return load_grammar(path, epsilon="e").to_dict(("e",))
+
+
+# Función principal para ejecutar el análisis
+def main():
+    # Ejemplo de gramática cargada manualmente
+    grammar = {
+        'E': [('T', "E'")],
+        "E'": [('+', 'T', "E'"), ('e',)],  
+        'T': [('F', "T'")],
+        "T'": [('*', 'F', "T'"), ('e',)],
+        'F': [('(', 'E', ')'), ('id',)]
+    }
+
+    print("Gramática cargada:", grammar)
+
+    # Crear objeto para manejar First y Follow
+    FF = First_Follow(grammar)
+
+    # Calcular conjuntos First y Follow
+    FF.compute_first()
+    FF.compute_follow()
+
+    # Calcular tabla de análisis
+    FF.compute_parsing_table()
+
+    # Imprimir los resultados
+    print("Conjuntos First:")
+    for nonT, first_set in FF.firstSet.items():
+        print(f"First({nonT}) = {first_set}")
+
+    print("Conjuntos Follow:")
+    for nonT, follow_set in FF.followSet.items():
+        print(f"Follow({nonT}) = {follow_set}")
+
+    # Imprimir tabla de análisis
+    FF.print_parsing_table()
+
+    if FF.is_LL1():
+        print()
+    else:
+        print("La gramática no es LL(1)")
+
+    # Analizar cadena de entrada
+    input_string = "id + id * id"
+    print(f"\nAnalizando la cadena de entrada: '{input_string}'")
+    print("\nAnálisis paso a paso:")
+    if not FF.analyze_string(input_string, trace=print_trace):
+        print("La cadena de entrada no fue aceptada.")
+
+# Ejecutar el código principal
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import threading
+from functools import partial
+
+from cfg_parsers.batch_parser import parse_batch
+
+
+def tag(name, item):
+    return name, item
+
+
+def test_results_come_back_in_order():
+    assert list(parse_batch(partial(tag, "a"), range(1000), processes=2, chunksize=7)) == \
+        [("a", i) for i in range(1000)]
+
+
+def test_interleaved_batches_keep_their_own_parser():
+    first = parse_batch(partial(tag, "a"), range(600), processes=2, chunksize=5)
+    second = parse_batch(partial(tag, "b"), range(600), processes=2, chunksize=5)
+    results = []
+    for x, y in zip(first, second):
+        results += [x, y]
+    # A batch started inside another one, and used after the inner one finished
+    inner = list(parse_batch(partial(tag, "c"), range(50), processes=2))
+    results += list(first) + list(second)
+    assert inner == [("c", i) for i in range(50)]
+    assert sorted(r for r in results if r[0] == "a") == [("a", i) for i in range(600)]
+    assert sorted(r for r in results if r[0] == "b") == [("b", i) for i in range(600)]
+
+
+def test_one_process_parses_here():
+    assert list(parse_batch(partial(tag, "a"), iter("xyz"), processes=1)) == [("a", "x"), ("a", "y"), ("a", "z")]
+
+
+def test_batches_in_threads_keep_their_own_parser():
+    names = "abcdefgh"
+    results = {}
+
+    def run(name):
+        results[name] = list(parse_batch(partial(tag, name), range(200), processes=2, chunksize=3))
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {name: [(name, i) for i in range(200)] for name in names}
@@ -0,0 +1,354 @@
+import io
+
+import pytest
+
+from cfg_parsers import bottom_up
+from cfg_parsers.codegen import generate_lr, load_module
+from cfg_parsers.instrumentation import STATS
+from cfg_parsers.lexer import Lexer
+from cfg_parsers.top_down import First_Follow
+
+EXPRESSIONS = {
+    "S'": [('S',)],
+    'S': [('S', '+', 'T'), ('T',)],
+    'T': [('T', '*', 'F'), ('F',)],
+    'F': [('(', 'S', ')'), ('id',)],
+}
+
+# LALR(1) but not SLR: FOLLOW(R) has '=', so R -> L . and S -> L . = R conflict in the SLR table
+ASSIGNMENTS = {
+    "S'": [('S',)],
+    'S': [('L', '=', 'R'), ('R',)],
+    'L': [('*', 'R'), ('id',)],
+    'R': [('L',)],
+}
+
+# LR(1) but not LALR(1): the two states of A -> c . and B -> c . have the same core, and merging
+# them gives reduce/reduce conflicts on d and e
+NOT_LALR = {
+    "S'": [('S',)],
+    'S': [('a', 'A', 'd'), ('b', 'B', 'd'), ('a', 'B', 'e'), ('b', 'A', 'e')],
+    'A': [('c',)],
+    'B': [('c',)],
+}
+
+LL_EXPRESSIONS = {
+    'E': [('T', "E'")],
+    "E'": [('+', 'T', "E'"), ('e',)],
+    'T': [('F', "T'")],
+    "T'": [('*', 'F', "T'"), ('e',)],
+    'F': [('(', 'E', ')'), ('id',)],
+}
+
+
+@pytest.mark.parametrize("text", ["id+id", "id + id * ( id )", "(id)*id+id", "id+ *id", "id+x", "idid", ""])
+def test_both_parsers_split_input_strings_alike(text):
+    ACTION, GOTO = bottom_up.SLRTable(EXPRESSIONS)
+    FF = First_Follow(LL_EXPRESSIONS)
+    FF.compute_first()
+    FF.compute_follow()
+    FF.compute_parsing_table()
+    assert bottom_up.LRparser(text, ACTION, GOTO) == FF.analyze_string(text)
+
+
+def test_batches_split_input_strings_like_the_parsers():
+    texts = ["id+id", "id + id * ( id )", "(id)*id+id", "id+ *id", "id+x", "idid", ""]
+    ACTION, GOTO = bottom_up.SLRTable(EXPRESSIONS)
+    FF = First_Follow(LL_EXPRESSIONS)
+    FF.compute_first()
+    FF.compute_follow()
+    FF.compute_parsing_table()
+    bottom_up_results = list(bottom_up.LRparse_batch(texts, ACTION, GOTO, processes=1))
+    top_down_results = list(FF.analyze_batch(texts, processes=1))
+    assert [accepted for accepted, _ in bottom_up_results] == [bottom_up.LRparser(text, ACTION, GOTO) for text in texts]
+    assert [accepted for accepted, _ in top_down_results] == [FF.analyze_string(text) for text in texts]
+    assert bottom_up_results == top_down_results
+    assert bottom_up_results[0] == (True, None)
+    assert bottom_up_results[3] == (False, 2)
+
+
+def test_tokens_of_an_input_string():
+    ACTION, _ = bottom_up.SLRTable(EXPRESSIONS)
+    assert bottom_up.LRtokens("id + ( id )", ACTION) == ['id', '+', '(', 'id', ')']
+    assert bottom_up.LRtokens("id+(id)", ACTION) == ['id', '+', '(', 'id', ')']
+    assert bottom_up.LRtokens("id?", ACTION) == ['id', None]
+
+
+def test_lexer_takes_the_longest_terminal():
+    lexer = Lexer(['=', '==', 'id', 'i', 'abc', '$'])
+    assert list(lexer.scan("===")) == [1, 0]
+    assert list(lexer.tokens("idi i")) == ['id', 'i', 'i']
+    # 'ab' is a prefix of 'abc' but not a terminal: back to the last accepting position
+    assert list(lexer.tokens("ab")) == [None, None]
+    assert list(lexer.tokens("abc==")) == ['abc', '==']
+
+
+def test_lexer_yields_minus_one_for_unknown_bytes():
+    lexer = Lexer(['=', '==', 'id', 'i', '$'])
+    assert list(lexer.scan("id ? ==")) == [2, -1, 1]
+    assert list(lexer.scan("i d")) == [3, -1]
+    assert list(lexer.scan("$")) == [-1]  # End of input is never scanned
+    assert list(lexer.tokens("id\t=\n?")) == ['id', '=', None]
+
+
+@pytest.mark.parametrize("data", [b"i = id==", bytearray(b"i = id=="), memoryview(b"i = id=="),
+                                  memoryview(b"xxi = id==")[2:]])
+def test_lexer_on_bytes_like_input(data):
+    lexer = Lexer.from_grammar({'S': [('i', '=', 'id', '==')]})
+    assert list(lexer.tokens(data)) == ['i', '=', 'id', '==']
+
+
+@pytest.mark.parametrize("text", ["id + id * ( id + id ) * id", "id + * id", "( id + id", "id ) id", ""])
+def test_push_parser_fed_in_pieces(text):
+    ACTION, GOTO = bottom_up.SLRTable(EXPRESSIONS)
+    tokens = text.split()
+    expected = bottom_up.LRparse_result(ACTION, GOTO, tokens)
+    for size in (1, 2, 3):
+        parser = bottom_up.LRPushParser(ACTION, GOTO)
+        for start in range(0, len(tokens), size):
+            parser.feed(iter(tokens[start:start + size]))
+        assert (parser.finish(), None if parser.accepted else parser.position) == expected, size
+        assert parser.finish() == expected[0]  # Finishing twice does not change the result
+
+
+def test_read_tokens_across_chunk_boundaries():
+    text = "id  +\n( identifier *\tid )  \n+ id"
+    for chunk_size in range(1, len(text) + 1):
+        assert list(bottom_up.read_tokens(io.StringIO(text), chunk_size)) == text.split(), chunk_size
+    # "identifier" straddles the boundaries of 4-character chunks, and is not split
+    assert "identifier" in bottom_up.read_tokens(io.StringIO(text), 4)
+    assert list(bottom_up.read_tokens(io.StringIO("  \n "), 2)) == []
+
+
+PARENTHESES = {"S'": [('S',)], 'S': [('(', 'S', ')'), ('x',)]}
+
+
+def test_trace_events_of_an_accepted_input():
+    ACTION, GOTO = bottom_up.SLRTable(PARENTHESES)
+    events = []
+    assert bottom_up.LRparser("( x )", ACTION, GOTO, trace=events.append)
+    assert events == [
+        ('shift', 0, (0,), '(', 1),
+        ('shift', 1, (0, '(', 1), 'x', 3),
+        ('reduce', 2, (0, '(', 1, 'x', 3), 'S', ('x',), 4),
+        ('shift', 2, (0, '(', 1, 'S', 4), ')', 5),
+        ('reduce', 3, (0, '(', 1, 'S', 4, ')', 5), 'S', ('(', 'S', ')'), 2),
+        ('accept', 3, (0, 'S', 2)),
+    ]
+
+
+def test_trace_events_and_printed_trace_of_a_rejected_input(capsys):
+    ACTION, GOTO = bottom_up.SLRTable(PARENTHESES)
+    events = []
+    assert not bottom_up.LRparser("( x x", ACTION, GOTO, trace=events.append)
+    assert events[-1] == ('error', 2, (0, '(', 1, 'x', 3), 'x')
+    assert [event[0] for event in events] == ['shift', 'shift', 'error']
+
+    assert not bottom_up.LRparser("( x", ACTION, GOTO, trace=bottom_up.print_trace)
+    assert capsys.readouterr().out.splitlines() == [
+        "", "Stack: [0], Position: 0, Current symbol: (", "Shift: '(' -> State 1",
+        "", "Stack: [0, '(', 1], Position: 1, Current symbol: x", "Shift: 'x' -> State 3",
+        "", "Stack: [0, '(', 1, 'x', 3], Position: 2", "Reduce using S -> x", "GOTO: Move to state 4 after reduction",
+        "", "Stack: [0, '(', 1, 'S', 4], Position: 2, Current symbol: $",
+        "Error: No action found. The string is not accepted.",
+    ]
+    assert bottom_up.LRparser("x", ACTION, GOTO, trace=bottom_up.print_trace)
+    assert capsys.readouterr().out.splitlines()[-1] == "String accepted. Final stack: [0, 'S', 2]"
+
+
+def conflicts(build, grammar):
+    STATS.reset()
+    STATS.enable()
+    try:
+        tables = build(grammar)
+        return tables, STATS.counters['table.conflicts']
+    finally:
+        STATS.disable()
+        STATS.reset()
+
+
+def test_lalr_table_of_a_grammar_that_is_not_slr():
+    _, slr_conflicts = conflicts(bottom_up.SLRTable, ASSIGNMENTS)
+    (ACTION, GOTO), lalr_conflicts = conflicts(bottom_up.LALRTable, ASSIGNMENTS)
+    assert (slr_conflicts, lalr_conflicts) == (1, 0)
+    for text in ["id = id", "* id = * * id", "* id", "id"]:
+        assert bottom_up.LRparser(text, ACTION, GOTO), text
+    for text in ["id = = id", "= id", "id *"]:
+        assert not bottom_up.LRparser(text, ACTION, GOTO), text
+
+
+@pytest.mark.parametrize("merge", [True, False])
+def test_lr1_table_of_a_grammar_that_is_not_lalr(merge):
+    _, lalr_conflicts = conflicts(bottom_up.LALRTable, NOT_LALR)
+    (ACTION, GOTO), lr1_conflicts = conflicts(lambda grammar: bottom_up.LR1Table(grammar, merge), NOT_LALR)
+    assert (lalr_conflicts, lr1_conflicts) == (2, 0)
+    for text in ["a c d", "b c d", "a c e", "b c e"]:
+        assert bottom_up.LRparser(text, ACTION, GOTO), text
+    for text in ["a c", "c d", "a d"]:
+        assert not bottom_up.LRparser(text, ACTION, GOTO), text
+
+
+def test_pager_merging_keeps_the_lr0_states_when_it_can():
+    lr0 = len(bottom_up.LRcollection(EXPRESSIONS))
+    assert len(bottom_up.LR1automaton(EXPRESSIONS)[0]) == lr0 == 12
+    assert len(bottom_up.LR1automaton(EXPRESSIONS, merge=False)[0]) == 22
+    # The states of A -> c . and B -> c . are not weakly compatible, so they stay apart
+    assert len(bottom_up.LRcollection(NOT_LALR)) == 13
+    assert len(bottom_up.LR1automaton(NOT_LALR)[0]) == len(bottom_up.LR1automaton(NOT_LALR, merge=False)[0]) == 14
+
+
+def test_weak_compatibility():
+    A, B = ('A', ('c',), ()), ('B', ('c',), ())
+    assert not bottom_up.weakly_compatible({A: {'d'}, B: {'e'}}, {A: {'e'}, B: {'d'}})
+    assert bottom_up.weakly_compatible({A: {'d'}, B: {'e'}}, {A: {'d', 'f'}, B: {'e'}})
+    # Both kernels already have a conflict between A and B, merging adds no new one
+    assert bottom_up.weakly_compatible({A: {'d'}, B: {'d', 'e'}}, {A: {'e'}, B: {'d'}})
+
+
+AMBIGUOUS = {"S'": [('E',)], 'E': [('E', '+', 'E'), ('E', '*', 'E'), ('(', 'E', ')'), ('id',)]}
+CYCLIC = {"S'": [('S',)], 'S': [('S',), ('A',), ('a',)], 'A': [('S',), ('b',)]}
+EMPTY = {"S'": [('S',)], 'S': [('S', 'S'), ('a',), ()]}
+
+
+@pytest.mark.parametrize("grammar, accepted, rejected", [
+    (AMBIGUOUS, ["id + id * id", "( id + id ) * id", "id"], {"id + + id": 2, "id id": 1, "": 0}),
+    (CYCLIC, ["a", "b"], {"a a": 1, "": 0, "c": 0}),
+    (EMPTY, ["", "a", "a a a"], {"b": 0, "a b": 1}),
+])
+def test_glr_parser(grammar, accepted, rejected):
+    ACTION, GOTO = bottom_up.GLRTable(grammar)
+    assert any(len(actions) > 1 for actions in ACTION.values())
+    for text in accepted:
+        assert bottom_up.GLRparser(text.split(), ACTION, GOTO) == (True, None), text
+    for text, position in rejected.items():
+        assert bottom_up.GLRparser(text.split(), ACTION, GOTO) == (False, position), text
+
+
+def test_glr_parser_on_a_long_ambiguous_input():
+    ACTION, GOTO = bottom_up.GLRTable(AMBIGUOUS)
+    tokens = ["id"] + ["+", "id", "*", "id"] * 100
+    assert bottom_up.GLRparser(tokens, ACTION, GOTO) == (True, None)
+    assert bottom_up.GLRparser(tokens + ["+"], ACTION, GOTO) == (False, len(tokens) + 1)
+
+
+def test_glr_parser_agrees_with_lr_on_a_grammar_without_conflicts():
+    ACTION, GOTO = bottom_up.SLRTable(EXPRESSIONS)
+    GLR_ACTION, GLR_GOTO = bottom_up.GLRTable(EXPRESSIONS)
+    for text in ["id + id * ( id )", "id + * id", "( id", "id ) id"]:
+        tokens = text.split()
+        assert bottom_up.GLRparser(tokens, GLR_ACTION, GLR_GOTO)[0] == bottom_up.LRparser(text, ACTION, GOTO)
+
+
+# Nullable symbols between and at the end of productions, and a ring of FOLLOW sets (A, B, C)
+NULLABLE = {"S'": [('S',)], 'S': [('A', 'B', 'c'), ('S', 'C')], 'A': [('a', 'B'), ()],
+            'B': [('C',), ('b',), ()], 'C': [('A',), ('d', 'S')]}
+
+
+@pytest.mark.parametrize("grammar", [EXPRESSIONS, ASSIGNMENTS, NOT_LALR, AMBIGUOUS, CYCLIC, EMPTY, NULLABLE])
+def test_matrix_follow_engine_agrees_with_the_worklist(grammar):
+    pytest.importorskip("numpy")
+    assert bottom_up.compute_follow_matrix(grammar) == bottom_up.compute_follow(grammar)
+    assert bottom_up.SLRTable(grammar, follow=bottom_up.compute_follow_matrix) == bottom_up.SLRTable(grammar)
+    assert bottom_up.GLRTable(grammar, follow=bottom_up.compute_follow_matrix) == bottom_up.GLRTable(grammar)
+
+
+def test_matrix_follow_engine_on_a_long_chain():
+    pytest.importorskip("numpy")
+    grammar = expression_chain(300)
+    assert bottom_up.compute_follow_matrix(grammar) == bottom_up.compute_follow(grammar)
+
+
+# S -> A -> B y with B -> ε: after "x", the states of S -> A . and A -> S . reduce into each other,
+# so a default reduction in either one would never get to the error on the second "x"
+def test_default_reductions_stop_at_reduction_cycles():
+    grammar = {"S'": [('S',)], 'S': [('A',), ('x',)], 'A': [('S',), ('B', 'y')], 'B': [()]}
+    ACTION, GOTO = bottom_up.SLRTable(grammar)
+    tables = bottom_up.PackedTables(grammar, ACTION, GOTO)
+    parser = load_module(generate_lr(ACTION, GOTO))
+    for text in ["x x", "y x", "x y"]:
+        assert not bottom_up.LRparse_result(ACTION, GOTO, text)[0], text
+        assert not bottom_up.LRparser_packed(tables.encode(text.split()), tables), text
+        assert not parser.parse(text.split()), text
+
+
+# Tables of the states reachable from state 0, numbered in breadth-first order (symbols in sorted
+# order), so tables built with different state numbers can be compared
+def reachable_tables(ACTION, GOTO):
+    rows = {}
+    for (state, symbol), action in ACTION.items():
+        rows.setdefault(state, {})[symbol] = action
+    for (state, symbol), target in GOTO.items():
+        rows.setdefault(state, {})[symbol] = ('goto', target)
+    number, order = {0: 0}, [0]
+    for state in order:
+        for symbol, action in sorted(rows.get(state, {}).items()):
+            if action[0] in ('shift', 'goto') and action[1] not in number:
+                number[action[1]] = len(number)
+                order.append(action[1])
+    return {(number[state], symbol): (action[0], number[action[1]]) if action[0] in ('shift', 'goto') else action
+            for state in order for symbol, action in rows.get(state, {}).items()}
+
+
+EDITS = [('F', ('-', 'F')), ('L', ()), ('F', ('[', 'L', ']')), ('L', ('L', 'S', ','))]
+
+
+def test_incremental_slr_matches_a_full_rebuild():
+    incremental = bottom_up.IncrementalSLR(EXPRESSIONS)
+    grammar = {A: list(productions) for A, productions in EXPRESSIONS.items()}
+    steps = [(incremental.add_production, list.append, edit) for edit in EDITS]
+    steps += [(incremental.remove_production, list.remove, edit) for edit in reversed(EDITS)]
+    for edit, change, (A, production) in steps:
+        edit(A, production)
+        change(grammar.setdefault(A, []), production)
+        assert reachable_tables(*incremental.tables()) == reachable_tables(*bottom_up.SLRTable(grammar))
+    assert bottom_up.LRparser("id + id * ( id )", *incremental.tables())
+    assert not bottom_up.LRparser("- id", *incremental.tables())
+
+
+def test_incremental_slr_after_removing_the_last_production():
+    grammar = {"S'": [('S',)], 'S': [('a', 'A')], 'A': [('c',)]}
+    incremental = bottom_up.IncrementalSLR(grammar)
+    incremental.remove_production('A', ('c',))
+    incremental.add_production('A', ('d',))
+    grammar['A'] = [('d',)]
+    assert reachable_tables(*incremental.tables()) == reachable_tables(*bottom_up.SLRTable(grammar))
+    assert bottom_up.LRparser("a d", *incremental.tables())
+    assert not bottom_up.LRparser("a c", *incremental.tables())
+
+
+def test_incremental_slr_round_trip_restores_the_states():
+    incremental = bottom_up.IncrementalSLR(EXPRESSIONS)
+    ACTION, GOTO = (dict(table) for table in incremental.tables())
+    incremental.add_production('F', ('-', 'F'))
+    assert bottom_up.LRparser("- id + - - id", *incremental.tables())
+    incremental.remove_production('F', ('-', 'F'))
+    states = {state for state, _ in ACTION}
+    assert {key: action for key, action in incremental.ACTION.items() if key[0] in states} == ACTION
+    assert {key: target for key, target in incremental.GOTO_Table.items() if key[0] in states} == GOTO
+
+
+# Expression grammar with a chain of levels: E_i -> E_i op_i E_{i+1} | E_{i+1}, and P -> ( E0 ) | id
+def expression_chain(levels):
+    grammar = {"S'": [('E0',)]}
+    for i in range(levels):
+        operand = f"E{i + 1}" if i + 1 < levels else 'P'
+        grammar[f"E{i}"] = [(f"E{i}", f"op{i}", operand), (operand,)]
+    grammar['P'] = [('(', 'E0', ')'), ('id',)]
+    return grammar
+
+
+@pytest.mark.parametrize("edit", [('E10', ('E10', 'xx', 'E11')), ('P', ('-', 'P')), ('E5', ()),
+                                  ('P', ('E19', '!')), ('Q', ('q',)), ('E3', ('Q', 'E4'))])
+def test_incremental_slr_edits_on_a_long_chain(edit):
+    grammar = expression_chain(20)
+    incremental = bottom_up.IncrementalSLR(grammar)
+    A, production = edit
+    if A == 'E3':  # Uses a new nonterminal, added first
+        incremental.add_production('Q', ('q',))
+        grammar['Q'] = [('q',)]
+    ACTION, GOTO = bottom_up.SLRTable(grammar)
+    incremental.add_production(A, production)
+    edited = dict(grammar, **{A: grammar.get(A, []) + [production]})
+    assert reachable_tables(*incremental.tables()) == reachable_tables(*bottom_up.SLRTable(edited))
+    incremental.remove_production(A, production)
+    assert reachable_tables(*incremental.tables()) == reachable_tables(ACTION, GOTO)
@@ -0,0 +1,66 @@
+import io
+
+from cfg_parsers.first_follow import First_Follow, format_sets, read_cases, solve_cases
+
+CASES = """2
+2
+S AS A
+A a
+2
+S ASA
+A a
+"""
+
+
+def sets(productions):
+    FF = First_Follow(productions)
+    first, follow = FF.compute_sets()
+    return ({A: set(terminals) for A, terminals in first.items()},
+            {A: set(terminals) for A, terminals in follow.items()})
+
+
+def test_cases_of_the_example_input():
+    assert list(solve_cases(read_cases(io.StringIO(CASES)), processes=1)) == [
+        "First(S) = {a}\nFirst(A) = {a}\nFollow(S) = {$}\nFollow(A) = {a, $}\n\n",
+        "First(S) = {a}\nFirst(A) = {a}\nFollow(S) = {$, a}\nFollow(A) = {a, $}\n\n",
+    ]
+
+
+def test_every_occurrence_of_a_nonterminal_adds_to_its_follow_set():
+    first, follow = sets({"S": [("A", "a", "A", "b")], "A": [("c",), "e"]})
+    assert first == {"S": {"a", "c"}, "A": {"c", "e"}}
+    assert follow == {"S": {"$"}, "A": {"a", "b"}}
+
+
+def test_nullable_chains_and_left_recursion():
+    first, follow = sets({"S": [("S", "B", "c"), ("B",)], "B": [("b",), "e"]})
+    assert first == {"S": {"b", "c", "e"}, "B": {"b", "e"}}
+    assert follow == {"S": {"$", "b", "c"}, "B": {"$", "b", "c"}}
+
+
+def test_format_sets_keeps_the_order_terminals_are_found():
+    FF = First_Follow({"S": [("x", "A"), ("y",)], "A": [("z",), ("w",)]})
+    FF.compute_sets()
+    assert format_sets(FF) == ("First(S) = {x, y}\nFirst(A) = {z, w}\n"
+                               "Follow(S) = {$}\nFollow(A) = {$}\n\n")
+
+
+def test_cached_cases_are_not_held_until_the_next_uncached_one():
+    cases = list(read_cases(io.StringIO(CASES)))
+    cache = {}
+    expected = list(solve_cases(cases, processes=1, cache=cache))
+    assert len(cache) == 2
+
+    read = []
+    def counted(cases):
+        for case in cases:
+            read.append(case)
+            yield case
+
+    # 1000 cached cases, then a new one
+    many = cases * 500 + [{"S": [("b",)]}]
+    outputs = solve_cases(counted(many), processes=2, chunksize=4, cache=cache)
+    for k, output in enumerate(outputs):
+        assert output == (expected[k % 2] if k < 1000 else "First(S) = {b}\nFollow(S) = {$}\n\n")
+        assert len(read) - k <= 4 * 2 * 4
+    assert len(read) == 1001
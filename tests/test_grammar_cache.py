@@ -0,0 +1,106 @@
+import os
+
+from cfg_parsers import bottom_up, grammar_cache
+from cfg_parsers.top_down import First_Follow
+
+EXPRESSIONS = {
+    "S'": [('S',)],
+    'S': [('S', '+', 'T'), ('T',)],
+    'T': [('T', '*', 'F'), ('F',)],
+    'F': [('(', 'S', ')'), ('id',)],
+}
+
+LL_EXPRESSIONS = {
+    'E': [('T', "E'")],
+    "E'": [('+', 'T', "E'"), ('e',)],
+    'T': [('F', "T'")],
+    "T'": [('*', 'F', "T'"), ('e',)],
+    'F': [('(', 'E', ')'), ('id',)],
+}
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('PARSER_CACHE_DIR', str(tmp_path / 'tables'))
+    assert grammar_cache.default_cache_dir() == str(tmp_path / 'tables')
+    monkeypatch.delenv('PARSER_CACHE_DIR')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert grammar_cache.default_cache_dir() == os.path.join(str(tmp_path), 'cfg_parsers')
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    assert grammar_cache.default_cache_dir() == os.path.join(str(tmp_path), '.cache', 'cfg_parsers')
+
+
+def test_slr_tables_round_trip(tmp_path):
+    built = bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path)
+    assert built == bottom_up.SLRTable(EXPRESSIONS)
+    assert len(list(tmp_path.iterdir())) == 1
+    digest = grammar_cache.grammar_hash(EXPRESSIONS, grammar_cache.KIND_SLR)
+    assert grammar_cache.load_tables(grammar_cache.cache_path(digest, tmp_path), grammar_cache.KIND_SLR, digest)
+    assert bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path) == built
+
+
+def test_ll1_table_round_trip(tmp_path):
+    FF = First_Follow(LL_EXPRESSIONS)
+    assert not FF.cached_parsing_table(tmp_path)
+    cached = First_Follow(LL_EXPRESSIONS)
+    assert cached.cached_parsing_table(tmp_path)
+    assert cached.parsingTable == FF.parsingTable
+    assert cached.analyze_string("id+id*id") == FF.analyze_string("id+id*id") is True
+
+
+def test_changed_grammar_gets_its_own_file(tmp_path):
+    bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path)
+    changed = dict(EXPRESSIONS, F=[('(', 'S', ')'), ('id',), ('num',)])
+    ACTION, GOTO = bottom_up.cached_SLRTable(changed, tmp_path)
+    assert (ACTION, GOTO) == bottom_up.SLRTable(changed)
+    assert bottom_up.LRparser("num + id", ACTION, GOTO) is True
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_file_of_another_format_is_rebuilt(tmp_path, monkeypatch):
+    digest = grammar_cache.grammar_hash(EXPRESSIONS, grammar_cache.KIND_SLR)
+    path = grammar_cache.cache_path(digest, tmp_path)
+    bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path)
+    assert grammar_cache.load_tables(path, grammar_cache.KIND_LL1, digest) is None
+
+    # A file written by another version of the format is not read, and is replaced
+    monkeypatch.setattr(grammar_cache, 'VERSION', grammar_cache.VERSION + 1)
+    assert grammar_cache.load_tables(path, grammar_cache.KIND_SLR, digest) is None
+    monkeypatch.undo()
+    with open(path, 'r+b') as file:
+        file.seek(4)
+        file.write((grammar_cache.VERSION + 1).to_bytes(2, 'little'))
+    assert grammar_cache.load_tables(path, grammar_cache.KIND_SLR, digest) is None
+    assert bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path) == bottom_up.SLRTable(EXPRESSIONS)
+    assert grammar_cache.load_tables(path, grammar_cache.KIND_SLR, digest) is not None
+
+
+def test_corrupt_file_is_rebuilt(tmp_path):
+    digest = grammar_cache.grammar_hash(EXPRESSIONS, grammar_cache.KIND_SLR)
+    path = grammar_cache.cache_path(digest, tmp_path)
+    built = bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path)
+    with open(path, 'rb') as file:
+        data = file.read()
+    header = grammar_cache.HEADER.size
+
+    corruptions = [
+        data[:header + 3],  # Truncated in the symbol table
+        data[:-2],  # Truncated in the records
+        data[:header] + b'\x00\x05\x00\xff\xfe' + data[header + 5:],  # Symbol that is not utf-8
+        data[:-12] + (10 ** 6).to_bytes(4, 'little') + data[-8:],  # Record with a symbol out of range
+    ]
+    for corrupt in corruptions:
+        with open(path, 'wb') as file:
+            file.write(corrupt)
+        assert bottom_up.cached_SLRTable(EXPRESSIONS, tmp_path) == built
+        with open(path, 'rb') as file:
+            assert file.read() == data  # The file was overwritten
+
+    FF = First_Follow(LL_EXPRESSIONS)
+    FF.cached_parsing_table(tmp_path)
+    ll1_path = grammar_cache.cache_path(grammar_cache.grammar_hash(LL_EXPRESSIONS, grammar_cache.KIND_LL1), tmp_path)
+    with open(ll1_path, 'r+b') as file:
+        file.truncate(os.path.getsize(ll1_path) - 1)
+    cached = First_Follow(LL_EXPRESSIONS)
+    assert not cached.cached_parsing_table(tmp_path)
+    assert cached.parsingTable == FF.parsingTable
@@ -0,0 +1,87 @@
+import contextlib
+import io
+
+import pytest
+
+from cfg_parsers import bottom_up
+from cfg_parsers.codegen import generate_lr, load_module
+from cfg_parsers.grammar_loader import load_grammar
+
+EXPRESSIONS = """S -> S + T | T
+T -> T * F | F
+F -> ( S ) | id
+"""
+
+
+@pytest.fixture
+def grammar():
+    grammar = load_grammar(io.StringIO(EXPRESSIONS))
+    grammar.augment()
+    return grammar
+
+
+def test_augment_adds_the_new_start_symbol_first(grammar):
+    G = grammar.encoded()
+    start = next(iter(G))
+    assert grammar.symbols[start] == "S'"
+    assert G[start] == [(grammar.ids["S"],)]
+    with pytest.raises(ValueError):
+        grammar.augment()
+
+
+def test_to_dict_and_encoded_agree(grammar):
+    decoded = {grammar.symbols[A]: [tuple(grammar.decode(production)) for production in productions]
+               for A, productions in grammar.encoded().items()}
+    assert decoded == grammar.to_dict()
+
+
+@pytest.mark.parametrize("build", [bottom_up.SLRTable, bottom_up.LALRTable, bottom_up.LR1Table])
+def test_table_builders_on_the_encoded_grammar(grammar, build):
+    ACTION, GOTO = build(grammar.encoded())
+    assert bottom_up.LRparser_stream(grammar.encode("id + id * ( id )".split()), ACTION, GOTO)
+    assert not bottom_up.LRparser_stream(grammar.encode("id + * id".split()), ACTION, GOTO)
+
+
+def test_glr_and_packed_tables_on_the_encoded_grammar(grammar):
+    G = grammar.encoded()
+    tokens = grammar.encode("( id + id ) * id".split())
+    assert bottom_up.GLRparser(tokens, *bottom_up.GLRTable(G))
+    tables = bottom_up.PackedTables(G, *bottom_up.SLRTable(G))
+    assert bottom_up.LRparser_packed(tables.encode(tokens), tables)
+
+
+def test_batches_and_lexers_of_the_encoded_grammar(grammar):
+    G = grammar.encoded()
+    ACTION, GOTO = bottom_up.SLRTable(G)
+    inputs = [grammar.encode("id + id * ( id )".split()), grammar.encode("id + * id".split())]
+    assert list(bottom_up.LRparse_batch(inputs, ACTION, GOTO, processes=1)) == [(True, None), (False, 2)]
+    # Int terminals keep their ids but are not scanned from text
+    lexer = bottom_up.PackedTables(G, ACTION, GOTO).lexer()
+    assert list(lexer.scan("id + id")) == [-1, -1, -1, -1, -1]
+
+
+def test_cached_tables_of_the_encoded_grammar(grammar, tmp_path):
+    G = grammar.encoded()
+    built = bottom_up.cached_SLRTable(G, tmp_path)
+    loaded = bottom_up.cached_SLRTable(G, tmp_path)
+    assert built == loaded == bottom_up.SLRTable(G)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_incremental_tables_of_the_encoded_grammar(grammar):
+    G = grammar.encoded()
+    assert bottom_up.IncrementalSLR(G).tables() == bottom_up.SLRTable(G)
+
+
+def test_printing_and_codegen_on_the_encoded_grammar(grammar):
+    G = grammar.encoded()
+    ACTION, GOTO = bottom_up.SLRTable(G)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        bottom_up.print_SLR_table(ACTION, GOTO)
+        bottom_up.PrintCollection(bottom_up.LRcollection(G), G)
+    assert "accept" in output.getvalue()
+
+    parser = load_module(generate_lr(ACTION, GOTO))
+    assert parser.parse(grammar.encode("id * ( id + id )".split()))
+    assert not parser.parse(grammar.encode("id id".split()))
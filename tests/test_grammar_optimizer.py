@@ -0,0 +1,76 @@
+import pytest
+
+from cfg_parsers import bottom_up
+from cfg_parsers.grammar_optimizer import OptimizedGrammar
+from cfg_parsers.parse_tree import ParseTree
+from cfg_parsers.top_down import First_Follow
+
+# Expression grammar with unit productions and left recursion
+EXPRESSIONS = {
+    'S': [('S', '+', 'T'), ('T',)],
+    'T': [('T', '*', 'F'), ('F',)],
+    'F': [('(', 'S', ')'), ('id',)],
+}
+
+# Calls that need left factoring, and useless symbols: U derives no string, V is unreachable
+CALLS = {
+    'S': [('S', '+', 'C'), ('C',), ('U', 'x')],
+    'C': [('id',), ('id', '(', 'A', ')')],
+    'A': [('S', 'R'), ()],
+    'R': [(',', 'S', 'R'), ()],
+    'U': [('U', 'y')],
+    'V': [('id',)],
+}
+
+SENTENCES = {
+    'EXPRESSIONS': ["id", "id + id * ( id )", "( id + id ) * id * id", "id * id + id"],
+    'CALLS': ["id", "id ( )", "id + id ( id , id ( id ) ) + id", "id ( id + id )"],
+}
+
+
+def augmented(grammar):
+    return {"S'": [(next(iter(grammar)),)], **grammar}
+
+
+def top_down(grammar):
+    return {A: [production or ('e',) for production in productions] for A, productions in grammar.items()}
+
+
+# Parse tree of a sentence with the SLR table of the original grammar
+def original_tree(grammar, text):
+    tree = ParseTree()
+    assert bottom_up.LRparser(text, *bottom_up.SLRTable(augmented(grammar)), tree=tree)
+    return tree.root.to_tuple()
+
+
+@pytest.mark.parametrize("name, grammar", [('EXPRESSIONS', EXPRESSIONS), ('CALLS', CALLS)])
+def test_restored_bottom_up_trees(name, grammar):
+    optimized = OptimizedGrammar(augmented(grammar), augmented=True)
+    assert 'U' not in optimized.grammar and 'V' not in optimized.grammar
+    ACTION, GOTO = bottom_up.LALRTable(optimized.grammar)
+    for text in SENTENCES[name]:
+        tree = ParseTree()
+        assert bottom_up.LRparser(text, ACTION, GOTO, tree=tree), text
+        assert optimized.restore_tree(tree).root.to_tuple() == original_tree(grammar, text), text
+
+
+@pytest.mark.parametrize("name, grammar", [('EXPRESSIONS', EXPRESSIONS), ('CALLS', CALLS)])
+def test_restored_top_down_trees(name, grammar):
+    optimized = OptimizedGrammar(top_down(grammar), empty=("e",), left_recursion=True, left_factor=True)
+    FF = First_Follow(optimized.grammar)
+    FF.compute_first()
+    FF.compute_follow()
+    assert FF.compute_parsing_table() == {}
+    for text in SENTENCES[name]:
+        tree = ParseTree()
+        assert FF.analyze_string(text, tree=tree), text
+        assert optimized.restore_tree(tree).root.to_tuple() == original_tree(grammar, text), text
+
+
+def test_optimized_grammar_accepts_the_same_sentences():
+    optimized = OptimizedGrammar(augmented(EXPRESSIONS), augmented=True)
+    ACTION, GOTO = bottom_up.LALRTable(optimized.grammar)
+    ORIGINAL_ACTION, ORIGINAL_GOTO = bottom_up.SLRTable(augmented(EXPRESSIONS))
+    for text in ["id +", "( id", "id id", "* id", ""]:
+        assert not bottom_up.LRparser(text, ACTION, GOTO)
+        assert not bottom_up.LRparser(text, ORIGINAL_ACTION, ORIGINAL_GOTO)
@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+from cfg_parsers import bottom_up
+from cfg_parsers.top_down import First_Follow, LL1_result
+
+LR_EXPRESSIONS = {
+    "S'": [('S',)],
+    'S': [('S', '+', 'T'), ('T',)],
+    'T': [('T', '*', 'F'), ('F',)],
+    'F': [('(', 'S', ')'), ('id',)],
+}
+
+LL_EXPRESSIONS = {
+    'E': [('T', "E'")],
+    "E'": [('+', 'T', "E'"), ('e',)],
+    'T': [('F', "T'")],
+    "T'": [('*', 'F', "T'"), ('e',)],
+    'F': [('(', 'E', ')'), ('id',)],
+}
+
+SENTENCE = "id + id * ( id + id ) * id + ( id ) + id * id + id * ( ( id ) ) + id".split()
+LONG = (SENTENCE + ["+"]) * 3 + SENTENCE
+
+
+# (incremental parser of some tokens, (accepted, error) of a fresh parse) of both parsers,
+# with checkpoints every 4 tokens
+@pytest.fixture(params=["lr", "ll1"])
+def parsers(request):
+    if request.param == "lr":
+        ACTION, GOTO = bottom_up.SLRTable(LR_EXPRESSIONS)
+        return (lambda tokens: bottom_up.LRparser_incremental(tokens, ACTION, GOTO, interval=4),
+                lambda tokens: bottom_up.LRparse_result(ACTION, GOTO, tokens))
+    FF = First_Follow(LL_EXPRESSIONS)
+    FF.compute_first()
+    FF.compute_follow()
+    FF.compute_parsing_table()
+    return (lambda tokens: FF.incremental_parser(tokens, interval=4),
+            lambda tokens: LL1_result(FF.parsingTable, 'E', tokens))
+
+
+def check(parser, fresh):
+    assert (parser.accepted, parser.error) == fresh(parser.tokens)
+
+
+def test_insertions(parsers):
+    incremental, fresh = parsers
+    parser = incremental(SENTENCE)
+    check(parser, fresh)
+    parser.edit(3, 3, ["*", "id"])
+    check(parser, fresh)
+    parser.edit(len(parser.tokens), len(parser.tokens), ["+", "id"])
+    check(parser, fresh)
+    parser.edit(0, 0, ["("])  # Unbalanced
+    check(parser, fresh)
+    assert not parser.accepted
+
+
+def test_deletions(parsers):
+    incremental, fresh = parsers
+    parser = incremental(SENTENCE)
+    parser.edit(1, 3, [])
+    check(parser, fresh)
+    assert parser.accepted
+    parser.edit(4, 5, [])  # "( id + id )" loses its "("
+    check(parser, fresh)
+    assert not parser.accepted
+    parser.edit(0, len(parser.tokens), [])
+    check(parser, fresh)
+
+
+def test_edit_after_an_earlier_error(parsers):
+    incremental, fresh = parsers
+    tokens = list(SENTENCE)
+    tokens[2] = "+"  # "id + + id ...": rejected at token 2
+    parser = incremental(tokens)
+    check(parser, fresh)
+    assert parser.error == 2
+    parser.edit(13, 14, ["id", "*", "id"])
+    check(parser, fresh)
+    assert parser.error == 2
+    parser.edit(2, 3, ["id"])  # Fixes the error
+    check(parser, fresh)
+    assert parser.accepted
+
+
+def test_edit_reconverges_on_old_checkpoints(parsers):
+    incremental, fresh = parsers
+    parser = incremental(LONG)
+    parser.edit(10, 11, ["(", "id", "*", "id", ")"])  # An operand replaced by another one
+    check(parser, fresh)
+    assert parser.accepted
+    assert parser.parsed < len(parser.tokens) // 2  # Stopped at an old checkpoint
+    parser.edit(40, 41, ["id", "+"])  # Does not reconverge: the rest is rejected
+    check(parser, fresh)
+
+
+def test_random_edits_match_fresh_parses(parsers):
+    incremental, fresh = parsers
+    symbols = ["id", "+", "*", "(", ")"]
+    rng = random.Random(0)
+    parser = incremental(LONG)
+    for _ in range(200):
+        start = rng.randint(0, len(parser.tokens))
+        end = min(len(parser.tokens), start + rng.randint(0, 3))
+        parser.edit(start, end, [rng.choice(symbols) for _ in range(rng.randint(0, 3))])
+        check(parser, fresh)
+        if rng.random() < 0.2:  # Back to a valid input now and then
+            parser.set_tokens(LONG)
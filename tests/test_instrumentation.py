@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from cfg_parsers import bottom_up
+from cfg_parsers.instrumentation import STATS
+
+# One SLR conflict: R -> L . and S -> L . = R on '='
+ASSIGNMENTS = {
+    "S'": [('S',)],
+    'S': [('L', '=', 'R'), ('R',)],
+    'L': [('*', 'R'), ('id',)],
+    'R': [('L',)],
+}
+
+
+@pytest.fixture
+def stats():
+    STATS.reset()
+    STATS.enable()
+    try:
+        yield STATS
+    finally:
+        STATS.disable()
+        STATS.reset()
+
+
+def test_counters_phases_and_rates_of_a_build_and_a_parse(stats, tmp_path):
+    ACTION, GOTO = bottom_up.SLRTable(ASSIGNMENTS)
+    assert bottom_up.LRparser("* id = id", ACTION, GOTO)
+
+    counters = stats.as_dict()["counters"]
+    assert counters["table.conflicts"] == 1
+    assert counters["automaton.states"] == 10
+    assert (counters["table.action_entries"], counters["table.goto_entries"]) == (len(ACTION), len(GOTO))
+    assert counters["lr_parse.shifts"] == 4  # *, id, =, id
+    assert counters["lr_parse.reductions"] == 6  # L -> id, R -> L, L -> * R, L -> id, R -> L, S -> L = R
+
+    phases = stats.as_dict()["phases"]
+    assert set(phases) == {"slr.follow", "slr.automaton", "slr.table", "lr_parse"}
+    assert all(phase["calls"] == 1 and phase["seconds"] > 0 for phase in phases.values())
+    rates = stats.as_dict()["rates"]
+    assert rates["lr_parse.shifts_per_second"] == pytest.approx(4 / phases["lr_parse"]["seconds"])
+    assert "table.conflicts_per_second" not in rates  # No phase is named "table"
+
+    path = tmp_path / "stats.json"
+    assert json.loads(stats.to_json(path)) == json.loads(path.read_text()) == stats.as_dict()
+
+
+def test_nothing_is_counted_while_disabled(stats):
+    stats.disable()
+    ACTION, GOTO = bottom_up.SLRTable(ASSIGNMENTS)
+    bottom_up.LRparser("id", ACTION, GOTO)
+    assert stats.as_dict() == {"counters": {}, "phases": {}, "rates": {}}
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from cfg_parsers import parse_service
+from cfg_parsers.parse_service import ParseService
+
+GRAMMAR = {"S'": [["S"]], "S": [["(", "S", ")"], ["x"]]}
+
+
+def run_requests(*requests):
+    async def run():
+        service = ParseService(processes=1, batch_delay=0.001)
+        try:
+            return await asyncio.gather(*(service.handle_request(request) for request in requests),
+                                        return_exceptions=True)
+        finally:
+            service.close()
+    return asyncio.run(run())
+
+
+def test_requests_are_parsed_in_one_batch():
+    first, second = run_requests({"id": 1, "grammar": GRAMMAR, "inputs": ["( x )", ["(", "x"]]},
+                                 {"id": 2, "table": "lalr", "grammar": GRAMMAR, "inputs": ["( ( x ) )"]})
+    assert first["results"] == [(True, None), (False, 2)]
+    assert second["results"] == [(True, None)]
+
+
+def test_input_strings_are_split_like_the_parsers_split_them():
+    ll1 = {"S": [["(", "S", ")"], ["x"]]}
+    slr, top_down = run_requests({"id": 1, "grammar": GRAMMAR, "inputs": ["((x))", "(x", "(y)"]},
+                                 {"id": 2, "table": "ll1", "grammar": ll1, "inputs": ["((x))", "(x", "(y)"]})
+    assert slr["results"] == top_down["results"] == [(True, None), (False, 2), (False, 1)]
+
+
+@pytest.mark.parametrize("inputs", ["( x )", [["(", 1]], [None], {"x": 1}])
+def test_malformed_inputs_are_rejected(inputs):
+    (error,) = run_requests({"id": 1, "grammar": GRAMMAR, "inputs": inputs})
+    assert isinstance(error, ValueError)
+
+
+def test_an_unknown_digest_needs_the_grammar():
+    (error,) = run_requests({"id": 1, "digest": "00", "inputs": ["x"]})
+    assert isinstance(error, KeyError)
+
+
+def test_a_broken_pool_is_replaced():
+    async def run():
+        service = ParseService(processes=1, batch_delay=0.001)
+        try:
+            with pytest.raises(BrokenProcessPool):
+                await asyncio.wrap_future(service.pool.submit(os._exit, 1))  # The worker dies
+            return await service.handle_request({"id": 1, "grammar": GRAMMAR, "inputs": ["( x )"]})
+        finally:
+            service.close()
+    assert asyncio.run(run())["results"] == [(True, None)]
+
+
+def test_a_request_over_the_limit_gets_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_service, "LIMIT", 256)
+    path = str(tmp_path / "parser.sock")
+
+    async def run():
+        service = ParseService(processes=1, batch_delay=0.001)
+        server = asyncio.create_task(service.serve(path))
+        try:
+            while not os.path.exists(path):
+                await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_unix_connection(path)
+            long_request = {"id": 1, "grammar": GRAMMAR, "inputs": ["x"] * 1000}
+            writer.write(json.dumps(long_request).encode("utf-8") + b"\n")
+            writer.write(json.dumps({"id": 2, "grammar": GRAMMAR, "inputs": ["x"]}).encode("utf-8") + b"\n")
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+            return responses
+        finally:
+            server.cancel()
+            service.close()
+
+    error, response = asyncio.run(run())
+    assert error["id"] is None and "longer than 256 bytes" in error["error"]
+    assert response == {"id": 2, "digest": response["digest"], "results": [[True, None]]}
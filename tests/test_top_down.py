@@ -0,0 +1,161 @@
+from cfg_parsers.codegen import load_module
+from cfg_parsers.top_down import First_Follow, LL1PushParser, LL1_result, print_trace
+
+EXPRESSIONS = {
+    'E': [('T', "E'")],
+    "E'": [('+', 'T', "E'"), ('e',)],
+    'T': [('F', "T'")],
+    "T'": [('*', 'F', "T'"), ('e',)],
+    'F': [('(', 'E', ')'), ('id',)],
+}
+
+
+def sets(productions):
+    FF = First_Follow(productions)
+    FF.compute_first()
+    FF.compute_follow()
+    return dict(FF.firstSet), dict(FF.followSet)
+
+
+def test_first_and_follow_of_the_expression_grammar():
+    first, follow = sets(EXPRESSIONS)
+    assert first == {'E': {'(', 'id'}, "E'": {'+', 'e'}, 'T': {'(', 'id'}, "T'": {'*', 'e'}, 'F': {'(', 'id'}}
+    assert follow == {'E': {')', '$'}, "E'": {')', '$'}, 'T': {'+', ')', '$'}, "T'": {'+', ')', '$'},
+                      'F': {'*', '+', ')', '$'}}
+
+
+def test_first_through_a_nullable_cycle():
+    first, follow = sets({'S': [('A', 'c')], 'A': [('B', 'a'), ('e',)], 'B': [('A',), ('b',)]})
+    assert first == {'S': {'a', 'b', 'c'}, 'A': {'a', 'b', 'e'}, 'B': {'a', 'b', 'e'}}
+    assert follow == {'S': {'$'}, 'A': {'a', 'c'}, 'B': {'a'}}
+
+
+def test_follow_cycle_terminates():
+    _, follow = sets({'S': [('x', 'A')], 'A': [('y', 'B'), ('e',)], 'B': [('z', 'A')]})
+    assert follow == {'S': {'$'}, 'A': {'$'}, 'B': {'$'}}
+
+
+def test_parsing_table_and_conflicts():
+    FF = First_Follow(dict(EXPRESSIONS))
+    FF.compute_first()
+    FF.compute_follow()
+    assert FF.compute_parsing_table() == {}
+    assert FF.analyze_string("id+id*(id)")
+    assert not FF.analyze_string("id+*id")
+
+    FF = First_Follow({'S': [('a', 'A'), ('a', 'b')], 'A': [('c',)]})
+    FF.compute_first()
+    FF.compute_follow()
+    assert FF.compute_parsing_table() == {('S', 'a'): [('a', 'A'), ('a', 'b')]}
+
+
+def built(productions):
+    FF = First_Follow({A: list(derivations) for A, derivations in productions.items()})
+    FF.compute_first()
+    FF.compute_follow()
+    FF.compute_parsing_table()
+    return FF
+
+
+def test_trace_events_of_an_accepted_and_a_rejected_input():
+    FF = built({'S': [('(', 'S', ')'), ('x',)]})
+    events = []
+    assert FF.analyze_string("( x )", trace=events.append)
+    assert events == [
+        ('apply', 0, ('$', 'S'), 'S', ('(', 'S', ')')),
+        ('match', 0, ('$', ')', 'S', '('), '('),
+        ('apply', 1, ('$', ')', 'S'), 'S', ('x',)),
+        ('match', 1, ('$', ')', 'x'), 'x'),
+        ('match', 2, ('$', ')'), ')'),
+        ('accept', 3, ('$',)),
+    ]
+    events = []
+    assert not FF.analyze_string("( x x", trace=events.append)
+    assert events[4:] == [('error', 2, ('$', ')'), 'x')]
+
+
+def test_printed_trace(capsys):
+    FF = built({'S': [('(', 'S', ')'), ('x',)]})
+    assert not FF.analyze_string("( x", trace=print_trace)
+    assert capsys.readouterr().out.splitlines() == [
+        "Pila: ['$', 'S'], Posición: 0", "Aplicando producción: S -> ( S )",
+        "Pila: ['$', ')', 'S', '('], Posición: 0", "Coinciden '(', avanzando en la entrada.",
+        "Pila: ['$', ')', 'S'], Posición: 1", "Aplicando producción: S -> x",
+        "Pila: ['$', ')', 'x'], Posición: 1", "Coinciden 'x', avanzando en la entrada.",
+        "Pila: ['$', ')'], Posición: 2", "Error: no hay producción para ) con '$'",
+    ]
+    assert FF.analyze_string("x", trace=print_trace)
+    assert capsys.readouterr().out.splitlines()[-1] == "La cadena de entrada fue aceptada."
+
+
+def test_push_parser_fed_in_pieces():
+    FF = built(EXPRESSIONS)
+    for text in ["id + id * ( id + id ) * id", "id + * id", "( id + id", "id ) id", ""]:
+        tokens = text.split()
+        expected = LL1_result(FF.parsingTable, 'E', tokens)
+        for size in (1, 2, 3):
+            parser = LL1PushParser(FF.parsingTable, 'E')
+            for start in range(0, len(tokens), size):
+                parser.feed(iter(tokens[start:start + size]))
+            assert (parser.finish(), None if parser.accepted else parser.position) == expected, (text, size)
+
+
+# Sets and table rows of the nonterminals that have productions (a nonterminal whose last
+# production was removed keeps empty sets)
+def state(FF):
+    nonterminals = [A for A, derivations in FF.productions.items() if derivations]
+    return ({A: FF.firstSet[A] for A in nonterminals}, {A: FF.followSet[A] for A in nonterminals},
+            {A: dict(FF.parsingTable[A]) for A in nonterminals if FF.parsingTable[A]})
+
+
+EDITS = [("F", ('-', 'F')), ("L", ('e',)), ("F", ('[', 'L', ']')), ("L", ('E', ',', 'L')), ("T'", ('/', 'F', "T'"))]
+
+
+def test_incremental_ll1_edits_match_a_full_rebuild():
+    FF = built(EXPRESSIONS)
+    productions = {A: list(derivations) for A, derivations in EXPRESSIONS.items()}
+    steps = [(FF.add_production, list.append, edit) for edit in EDITS]
+    steps += [(FF.remove_production, list.remove, edit) for edit in reversed(EDITS)]
+    for edit, change, (A, derivation) in steps:
+        edit(A, derivation)
+        change(productions.setdefault(A, []), derivation)
+        rebuilt = built({A: derivations for A, derivations in productions.items() if derivations})
+        assert state(FF) == state(rebuilt)
+        assert FF.conflicts == rebuilt.conflicts
+    assert state(FF) == state(built(EXPRESSIONS))
+    assert FF.analyze_string("id*(id+id)")
+    assert not FF.analyze_string("[id]")
+
+
+def test_incremental_ll1_edits_keep_the_users_index():
+    FF = built(EXPRESSIONS)
+    FF.add_production('F', ('-', 'F'))
+    FF.add_production('L', ('E', ',', 'E'))
+    FF.remove_production('T', ('F', "T'"))
+    index = FF.uses
+    assert FF.users() is index  # Not computed again
+    rebuilt = built(FF.productions)
+    assert {Y: users for Y, users in index.items() if users} == rebuilt.users()
+    assert index['F'] == {'F': 1, "T'": 1} and index['E'] == {'F': 1, 'L': 2}
+
+
+def test_incremental_ll1_edit_reports_new_conflicts():
+    FF = built(EXPRESSIONS)
+    FF.add_production('F', ('id', '(', 'E', ')'))
+    assert FF.conflicts == {('F', 'id'): [('id',), ('id', '(', 'E', ')')]}
+    FF.remove_production('F', ('id', '(', 'E', ')'))
+    assert FF.conflicts == {}
+
+
+def test_generated_parser_on_deeply_nested_input():
+    FF = First_Follow(EXPRESSIONS)
+    FF.compute_first()
+    FF.compute_follow()
+    FF.compute_parsing_table()
+    parser = load_module(FF.generate_parser())
+    for text in ["id + id * ( id )", "id + * id", "( id", "id ) id", ""]:
+        assert parser.parse(text.split()) == FF.analyze_tokens(text.split()), text
+    # Each '(' opens E, T and F: far more than the recursion limit, without any Python recursion
+    tokens = ['('] * 100000 + ['id'] + [')'] * 100000
+    assert parser.parse(tokens)
+    assert parser.parse_result(tokens[:-1]) == (False, len(tokens) - 1)